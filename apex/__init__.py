@@ -10,7 +10,6 @@ __description__ = "Agentic Portrait EXperience - AI-powered professional portrai
 
 from .core.profile_manager import ProfileManager
 from .core.prompt_generator import PromptGenerator
-from .ui.gradio_interface import create_interface
 from .models.profile import Profile, ProfileData
 
 __all__ = [
@@ -20,3 +19,10 @@ __all__ = [
     "Profile",
     "ProfileData"
 ]
+
+def __getattr__(name):
+    # The UI pulls in Gradio, so it is only imported when first used
+    if name == "create_interface":
+        from .ui.gradio_interface import create_interface
+        return create_interface
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,10 @@
+"""
+API package initialization.
+"""
+
+from .server import APEXApi, create_app
+
+__all__ = [
+    "APEXApi",
+    "create_app"
+]
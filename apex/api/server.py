@@ -0,0 +1,364 @@
+"""
+Headless HTTP/JSON API for profile creation and prompt generation.
+
+A plain ASGI application with no web framework or Gradio dependency. Serve
+it with any ASGI server, e.g. ``uvicorn apex.api.server:app`` or
+``python api.py``.
+"""
+
+import asyncio
+import json
+import time
+import traceback
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+from ..config.settings import config
+from ..core.instrumentation import Instrumentation, get_instrumentation
+from ..core.profile_manager import ProfileManager
+from ..core.prompt_generator import PromptGenerator
+from ..core.storage import INDEXED_FIELDS
+from ..utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from ..utils.validators import Validator
+
+# Request fields accepted by the profile endpoints (reference photos are
+# not accepted over HTTP: a server-side path must never come from clients)
+PROFILE_FIELDS = (
+    "purpose", "attire", "background", "vibe", "lighting", "mood", "age_range",
+    "gender", "ethnicity", "resolution", "custom_notes", "preset_name"
+)
+REQUIRED_FIELDS = ("purpose", "attire", "background", "vibe")
+PROMPT_FIELDS = ("purpose", "attire", "background", "vibe", "lighting", "mood", "custom_notes")
+MAX_BATCH_SIZE = 1000
+
+class APIError(Exception):
+    """An error reported to the client with an HTTP status code."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def _profile_kwargs(body: Dict[str, Any]) -> Dict[str, str]:
+    """Pick and type-check the profile fields of a request body."""
+    if not isinstance(body, dict):
+        raise APIError(400, "Expected a JSON object")
+    kwargs = {}
+    for key in PROFILE_FIELDS:
+        value = body.get(key)
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            raise APIError(400, f"Field '{key}' must be a string")
+        kwargs[key] = value
+    return kwargs
+
+def _missing_fields(kwargs: Dict[str, str]) -> List[str]:
+    """Required profile fields that are absent or blank."""
+    return Validator.validate_required_fields(kwargs, list(REQUIRED_FIELDS))[1]
+
+def _prompt_data(kwargs: Dict[str, str]) -> Dict[str, str]:
+    """Select the fields PromptGenerator reads."""
+    return {key: kwargs[key] for key in PROMPT_FIELDS if key in kwargs}
+
+def _filters(query: Dict[str, str]) -> Dict[str, str]:
+    """The remaining query parameters as profile filters, which must be indexed fields."""
+    unknown = sorted(key for key in query if key not in INDEXED_FIELDS)
+    if unknown:
+        raise APIError(400, f"Unknown query parameter: {unknown[0]} "
+                            f"(filters: {', '.join(INDEXED_FIELDS)})")
+    return query
+
+def _batch_items(body: Any) -> List[Any]:
+    """Extract and bound the ``items`` list of a batch request."""
+    items = body.get("items") if isinstance(body, dict) else None
+    if not isinstance(items, list):
+        raise APIError(400, "Expected a JSON object with an 'items' list")
+    if len(items) > MAX_BATCH_SIZE:
+        raise APIError(413, f"Batch exceeds {MAX_BATCH_SIZE} items")
+    return items
+
+class APEXApi:
+    """ASGI application exposing ProfileManager and PromptGenerator."""
+
+    def __init__(self, profile_manager: Optional[ProfileManager] = None,
+                 prompt_generator: Optional[PromptGenerator] = None,
+                 max_body_size: int = 1024 * 1024,
+                 instrumentation: Optional[Instrumentation] = None):
+        self.instrumentation = instrumentation or get_instrumentation()
+        self.profile_manager = self.instrumentation.instrument(
+            profile_manager or ProfileManager.from_config(config.profile)
+        )
+        self.prompt_generator = self.instrumentation.instrument(
+            prompt_generator or PromptGenerator(prompt_config=config.prompt)
+        )
+        self.max_body_size = max_body_size
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/presets"): self.presets,
+            ("GET", "/metrics"): self.metrics,
+            ("POST", "/profiles/validate"): self.validate_profile,
+            ("POST", "/prompts"): self.generate_prompt,
+            ("POST", "/prompts/batch"): self.generate_prompts,
+            ("POST", "/profiles"): self.create_profile,
+            ("POST", "/profiles/batch"): self.create_profiles,
+            ("GET", "/profiles"): self.list_profiles,
+            ("GET", "/profiles/summaries"): self.list_summaries,
+        }
+        self._negative_prompt = self.prompt_generator.generate_negative_prompt()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        start = time.perf_counter()
+        route = "unmatched"
+        try:
+            handler, path_arg = self._route(scope["method"], scope["path"])
+            route = "/profiles/{id}" if path_arg is not None else scope["path"].rstrip("/") or "/"
+            body = await self._read_json(scope, receive)
+            query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+            if path_arg is None:
+                status, payload = await handler(body, query)
+            else:
+                status, payload = await handler(path_arg)
+        except APIError as e:
+            status, payload = e.status, {"error": e.message}
+        except Exception:
+            traceback.print_exc()
+            status, payload = 500, {"error": "Internal server error"}
+
+        if isinstance(payload, str):
+            await self._send(send, status, payload.encode("utf-8"), METRICS_CONTENT_TYPE.encode("ascii"))
+        else:
+            await self._send_json(send, status, payload)
+        if self.instrumentation.enabled:
+            self.instrumentation.http_request_seconds.observe(
+                time.perf_counter() - start, method=scope["method"], route=route, status=status
+            )
+
+    async def _lifespan(self, receive, send):
+        """Minimal lifespan protocol support."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _route(self, method: str, path: str):
+        """Resolve a handler and, for /profiles/<id>, its path argument."""
+        path = path.rstrip("/") or "/"
+        handler = self.routes.get((method, path))
+        if handler is not None:
+            return handler, None
+        if path.startswith("/profiles/") and path.count("/") == 2:
+            if method == "GET":
+                return self.load_profile, path[len("/profiles/"):]
+            raise APIError(405, "Method not allowed")
+        if any(route_path == path for _, route_path in self.routes):
+            raise APIError(405, "Method not allowed")
+        raise APIError(404, "Not found")
+
+    async def _read_json(self, scope, receive) -> Any:
+        """Read the request body (bounded by ``max_body_size``) as JSON."""
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_size:
+                raise APIError(413, "Request body too large")
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+
+        if scope["method"] == "GET" or size == 0:
+            return None
+        try:
+            return json.loads(b"".join(chunks))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise APIError(400, "Invalid JSON body")
+
+    @staticmethod
+    async def _send(send, status: int, body: bytes, content_type: bytes):
+        """Send a complete response."""
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type),
+                (b"content-length", str(len(body)).encode("ascii")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    @classmethod
+    async def _send_json(cls, send, status: int, payload: Any):
+        """Send a JSON response."""
+        await cls._send(send, status, json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                        b"application/json")
+
+    # Handlers return (status, payload)
+
+    async def health(self, body, query) -> Tuple[int, Any]:
+        return 200, {"status": "ok"}
+
+    async def presets(self, body, query) -> Tuple[int, Any]:
+        return 200, self.profile_manager.get_presets()
+
+    async def metrics(self, body, query) -> Tuple[int, Any]:
+        """Prometheus text exposition of the pipeline metrics."""
+        if not self.instrumentation.enabled:
+            raise APIError(404, "Metrics are disabled (set APEX_METRICS=true)")
+        return 200, self.instrumentation.render()
+
+    async def validate_profile(self, body, query) -> Tuple[int, Any]:
+        kwargs = _profile_kwargs(body)
+        missing = _missing_fields(kwargs)
+        if missing:
+            return 200, {
+                "valid": False,
+                "message": f"Missing required fields: {', '.join(missing)}",
+                "errors": [f"Missing required field: {key}" for key in missing]
+            }
+        _, is_valid, message = self.profile_manager.create_profile(**kwargs)
+        return 200, {"valid": is_valid, "message": message, "errors": [] if is_valid else [message]}
+
+    async def generate_prompt(self, body, query) -> Tuple[int, Any]:
+        kwargs = _profile_kwargs(body)
+        return 200, {
+            "prompt": self.prompt_generator.generate_prompt(_prompt_data(kwargs)),
+            "negative_prompt": self._negative_prompt
+        }
+
+    async def generate_prompts(self, body, query) -> Tuple[int, Any]:
+        batch = [_prompt_data(_profile_kwargs(item)) for item in _batch_items(body)]
+        return 200, {
+            "prompts": self.prompt_generator.generate_prompts(batch),
+            "negative_prompt": self._negative_prompt
+        }
+
+    def _build(self, kwargs: Dict[str, str]):
+        """Create a profile with its prompt; returns (profile or None, message)."""
+        missing = _missing_fields(kwargs)
+        if missing:
+            return None, f"Missing required fields: {', '.join(missing)}"
+        profile, is_valid, message = self.profile_manager.create_profile(**kwargs)
+        if is_valid:
+            profile.generated_prompt = self.prompt_generator.generate_prompt(_prompt_data(kwargs))
+        return profile, message
+
+    @staticmethod
+    async def _save(save, profiles):
+        """Run a blocking save; a refused save (e.g. the profile limit) is a 409."""
+        try:
+            return await asyncio.to_thread(save, profiles)
+        except ValueError as e:
+            raise APIError(409, str(e))
+
+    async def create_profile(self, body, query) -> Tuple[int, Any]:
+        profile, message = self._build(_profile_kwargs(body))
+        if profile is None:
+            raise APIError(422, message)
+
+        location = None
+        if body.get("save", False):
+            location = await self._save(self.profile_manager.save_profile, profile)
+        return 201 if location else 200, {
+            "profile": profile.to_dict(),
+            "prompt": profile.generated_prompt,
+            "location": location
+        }
+
+    async def create_profiles(self, body, query) -> Tuple[int, Any]:
+        results = []
+        valid = []
+        for item in _batch_items(body):
+            try:
+                profile, message = self._build(_profile_kwargs(item))
+            except APIError as e:
+                profile, message = None, e.message
+            if profile is None:
+                results.append({"error": message})
+            else:
+                results.append({"profile": profile.to_dict(), "prompt": profile.generated_prompt})
+                valid.append((len(results) - 1, profile))
+
+        if body.get("save", False) and valid:
+            locations = await self._save(self.profile_manager.save_profiles, [profile for _, profile in valid])
+            for (index, _), location in zip(valid, locations):
+                results[index]["location"] = location
+        return 200, {"results": results}
+
+    async def list_profiles(self, body, query) -> Tuple[int, Any]:
+        try:
+            limit = int(query.pop("limit", 100))
+            offset = int(query.pop("offset", 0))
+        except ValueError:
+            raise APIError(400, "limit and offset must be integers")
+        try:
+            ids = await asyncio.to_thread(self.profile_manager.query_profiles, limit, offset, True,
+                                          **_filters(query))
+        except ValueError as e:
+            raise APIError(400, str(e))
+        return 200, {"profiles": ids, "limit": limit, "offset": offset}
+
+    async def list_summaries(self, body, query) -> Tuple[int, Any]:
+        """A page of profile summaries; pass ``next_cursor`` back as ``cursor`` for the next."""
+        try:
+            limit = int(query.pop("limit", 50))
+        except ValueError:
+            raise APIError(400, "limit must be an integer")
+        if not 1 <= limit <= MAX_BATCH_SIZE:
+            raise APIError(400, f"limit must be between 1 and {MAX_BATCH_SIZE}")
+        cursor = query.pop("cursor", None) or None
+        order = query.pop("order", "newest")
+        if order not in ("newest", "oldest"):
+            raise APIError(400, "order must be 'newest' or 'oldest'")
+        try:
+            page, next_cursor = await asyncio.to_thread(
+                self.profile_manager.list_summaries, limit, cursor, order == "newest", **_filters(query)
+            )
+        except ValueError as e:
+            raise APIError(400, str(e))
+        return 200, {"profiles": [summary.to_dict() for summary in page], "next_cursor": next_cursor}
+
+    async def load_profile(self, profile_id: str) -> Tuple[int, Any]:
+        if not Validator.validate_profile_id(profile_id):
+            raise APIError(400, "Invalid profile id")
+        data = await asyncio.to_thread(self.profile_manager.load_profile, profile_id)
+        if data is None:
+            raise APIError(404, "Profile not found")
+        return 200, data
+
+def create_app(**kwargs) -> APEXApi:
+    """Create the API application."""
+    return APEXApi(**kwargs)
+
+def __getattr__(name):
+    # ``app`` opens the profile store, so it is only built when first used
+    if name == "app":
+        application = globals()["app"] = create_app()
+        return application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def main():
+    """Serve the API with uvicorn."""
+    import uvicorn
+
+    print("🖼️ Starting APEX API server")
+    print(f"🌐 Host: {config.api.host}:{config.api.port}")
+    print(f"📁 Profiles directory: {config.profile.profiles_dir}")
+    uvicorn.run(
+        create_app(),
+        host=config.api.host,
+        port=config.api.port,
+        timeout_keep_alive=config.api.keep_alive_timeout,
+        access_log=False,
+        log_level="warning"
+    )
@@ -0,0 +1,316 @@
+"""
+Command-line interface.
+
+Usage:
+    python -m apex batch requests.csv --output results.jsonl --workers 4
+    python -m apex export profiles.tar
+    python -m apex import profiles.tar
+    python -m apex migrate-layout --depth 1
+"""
+
+import argparse
+import csv
+import dataclasses
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .config.settings import config
+from .core.profile_manager import ProfileManager
+from .core.prompt_generator import PromptGenerator
+from .core.storage import migrate_to_sharded
+from .utils.file_utils import format_file_size
+from .utils.validators import Validator
+
+# Input columns used to build a profile (reference photos are not read
+# from batch files; unknown columns are ignored)
+BATCH_FIELDS = (
+    "purpose", "attire", "background", "vibe", "lighting", "mood", "age_range",
+    "gender", "ethnicity", "resolution", "custom_notes", "preset_name"
+)
+REQUIRED_FIELDS = ("purpose", "attire", "background", "vibe")
+PROMPT_FIELDS = ("purpose", "attire", "background", "vibe", "lighting", "mood", "custom_notes")
+
+# A row is (line number, preferences dict or None, parse error or None)
+Row = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+def read_rows(path: str, fmt: Optional[str] = None) -> Iterator[Row]:
+    """
+    Stream rows from a CSV or JSONL file (``-`` reads stdin).
+
+    The format is taken from the file extension unless given. Lines that
+    don't parse are yielded with an error instead of stopping the run.
+    """
+    if fmt is None:
+        fmt = "csv" if path.lower().endswith(".csv") else "jsonl"
+    handle = sys.stdin if path == "-" else open(path, "r", encoding="utf-8", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(handle)
+            for row in reader:
+                # Blank cells mean "use the default"
+                yield reader.line_num, {key: value for key, value in row.items()
+                                        if key and value not in (None, "")}, None
+        else:
+            for line_number, line in enumerate(handle, 1):
+                if not line.strip():
+                    continue
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, None, f"Invalid JSON: {e.msg}"
+                    continue
+                if isinstance(data, dict):
+                    yield line_number, data, None
+                else:
+                    yield line_number, None, "Expected a JSON object"
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """Group an iterable into lists of ``size`` items."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+class BatchProcessor:
+    """Validates rows, generates their prompts and optionally saves their profiles."""
+
+    def __init__(self, profile_manager: ProfileManager, prompt_generator: PromptGenerator,
+                 save: bool = True):
+        self.profile_manager = profile_manager
+        self.prompt_generator = prompt_generator
+        self.save = save
+
+    def process(self, chunk: List[Row]) -> List[Dict[str, Any]]:
+        """Process one chunk of rows, returning one result per row in order."""
+        results = []
+        valid = []
+        for line_number, data, error in chunk:
+            result = {"line": line_number}
+            results.append(result)
+            if error is None:
+                profile, error = self._build(data)
+            if error is not None:
+                result["error"] = error
+                continue
+            result["prompt"] = profile.generated_prompt
+            valid.append((result, profile))
+
+        if self.save and valid:
+            try:
+                locations = self.profile_manager.save_profiles([profile for _, profile in valid],
+                                                               batch_size=len(valid))
+            except (ValueError, OSError) as e:
+                for result, _ in valid:
+                    result["error"] = f"Could not save profile: {e}"
+                    del result["prompt"]
+            else:
+                for (result, _), location in zip(valid, locations):
+                    result["location"] = location
+        return results
+
+    def _build(self, data: Dict[str, Any]):
+        """Create a profile with its prompt; returns (profile, error)."""
+        kwargs = {}
+        for key in BATCH_FIELDS:
+            value = data.get(key)
+            if value is None:
+                continue
+            if not isinstance(value, str):
+                return None, f"Field '{key}' must be a string"
+            kwargs[key] = value
+        is_valid, missing = Validator.validate_required_fields(kwargs, list(REQUIRED_FIELDS))
+        if not is_valid:
+            return None, f"Missing required fields: {', '.join(missing)}"
+
+        profile, is_valid, message = self.profile_manager.create_profile(**kwargs)
+        if not is_valid:
+            return None, message
+        profile.generated_prompt = self.prompt_generator.generate_prompt(
+            {key: kwargs[key] for key in PROMPT_FIELDS if key in kwargs}
+        )
+        return profile, None
+
+_PROCESSOR: Optional[BatchProcessor] = None
+
+def _init_worker(profile_config, save: bool):
+    """Create the per-process processor."""
+    global _PROCESSOR
+    _PROCESSOR = BatchProcessor(ProfileManager.from_config(profile_config), PromptGenerator(), save)
+
+def _process_chunk(chunk: List[Row]) -> List[Dict[str, Any]]:
+    return _PROCESSOR.process(chunk)
+
+def _ordered_map(pool, func, chunks: Iterable, window: int) -> Iterator:
+    """
+    Like ``pool.imap`` but with at most ``window`` chunks in flight.
+
+    ``Pool.imap`` reads its whole input ahead, which would load a large
+    file into memory; this keeps memory bounded by the window.
+    """
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.apply_async(func, (chunk,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+def run_batch(rows: Iterable[Row], profile_config=None, save: bool = True, workers: int = 1,
+              chunk_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """
+    Process rows in chunks across ``workers`` processes.
+
+    Yields one result dict per row, in input order: ``line`` plus either
+    ``prompt`` (and ``location`` when saving) or ``error``.
+    """
+    profile_config = profile_config or config.profile
+    chunks = chunked(rows, chunk_size)
+    if workers <= 1:
+        processor = BatchProcessor(ProfileManager.from_config(profile_config), PromptGenerator(), save)
+        for chunk in chunks:
+            yield from processor.process(chunk)
+        return
+
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(profile_config, save)) as pool:
+        for results in _ordered_map(pool, _process_chunk, chunks, window=workers * 2):
+            yield from results
+
+def batch_command(args) -> int:
+    """Run ``apex batch``; returns the exit status."""
+    profile_config = config.profile
+    if args.profiles_dir:
+        profile_config = dataclasses.replace(profile_config, profiles_dir=args.profiles_dir)
+
+    output = None
+    if args.output:
+        output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    total = errors = 0
+    start = time.perf_counter()
+    try:
+        rows = read_rows(args.input, args.format)
+        for result in run_batch(rows, profile_config, save=not args.dry_run,
+                                workers=args.workers, chunk_size=args.chunk_size):
+            total += 1
+            if "error" in result:
+                errors += 1
+                print(f"line {result['line']}: {result['error']}", file=sys.stderr)
+            if output is not None:
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if output is not None and output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"Processed {total} rows ({total - errors} ok, {errors} errors) in {elapsed:.2f}s "
+          f"({rate:.0f} rows/s)", file=sys.stderr)
+    return 1 if errors else 0
+
+def _manager_for(args) -> ProfileManager:
+    profile_config = config.profile
+    if args.profiles_dir:
+        profile_config = dataclasses.replace(profile_config, profiles_dir=args.profiles_dir)
+    if args.uploads_dir:
+        profile_config = dataclasses.replace(profile_config, uploads_dir=args.uploads_dir)
+    return ProfileManager.from_config(profile_config)
+
+def export_command(args) -> int:
+    """Run ``apex export``; returns the exit status."""
+    start = time.perf_counter()
+    stats = _manager_for(args).export_profiles(args.archive, chunk_size=args.chunk_size,
+                                               workers=args.workers,
+                                               include_photos=not args.no_photos)
+    print(f"Exported {stats['profiles']} profiles and {stats['blobs']} photos "
+          f"({format_file_size(stats['bytes'])}) in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    if stats["missing_photos"]:
+        print(f"{stats['missing_photos']} reference photos were missing", file=sys.stderr)
+    return 0
+
+def import_command(args) -> int:
+    """Run ``apex import``; returns the exit status."""
+    start = time.perf_counter()
+    try:
+        stats = _manager_for(args).import_profiles(args.archive, workers=args.workers,
+                                                   resume=not args.restart)
+    except (OSError, ValueError) as e:  # unreadable, an ArchiveError or the profile limit
+        print(f"Import failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Imported {stats['profiles']} profiles and {stats['blobs']} photos "
+          f"in {time.perf_counter() - start:.2f}s ({stats['skipped_chunks']} chunks already done, "
+          f"{stats['invalid']} invalid records skipped)", file=sys.stderr)
+    return 1 if stats["invalid"] else 0
+
+def migrate_layout_command(args) -> int:
+    """Run ``apex migrate-layout``; returns the exit status."""
+    profiles_dir = args.profiles_dir or config.profile.profiles_dir
+    start = time.perf_counter()
+    try:
+        stats = migrate_to_sharded(
+            profiles_dir, args.depth,
+            progress=lambda done: print(f"{done} profiles moved", file=sys.stderr)
+        )
+    except (OSError, ValueError) as e:
+        print(f"Migration failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Moved {stats['moved']} profiles into shards ({stats['superseded']} already had a newer copy) "
+          f"in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="apex", description="APEX: Agentic Portrait EXperience")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="Create profiles and prompts from a CSV or JSONL file")
+    batch.add_argument("input", help="CSV or JSONL file of preferences ('-' for stdin)")
+    batch.add_argument("--format", choices=("csv", "jsonl"),
+                       help="Input format (default: from the file extension)")
+    batch.add_argument("--output", "-o", help="Write one JSON result per row here ('-' for stdout)")
+    batch.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 1,
+                       help="Worker processes (default: CPU count)")
+    batch.add_argument("--chunk-size", type=int, default=500, help="Rows per worker task")
+    batch.add_argument("--profiles-dir", help="Profile directory (default: from config)")
+    batch.add_argument("--dry-run", action="store_true",
+                       help="Validate and generate prompts without saving profiles")
+    batch.set_defaults(func=batch_command)
+
+    export = commands.add_parser("export", help="Pack saved profiles and photos into one archive")
+    export.add_argument("archive", help="Archive file to write")
+    export.add_argument("--workers", "-w", type=int, help="Reader/compressor threads")
+    export.add_argument("--chunk-size", type=int, default=5000, help="Profiles per compressed chunk")
+    export.add_argument("--no-photos", action="store_true", help="Leave reference photos out")
+    export.add_argument("--profiles-dir", help="Profile directory (default: from config)")
+    export.add_argument("--uploads-dir", help="Reference photo directory (default: from config)")
+    export.set_defaults(func=export_command)
+
+    import_ = commands.add_parser("import", help="Load profiles and photos from an archive")
+    import_.add_argument("archive", help="Archive file written by 'apex export'")
+    import_.add_argument("--workers", "-w", type=int, help="Decompressor threads")
+    import_.add_argument("--restart", action="store_true",
+                         help="Ignore progress from an interrupted import and start over")
+    import_.add_argument("--profiles-dir", help="Profile directory (default: from config)")
+    import_.add_argument("--uploads-dir", help="Reference photo directory (default: from config)")
+    import_.set_defaults(func=import_command)
+
+    migrate = commands.add_parser("migrate-layout",
+                                  help="Move a flat profile directory into the sharded layout (safe while in use)")
+    migrate.add_argument("--depth", type=int, default=config.profile.shard_depth,
+                         help="Shard levels, 256 directories each (default: from config)")
+    migrate.add_argument("--profiles-dir", help="Profile directory (default: from config)")
+    migrate.set_defaults(func=migrate_layout_command)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -2,12 +2,19 @@
 Config package initialization.
 """
 
-from .settings import Config, UIConfig, ProfileConfig, PromptConfig, config
+from .settings import (Config, UIConfig, APIConfig, ProfileConfig, PromptConfig, JudgeConfig,
+                       MetricsConfig, config)
+from .vocabulary import Vocabulary, get_vocabulary
 
 __all__ = [
     "Config",
     "UIConfig", 
+    "APIConfig",
     "ProfileConfig",
     "PromptConfig",
-    "config"
+    "JudgeConfig",
+    "MetricsConfig",
+    "config",
+    "Vocabulary",
+    "get_vocabulary"
 ]
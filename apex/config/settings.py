@@ -4,7 +4,7 @@ Configuration settings for APEX.
 
 import os
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 @dataclass
 class UIConfig:
@@ -16,19 +16,64 @@ class UIConfig:
     share: bool = True
     inbrowser: bool = True
     max_file_size: int = 10 * 1024 * 1024  # 10MB
+    concurrency_limit: int = 16  # handlers run at once per event
+    queue_max_size: int = 512  # requests waiting in the Gradio queue
+
+@dataclass
+class APIConfig:
+    """Headless HTTP API settings."""
+    host: str = "127.0.0.1"
+    port: int = 8000
+    keep_alive_timeout: int = 5  # seconds an idle keep-alive connection stays open
 
 @dataclass
 class ProfileConfig:
     """Profile configuration settings."""
     profiles_dir: str = "data/profiles"
     uploads_dir: str = "data/uploads"
-    max_profiles: int = 1000
+    derived_dir: str = "data/derived"  # resized reference photo variants
+    derived_cache_bytes: int = 512 * 1024 * 1024  # 512MB
+    results_dir: str = "data/results"  # cached generated portraits
+    results_cache_bytes: int = 2 * 1024 * 1024 * 1024  # 2GB
+    max_profiles: Optional[int] = None  # opt-in cap on saved profiles (APEX_MAX_PROFILES); None for no limit
     auto_save: bool = True
+    storage_backend: str = "json"  # "json" or "sqlite"
+    layout: str = "flat"  # "flat" or "sharded" for a new JSON directory; an existing one keeps its own
+    shard_depth: int = 1  # sharded layout: 256 ** depth subdirectories
+    dedup_mode: str = "off"  # duplicate saves: "off", "reference" (reuse the existing profile) or "revision"
+    catalog: bool = False  # serve the JSON directory from memory, kept current by inotify/polling
+    catalog_poll_interval: float = 2.0  # seconds between rescans when inotify is unavailable
+    write_queue_size: int = 256  # background saves outstanding before handlers wait
+    write_workers: int = 2
+    write_batch_size: int = 64  # profiles flushed to disk together by one worker
+    vocabulary_path: Optional[str] = None  # choice-field options; None uses the bundled file
+
+@dataclass
+class JudgeConfig:
+    """VLM judge endpoint settings (OpenAI-compatible, e.g. vLLM)."""
+    base_url: str = "http://localhost:50032/v1"
+    model: str = "Qwen2.5-VL-3B-Instruct"
+    api_key: Optional[str] = None
+    max_in_flight: int = 8
+    timeout: float = 60.0
+    max_retries: int = 3
+    images_per_request: int = 1
+    cache_path: Optional[str] = "data/judge_cache.db"  # None disables the verdict cache
+    cache_max_entries: int = 100_000
+    cache_ttl_seconds: Optional[float] = None
+
+@dataclass
+class MetricsConfig:
+    """Pipeline metrics and tracing."""
+    enabled: bool = False
+    tracing: bool = False  # OpenTelemetry spans (needs opentelemetry-api)
+    port: Optional[int] = None  # standalone /metrics server for the Gradio app
+    host: str = "127.0.0.1"
 
 @dataclass
 class PromptConfig:
     """Prompt generation configuration."""
-    max_prompt_length: int = 500
+    max_prompt_length: int = 500  # token budget, counted by the prompt tokenizer
     include_negative_prompt: bool = True
     quality_tags: List[str] = None
     
@@ -46,8 +91,11 @@ class Config:
     
     def __init__(self):
         self.ui = UIConfig()
+        self.api = APIConfig()
         self.profile = ProfileConfig()
         self.prompt = PromptConfig()
+        self.judge = JudgeConfig()
+        self.metrics = MetricsConfig()
         
         # Load from environment if available
         self._load_from_env()
@@ -58,11 +106,42 @@ class Config:
         self.ui.port = int(os.getenv('APEX_PORT', self.ui.port))
         self.ui.host = os.getenv('APEX_HOST', self.ui.host)
         self.ui.share = os.getenv('APEX_SHARE', str(self.ui.share)).lower() == 'true'
+        self.ui.concurrency_limit = int(os.getenv('APEX_CONCURRENCY_LIMIT', self.ui.concurrency_limit))
+        self.ui.queue_max_size = int(os.getenv('APEX_QUEUE_MAX_SIZE', self.ui.queue_max_size))
+        
+        # API settings
+        self.api.host = os.getenv('APEX_API_HOST', self.api.host)
+        self.api.port = int(os.getenv('APEX_API_PORT', self.api.port))
         
         # Profile settings
         self.profile.profiles_dir = os.getenv('APEX_PROFILES_DIR', self.profile.profiles_dir)
         self.profile.uploads_dir = os.getenv('APEX_UPLOADS_DIR', self.profile.uploads_dir)
+        self.profile.derived_dir = os.getenv('APEX_DERIVED_DIR', self.profile.derived_dir)
+        self.profile.derived_cache_bytes = int(os.getenv('APEX_DERIVED_CACHE_BYTES',
+                                                         self.profile.derived_cache_bytes))
+        self.profile.results_dir = os.getenv('APEX_RESULTS_DIR', self.profile.results_dir)
         self.profile.auto_save = os.getenv('APEX_AUTO_SAVE', str(self.profile.auto_save)).lower() == 'true'
+        max_profiles = os.getenv('APEX_MAX_PROFILES')
+        self.profile.max_profiles = int(max_profiles) if max_profiles else self.profile.max_profiles
+        self.profile.storage_backend = os.getenv('APEX_STORAGE_BACKEND', self.profile.storage_backend)
+        self.profile.layout = os.getenv('APEX_PROFILE_LAYOUT', self.profile.layout)
+        self.profile.dedup_mode = os.getenv('APEX_DEDUP_MODE', self.profile.dedup_mode)
+        self.profile.catalog = os.getenv('APEX_PROFILE_CATALOG', str(self.profile.catalog)).lower() == 'true'
+        self.profile.write_queue_size = int(os.getenv('APEX_WRITE_QUEUE_SIZE', self.profile.write_queue_size))
+        self.profile.vocabulary_path = os.getenv('APEX_VOCABULARY', self.profile.vocabulary_path)
+        
+        # Judge settings
+        self.judge.base_url = os.getenv('APEX_JUDGE_URL', self.judge.base_url)
+        self.judge.model = os.getenv('APEX_JUDGE_MODEL', self.judge.model)
+        self.judge.api_key = os.getenv('APEX_JUDGE_API_KEY', self.judge.api_key)
+        self.judge.max_in_flight = int(os.getenv('APEX_JUDGE_MAX_IN_FLIGHT', self.judge.max_in_flight))
+        self.judge.cache_path = os.getenv('APEX_JUDGE_CACHE', self.judge.cache_path) or None
+
+        # Metrics settings
+        self.metrics.enabled = os.getenv('APEX_METRICS', str(self.metrics.enabled)).lower() == 'true'
+        self.metrics.tracing = os.getenv('APEX_TRACING', str(self.metrics.tracing)).lower() == 'true'
+        port = os.getenv('APEX_METRICS_PORT')
+        self.metrics.port = int(port) if port else self.metrics.port
 
 # Global configuration instance
 config = Config()
@@ -0,0 +1,129 @@
+"""
+Registry of the choice fields (purpose, attire, lighting, ...) and their options.
+
+The options live in a JSON data file (``vocabulary.json`` next to this
+module by default). Each field maps its options, in display order, to the
+phrase used in prompts (null when the field isn't used in prompts):
+
+    {"version": 1, "fields": {"attire": {"fallback": "professional attire",
+        "options": {"Business Formal": "sharp business suit, ...", ...}}}}
+
+A field may also give a ``default`` option and a ``fallback`` prompt phrase
+for unknown values.
+"""
+
+import json
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+from .settings import config
+
+DEFAULT_VOCABULARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vocabulary.json")
+
+class FieldVocabulary:
+    """The options of one choice field, each interned and numbered."""
+
+    __slots__ = ("name", "values", "codes", "details", "default", "fallback")
+
+    def __init__(self, name: str, options: Dict[str, Optional[str]],
+                 default: Optional[str] = None, fallback: Optional[str] = None):
+        self.name = name
+        self.values: Tuple[str, ...] = tuple(sys.intern(value) for value in options)
+        self.codes: Dict[str, int] = {value: code for code, value in enumerate(self.values)}
+        self.details: Dict[str, str] = {sys.intern(value): detail for value, detail in options.items()
+                                        if detail is not None}
+        if default is not None and default not in self.codes:
+            raise ValueError(f"Default '{default}' of field '{name}' is not one of its options")
+        self.default = default
+        self.fallback = fallback
+
+    def __contains__(self, value) -> bool:
+        return value in self.codes
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+class Vocabulary:
+    """All choice fields, with O(1) validation and integer codes."""
+
+    def __init__(self, fields: Dict[str, FieldVocabulary]):
+        self.fields = fields
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Vocabulary":
+        """Build a vocabulary from the parsed data file."""
+        try:
+            fields = {
+                name: FieldVocabulary(name, spec["options"], spec.get("default"), spec.get("fallback"))
+                for name, spec in data["fields"].items()
+            }
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"Invalid vocabulary data: {e}") from e
+        return cls(fields)
+
+    @classmethod
+    def from_file(cls, path: str) -> "Vocabulary":
+        """Load a vocabulary data file."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def field(self, name: str) -> FieldVocabulary:
+        try:
+            return self.fields[name]
+        except KeyError:
+            raise KeyError(f"Unknown vocabulary field: {name}") from None
+
+    def choices(self, name: str) -> List[str]:
+        """Options of a field in display order."""
+        return list(self.field(name).values)
+
+    def default(self, name: str) -> Optional[str]:
+        return self.field(name).default
+
+    def details(self, name: str) -> Dict[str, str]:
+        """Prompt phrase for each option of a field."""
+        return dict(self.field(name).details)
+
+    def fallback(self, name: str) -> Optional[str]:
+        return self.field(name).fallback
+
+    def is_valid(self, name: str, value) -> bool:
+        """Whether ``value`` is an option of field ``name``."""
+        try:
+            return value in self.field(name).codes
+        except TypeError:  # unhashable, so not an option
+            return False
+
+    def encode(self, name: str, value: str) -> int:
+        """Compact integer code of an option; raises ``ValueError`` if invalid."""
+        try:
+            return self.field(name).codes[value]
+        except (KeyError, TypeError):
+            raise ValueError(f"'{value}' is not a valid {name}") from None
+
+    def decode(self, name: str, code: int) -> str:
+        """Option for an integer code from ``encode``."""
+        values = self.field(name).values
+        if isinstance(code, int) and 0 <= code < len(values):
+            return values[code]
+        raise ValueError(f"{code} is not a valid {name} code")
+
+    def invalid_fields(self, values: Dict[str, str], names: Optional[Iterable[str]] = None) -> List[str]:
+        """Names of vocabulary fields in ``values`` holding an unknown option."""
+        names = self.fields if names is None else names
+        return [name for name in names
+                if name in values and values[name] not in self.fields[name].codes]
+
+_default_vocabulary: Optional[Vocabulary] = None
+
+def get_vocabulary() -> Vocabulary:
+    """
+    The shared vocabulary, loaded once.
+
+    Read from ``ProfileConfig.vocabulary_path`` (``APEX_VOCABULARY``) if
+    set, otherwise from the bundled file.
+    """
+    global _default_vocabulary
+    if _default_vocabulary is None:
+        _default_vocabulary = Vocabulary.from_file(config.profile.vocabulary_path or DEFAULT_VOCABULARY_PATH)
+    return _default_vocabulary
@@ -4,8 +4,66 @@ Core package initialization.
 
 from .profile_manager import ProfileManager
 from .prompt_generator import PromptGenerator
+from .storage import (ProfileStore, JSONDirectoryStore, ShardedDirectoryStore, SQLiteProfileStore, create_store,
+                      migrate_to_sharded)
+from .catalog import ProfileCatalog
+from .dedup import ContentIndex, content_hash
+from .photo_store import ReferencePhotoStore, UploadTooLargeError
+from .agentic_loop import APEXGenerator, LoopBudget, GenerationResult
+from .scheduler import CandidateScheduler
+from .backends import (StylePlanner, ImageGenerator, ImageJudge, StylePlan, GeneratedImage,
+                       JudgeVerdict, TemplateStylePlanner, StubImageGenerator, StubImageJudge)
+from .vlm_judge import VLMJudgeClient, JudgeError
+from .judge_cache import JudgeCache, CachingJudge
+from .result_cache import GenerationResultCache, CachingImageGenerator
+from .instrumentation import Instrumentation, get_instrumentation
 
 __all__ = [
     "ProfileManager",
-    "PromptGenerator"
+    "PromptGenerator",
+    "ProfileStore",
+    "JSONDirectoryStore",
+    "ShardedDirectoryStore",
+    "SQLiteProfileStore",
+    "create_store",
+    "migrate_to_sharded",
+    "ProfileCatalog",
+    "ContentIndex",
+    "content_hash",
+    "AsyncProfileWriter",
+    "ProfileIndex",
+    "ReferencePhotoStore",
+    "UploadTooLargeError",
+    "APEXGenerator",
+    "LoopBudget",
+    "GenerationResult",
+    "CandidateScheduler",
+    "StylePlanner",
+    "ImageGenerator",
+    "ImageJudge",
+    "StylePlan",
+    "GeneratedImage",
+    "JudgeVerdict",
+    "TemplateStylePlanner",
+    "StubImageGenerator",
+    "StubImageJudge",
+    "VLMJudgeClient",
+    "JudgeError",
+    "JudgeCache",
+    "CachingJudge",
+    "GenerationResultCache",
+    "CachingImageGenerator",
+    "Instrumentation",
+    "get_instrumentation"
 ]
+
+def __getattr__(name):
+    # The asyncio write queue is only needed by async front ends
+    if name == "AsyncProfileWriter":
+        from .write_queue import AsyncProfileWriter
+        return AsyncProfileWriter
+    # The similarity index needs NumPy
+    if name == "ProfileIndex":
+        from .similarity import ProfileIndex
+        return ProfileIndex
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,149 @@
+"""
+Agentic generate-judge-refine loop.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List
+from .backends import (StylePlanner, ImageGenerator, ImageJudge, StylePlan, GeneratedImage,
+                       JudgeVerdict, TemplateStylePlanner, StubImageGenerator, StubImageJudge)
+from .instrumentation import get_instrumentation
+
+# Reasons the loop stops
+STOP_ACCEPTED = "accepted"
+STOP_MAX_ITERATIONS = "max_iterations"
+STOP_NO_IMPROVEMENT = "no_improvement"
+STOP_TIME_BUDGET = "time_budget"
+STOP_ITERATION_TIMEOUT = "iteration_timeout"
+STOP_COMPUTE_BUDGET = "compute_budget"
+
+@dataclass
+class LoopBudget:
+    """Limits on one ``APEXGenerator.generate`` run (None means unlimited)."""
+    max_iterations: int = 5
+    max_seconds: Optional[float] = None
+    max_seconds_per_iteration: Optional[float] = None
+    max_compute_units: Optional[float] = None
+
+@dataclass
+class IterationRecord:
+    """What happened in one loop iteration."""
+    iteration: int
+    prompt: str
+    seed: int
+    score: float
+    feedback: str
+    generation_seconds: float
+    judge_seconds: float
+    compute_units: float
+
+@dataclass
+class GenerationResult:
+    """Outcome of a generate-judge-refine run."""
+    accepted: bool
+    stop_reason: str
+    image: Optional[GeneratedImage]
+    verdict: Optional[JudgeVerdict]
+    plan: StylePlan
+    iterations: List[IterationRecord] = field(default_factory=list)
+    total_seconds: float = 0.0
+    total_compute_units: float = 0.0
+
+class APEXGenerator:
+    """
+    Runs the planner, generator and judge until a portrait is accepted.
+
+    Each iteration generates one candidate from the current plan, scores it
+    and, unless it clears ``accept_threshold``, asks the planner to refine
+    the plan from the verdict. The loop stops early when the best score has
+    not improved by ``min_improvement`` for ``patience`` iterations, or when
+    the time or compute budget would be exceeded. Defaults to the
+    deterministic stub backends, so it runs offline.
+    """
+
+    def __init__(self, planner: Optional[StylePlanner] = None,
+                 generator: Optional[ImageGenerator] = None,
+                 judge: Optional[ImageJudge] = None,
+                 accept_threshold: float = 0.85,
+                 min_improvement: float = 0.01,
+                 patience: int = 2,
+                 budget: Optional[LoopBudget] = None,
+                 base_seed: int = 0):
+        self.planner = planner or TemplateStylePlanner()
+        instrumentation = get_instrumentation()
+        self.generator = instrumentation.instrument(generator or StubImageGenerator())
+        self.judge = instrumentation.instrument(judge or StubImageJudge())
+        self.accept_threshold = accept_threshold
+        self.min_improvement = min_improvement
+        self.patience = patience
+        self.budget = budget or LoopBudget()
+        self.base_seed = base_seed
+
+    def generate(self, preferences: Dict[str, Any]) -> GenerationResult:
+        """Run the loop for one set of preferences."""
+        budget = self.budget
+        start = time.perf_counter()
+        plan = self.planner.plan(preferences)
+        result = GenerationResult(accepted=False, stop_reason=STOP_MAX_ITERATIONS,
+                                  image=None, verdict=None, plan=plan)
+        stale_iterations = 0
+        last_iteration_cost = 0.0
+
+        for iteration in range(budget.max_iterations):
+            # Don't start an iteration the remaining compute can't pay for
+            if (budget.max_compute_units is not None and iteration > 0 and
+                    result.total_compute_units + last_iteration_cost > budget.max_compute_units):
+                result.stop_reason = STOP_COMPUTE_BUDGET
+                break
+
+            seed = self.base_seed + iteration
+            iteration_start = time.perf_counter()
+            image = self.generator.generate(plan.prompt, plan.negative_prompt, seed,
+                                            preferences.get("resolution"))
+            judge_start = time.perf_counter()
+            verdict = self.judge.judge(image, preferences)
+            iteration_end = time.perf_counter()
+
+            last_iteration_cost = image.compute_units + verdict.compute_units
+            result.total_compute_units += last_iteration_cost
+            result.iterations.append(IterationRecord(
+                iteration=iteration,
+                prompt=plan.prompt,
+                seed=seed,
+                score=verdict.score,
+                feedback=verdict.feedback,
+                generation_seconds=judge_start - iteration_start,
+                judge_seconds=iteration_end - judge_start,
+                compute_units=last_iteration_cost
+            ))
+
+            best_score = result.verdict.score if result.verdict else None
+            if best_score is None or verdict.score > best_score:
+                improved = best_score is None or verdict.score - best_score >= self.min_improvement
+                result.image, result.verdict, result.plan = image, verdict, plan
+            else:
+                improved = False
+            stale_iterations = 0 if improved else stale_iterations + 1
+
+            if verdict.score >= self.accept_threshold:
+                result.accepted = True
+                result.stop_reason = STOP_ACCEPTED
+                break
+            if stale_iterations >= self.patience:
+                result.stop_reason = STOP_NO_IMPROVEMENT
+                break
+            if (budget.max_seconds_per_iteration is not None and
+                    iteration_end - iteration_start > budget.max_seconds_per_iteration):
+                result.stop_reason = STOP_ITERATION_TIMEOUT
+                break
+            if budget.max_seconds is not None:
+                # Stop if another iteration like this one would overrun
+                elapsed = iteration_end - start
+                if elapsed + (iteration_end - iteration_start) > budget.max_seconds:
+                    result.stop_reason = STOP_TIME_BUDGET
+                    break
+
+            plan = self.planner.refine(plan, verdict)
+
+        result.total_seconds = time.perf_counter() - start
+        return result
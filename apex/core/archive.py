@@ -0,0 +1,288 @@
+"""
+Single-file archives of saved profiles and their reference photos.
+
+An archive is an uncompressed tar stream whose members are written in
+this order, so it can be produced and consumed without seeking:
+
+    blobs/<sha256><ext>                  reference photos first used by the next chunk
+    profiles/<nnnnnn>-<sha256>.jsonl.gz  gzipped JSON lines {"id": ..., "profile": {...}}
+    ...
+    manifest.json                        format, version and every chunk with its count
+
+Each member is named after the SHA-256 of its contents, so it is verified
+on its own as it is read, and the manifest at the end detects truncation.
+"""
+
+import gzip
+import hashlib
+import io
+import os
+import re
+import tarfile
+import tempfile
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from ..models.profile import ProfileData
+from .photo_store import PHOTO_EXTENSIONS
+from ..utils.serialization import dumps_json, loads_json
+from ..utils.validators import Validator
+
+ARCHIVE_FORMAT = "apex-profiles"
+ARCHIVE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+COPY_CHUNK_SIZE = 1024 * 1024
+SHA256_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+class ArchiveError(ValueError):
+    """Raised for archives that are corrupt, truncated or of an unknown format."""
+
+def _ordered(executor: ThreadPoolExecutor, func, items: Iterable, window: int) -> Iterator:
+    """``executor.map`` with at most ``window`` tasks in flight, results in order."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def _chunks(ids: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for profile_id in ids:
+        chunk.append(profile_id)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _add_bytes(tar: tarfile.TarFile, name: str, data: bytes, mtime: float):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(mtime)
+    tar.addfile(info, io.BytesIO(data))
+
+def export_profiles(profile_manager, path: str, profile_ids: Optional[Iterable[str]] = None,
+                    chunk_size: int = 5000, workers: Optional[int] = None,
+                    include_photos: bool = True, compresslevel: int = 6) -> Dict[str, Any]:
+    """
+    Write profiles (default: all) and their reference photos to an archive.
+
+    Chunks are loaded, serialized and compressed by ``workers`` threads
+    while the archive is written in order. The archive is written to a
+    temporary file and renamed, so ``path`` only ever holds a complete one.
+    Returns counts of what was written.
+    """
+    workers = workers or min(8, (os.cpu_count() or 1) + 2)
+    ids = profile_manager.iter_profiles() if profile_ids is None else profile_ids
+
+    def pack(chunk: List[str]) -> Tuple[bytes, int, List[Tuple[str, str]]]:
+        lines = []
+        photos = []
+        for profile_id in chunk:
+            data = profile_manager.load_profile(profile_id)
+            if data is None:
+                continue
+            lines.append(dumps_json({"id": profile_id, "profile": data}))
+            additional = data.get("additional_info") or {}
+            if include_photos and additional.get("reference_photo_sha256") and additional.get("reference_photo"):
+                photos.append((additional["reference_photo_sha256"], additional["reference_photo"]))
+        payload = gzip.compress(b"\n".join(lines) + b"\n", compresslevel=compresslevel, mtime=0) if lines else b""
+        return payload, len(lines), photos
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    stats = {"profiles": 0, "chunks": 0, "blobs": 0, "missing_photos": 0}
+    manifest_chunks = []
+    written_blobs: Set[str] = set()
+    now = time.time()
+    try:
+        with os.fdopen(fd, "wb") as f, tarfile.open(fileobj=f, mode="w|", format=tarfile.PAX_FORMAT) as tar, \
+                ThreadPoolExecutor(workers) as executor:
+            for payload, count, photos in _ordered(executor, pack, _chunks(ids, chunk_size), workers * 2):
+                if not count:
+                    continue
+                # Photos precede the profiles that use them, so an import
+                # never saves a profile whose photo hasn't arrived yet
+                for sha256, photo_path in photos:
+                    if sha256 in written_blobs:
+                        continue
+                    try:
+                        photo = open(photo_path, "rb")
+                    except OSError:
+                        stats["missing_photos"] += 1
+                        continue
+                    with photo:
+                        info = tarfile.TarInfo(f"blobs/{sha256}{os.path.splitext(photo_path)[1].lower()}")
+                        info.size = os.fstat(photo.fileno()).st_size
+                        info.mtime = int(now)
+                        tar.addfile(info, photo)
+                    written_blobs.add(sha256)
+                    stats["blobs"] += 1
+
+                digest = hashlib.sha256(payload).hexdigest()
+                name = f"profiles/{stats['chunks']:06d}-{digest}.jsonl.gz"
+                _add_bytes(tar, name, payload, now)
+                manifest_chunks.append({"name": name, "profiles": count})
+                stats["chunks"] += 1
+                stats["profiles"] += count
+
+            manifest = {
+                "format": ARCHIVE_FORMAT,
+                "version": ARCHIVE_VERSION,
+                "created_at": now,
+                "profiles": stats["profiles"],
+                "blobs": stats["blobs"],
+                "chunks": manifest_chunks
+            }
+            _add_bytes(tar, MANIFEST_NAME, dumps_json(manifest, indent=True), now)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    stats["bytes"] = os.path.getsize(path)
+    return stats
+
+def _verified_payload(member_name: str, data: bytes, expected: str) -> bytes:
+    if hashlib.sha256(data).hexdigest() != expected:
+        raise ArchiveError(f"Checksum mismatch for {member_name}")
+    return data
+
+def _store_blob(photo_store, member_name: str, fileobj, sha256: str, extension: str) -> bool:
+    """Copy a photo into the store, verifying its hash; False if already present."""
+    stored_path = photo_store.path_for(sha256, extension)
+    if os.path.exists(stored_path):
+        return False
+    directory = os.path.dirname(stored_path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload.", suffix=".tmp")
+    try:
+        digest = hashlib.sha256()
+        with os.fdopen(fd, "wb") as dst:
+            while True:
+                chunk = fileobj.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                dst.write(chunk)
+        if digest.hexdigest() != sha256:
+            raise ArchiveError(f"Checksum mismatch for {member_name}")
+        os.replace(tmp_path, stored_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return True
+
+def import_profiles(profile_manager, path: str, workers: Optional[int] = None,
+                    resume: bool = True, progress_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load an archive written by ``export_profiles`` into a manager.
+
+    Every member is checked against its checksum before anything from it is
+    saved; chunks are decompressed and validated by ``workers`` threads and
+    saved in archive order. Finished chunks are recorded in
+    ``progress_path`` (default ``<path>.progress``), so with ``resume`` an
+    interrupted import skips them when run again; the file is removed once
+    the import completes. Reference photo paths are rewritten to the
+    manager's photo store. Records whose id is not a plain profile file
+    name are counted as invalid and skipped.
+
+    Raises:
+        ArchiveError: for a corrupt, truncated or unrecognized archive.
+    """
+    workers = workers or min(8, (os.cpu_count() or 1) + 2)
+    progress_path = progress_path or f"{path}.progress"
+    photo_store = profile_manager.photo_store
+    done: Set[str] = set()
+    if resume and os.path.exists(progress_path):
+        with open(progress_path, "r", encoding="utf-8") as f:
+            done = {line.strip() for line in f if line.strip()}
+    stats = {"profiles": 0, "chunks": 0, "skipped_chunks": 0, "blobs": 0, "invalid": 0}
+
+    def unpack(item: Tuple[str, bytes]) -> Tuple[str, List[str], List[ProfileData], int]:
+        name, payload = item
+        ids, profiles, invalid = [], [], 0
+        for line in gzip.decompress(payload).splitlines():
+            if not line:
+                continue
+            try:
+                record = loads_json(line)
+                profile = ProfileData.from_dict(record["profile"])
+                profile_id = record["id"]
+            except (ValueError, KeyError, TypeError):
+                invalid += 1
+                continue
+            # The id becomes a file name in the profiles directory
+            if not Validator.validate_profile_id(profile_id):
+                invalid += 1
+                continue
+            additional = profile.additional_info
+            if additional.reference_photo_sha256 and additional.reference_photo:
+                local = photo_store.path_for(additional.reference_photo_sha256,
+                                             os.path.splitext(additional.reference_photo)[1].lower())
+                if os.path.exists(local):
+                    additional.reference_photo = local
+            ids.append(profile_id)
+            profiles.append(profile)
+        return name, ids, profiles, invalid
+
+    def members(tar: tarfile.TarFile) -> Iterator[Tuple[str, bytes]]:
+        """Yield verified profile chunks, storing blobs and the manifest on the way."""
+        for member in tar:
+            name = member.name
+            if name.startswith("blobs/") and member.isfile():
+                sha256, extension = os.path.splitext(name[len("blobs/"):])
+                # Both parts become a path in the photo store
+                if not SHA256_PATTERN.fullmatch(sha256) or extension not in PHOTO_EXTENSIONS:
+                    raise ArchiveError(f"Unsafe blob name in archive: {name!r}")
+                if _store_blob(photo_store, name, tar.extractfile(member), sha256, extension):
+                    stats["blobs"] += 1
+            elif name.startswith("profiles/") and member.isfile():
+                seen.append(name)
+                if name in done:
+                    stats["skipped_chunks"] += 1
+                    continue
+                expected = os.path.basename(name).split(".", 1)[0].partition("-")[2]
+                yield name, _verified_payload(name, tar.extractfile(member).read(), expected)
+            elif name == MANIFEST_NAME:
+                try:
+                    manifest.update(loads_json(tar.extractfile(member).read()))
+                except (ValueError, TypeError) as e:
+                    raise ArchiveError(f"Corrupt manifest in {path}: {e}") from e
+
+    seen: List[str] = []
+    manifest: Dict[str, Any] = {}
+    try:
+        tar = tarfile.open(path, mode="r|")
+    except tarfile.TarError as e:
+        raise ArchiveError(f"Not a profile archive: {e}") from e
+    with tar, ThreadPoolExecutor(workers) as executor, open(progress_path, "a", encoding="utf-8") as progress:
+        try:
+            for name, ids, profiles, invalid in _ordered(executor, unpack, members(tar), workers * 2):
+                profile_manager.save_profiles(profiles, batch_size=max(len(profiles), 1), filenames=ids)
+                progress.write(name + "\n")
+                progress.flush()
+                os.fsync(progress.fileno())
+                stats["chunks"] += 1
+                stats["profiles"] += len(profiles)
+                stats["invalid"] += invalid
+        except (tarfile.TarError, EOFError, gzip.BadGzipFile, zlib.error) as e:
+            raise ArchiveError(f"Could not read archive {path}: {e}") from e
+
+    if manifest.get("format") != ARCHIVE_FORMAT:
+        raise ArchiveError(f"Archive {path} is truncated or has no manifest")
+    if manifest.get("version") != ARCHIVE_VERSION:
+        raise ArchiveError(f"Unsupported archive version: {manifest.get('version')}")
+    if [chunk["name"] for chunk in manifest.get("chunks", [])] != seen:
+        raise ArchiveError(f"Archive {path} does not match its manifest")
+    os.remove(progress_path)
+    return stats
@@ -0,0 +1,170 @@
+"""
+Backend interfaces for the generate-judge-refine loop, with local stubs.
+
+Real deployments plug in an LLM style planner, a Flux generator and a VLM
+judge. The stub backends are deterministic and dependency-free so the loop
+runs offline and in tests.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List
+from .prompt_generator import PromptGenerator
+
+@dataclass
+class StylePlan:
+    """A prompt ready for generation, derived from user preferences."""
+    prompt: str
+    negative_prompt: str
+    preferences: Dict[str, Any]
+    notes: List[str] = field(default_factory=list)
+
+@dataclass
+class GeneratedImage:
+    """A generated candidate portrait."""
+    data: bytes
+    prompt: str
+    seed: int
+    format: str = "ppm"
+    compute_units: float = 0.0  # backend-defined cost, e.g. GPU-seconds
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+@dataclass
+class JudgeVerdict:
+    """A judge's assessment of a candidate, with scores in [0, 1]."""
+    score: float
+    feedback: str = ""
+    criteria: Dict[str, float] = field(default_factory=dict)
+    compute_units: float = 0.0
+
+class StylePlanner:
+    """Turns preferences into a plan and refines it from judge feedback."""
+
+    def plan(self, preferences: Dict[str, Any]) -> StylePlan:
+        """Create the initial plan."""
+        raise NotImplementedError
+
+    def refine(self, plan: StylePlan, verdict: JudgeVerdict) -> StylePlan:
+        """Improve a plan using the judge's verdict."""
+        raise NotImplementedError
+
+    def emphasize(self, plan: StylePlan, additions: List[str]) -> StylePlan:
+        """Derive a plan whose prompt also stresses ``additions``."""
+        additions = [addition for addition in additions if addition not in plan.prompt]
+        return StylePlan(
+            prompt=", ".join([plan.prompt] + additions),
+            negative_prompt=plan.negative_prompt,
+            preferences=plan.preferences,
+            notes=plan.notes + additions
+        )
+
+class ImageGenerator:
+    """Generates a candidate image for a prompt."""
+
+    def generate(self, prompt: str, negative_prompt: str, seed: int,
+                 resolution: Optional[str] = None) -> GeneratedImage:
+        """Generate one image."""
+        raise NotImplementedError
+
+class ImageJudge:
+    """Scores a candidate image against the user's preferences."""
+
+    def judge(self, image: GeneratedImage, preferences: Dict[str, Any]) -> JudgeVerdict:
+        """Score one image."""
+        raise NotImplementedError
+
+# Preference fields the stub judge checks for in a prompt
+JUDGED_FIELDS = ("attire", "background", "vibe", "lighting", "mood")
+
+class TemplateStylePlanner(StylePlanner):
+    """
+    Planner built on PromptGenerator.
+
+    Refinement rebuilds the prompt with the aspects the judge flagged as
+    missing appended, within the prompt token budget, so it converges with
+    ``StubImageJudge`` without any model. ``emphasize`` goes through the
+    same budget.
+    """
+
+    def __init__(self, prompt_generator: Optional[PromptGenerator] = None):
+        self.prompt_generator = prompt_generator or PromptGenerator()
+
+    def plan(self, preferences: Dict[str, Any]) -> StylePlan:
+        return StylePlan(
+            prompt=self.prompt_generator.generate_prompt(preferences),
+            negative_prompt=self.prompt_generator.generate_negative_prompt(),
+            preferences=preferences
+        )
+
+    def refine(self, plan: StylePlan, verdict: JudgeVerdict) -> StylePlan:
+        missing = [name for name, score in verdict.criteria.items() if score < 1.0]
+        additions = [
+            f"emphasis on {plan.preferences[name]} {name}"
+            for name in missing if plan.preferences.get(name)
+        ]
+        if not additions:
+            return plan
+        return self.emphasize(plan, additions)
+
+    def emphasize(self, plan: StylePlan, additions: List[str]) -> StylePlan:
+        """Rebuild the prompt with ``additions`` as notes, within the token budget."""
+        notes = plan.notes + [addition for addition in additions
+                              if addition not in plan.notes and addition not in plan.prompt]
+        return StylePlan(
+            prompt=self.prompt_generator.generate_emphasized_prompt(plan.preferences, notes),
+            negative_prompt=plan.negative_prompt,
+            preferences=plan.preferences,
+            notes=notes
+        )
+
+class StubImageGenerator(ImageGenerator):
+    """Deterministic generator producing a tiny image derived from the prompt."""
+
+    def __init__(self, compute_units: float = 1.0, size: int = 8):
+        self.compute_units = compute_units
+        self.size = size
+
+    def generate(self, prompt: str, negative_prompt: str, seed: int,
+                 resolution: Optional[str] = None) -> GeneratedImage:
+        pixels = bytearray()
+        counter = 0
+        while len(pixels) < self.size * self.size * 3:
+            pixels += hashlib.sha256(f"{seed}:{counter}:{prompt}".encode("utf-8")).digest()
+            counter += 1
+        header = f"P6 {self.size} {self.size} 255\n".encode("ascii")
+        return GeneratedImage(
+            data=header + bytes(pixels[:self.size * self.size * 3]),
+            prompt=prompt,
+            seed=seed,
+            compute_units=self.compute_units,
+            metadata={"resolution": resolution}
+        )
+
+class StubImageJudge(ImageJudge):
+    """
+    Deterministic judge that checks the prompt mentions each preference.
+
+    Each of attire, background, vibe, lighting and mood scores 1.0 if its
+    value appears in the prompt and 0.5 otherwise; the overall score is
+    their mean with a small image-dependent jitter.
+    """
+
+    def __init__(self, jitter: float = 0.05, compute_units: float = 0.1):
+        self.jitter = jitter
+        self.compute_units = compute_units
+
+    def judge(self, image: GeneratedImage, preferences: Dict[str, Any]) -> JudgeVerdict:
+        prompt = image.prompt.lower()
+        criteria = {}
+        for name in JUDGED_FIELDS:
+            value = preferences.get(name)
+            if value:
+                criteria[name] = 1.0 if value.lower() in prompt else 0.5
+        base = sum(criteria.values()) / len(criteria) if criteria else 1.0
+        noise = hashlib.sha256(image.data).digest()[0] / 255.0
+        score = max(0.0, min(1.0, base - self.jitter * noise))
+
+        missing = [name for name, value in criteria.items() if value < 1.0]
+        feedback = f"Missing: {', '.join(missing)}" if missing else "All requested aspects present"
+        return JudgeVerdict(score=score, feedback=feedback, criteria=criteria,
+                            compute_units=self.compute_units)
@@ -0,0 +1,183 @@
+"""
+In-memory catalog of a JSON profile directory.
+"""
+
+import os
+import threading
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+from ..utils.fs_watch import DirectoryWatcher, create_watcher
+from ..utils.serialization import loads_json
+from .storage import ProfileStore, JSONDirectoryStore, INDEXED_FIELDS, SortKey, extract_index_fields
+
+# (st_mtime_ns, st_size, st_ino) of the file a cached entry was read from
+Signature = Tuple[int, int, int]
+
+def _signature(st: os.stat_result) -> Signature:
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def _copy(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a profile dict deep enough that callers can't alter the cache."""
+    return {key: dict(value) if isinstance(value, dict) else value for key, value in data.items()}
+
+class ProfileCatalog(ProfileStore):
+    """
+    Serves a ``JSONDirectoryStore`` from memory.
+
+    The directory is read once; afterwards every call first applies the
+    changes reported by a ``DirectoryWatcher`` (inotify on Linux, periodic
+    rescans elsewhere), so files written or removed by other processes are
+    picked up without listing or parsing the whole directory again. A file
+    is only re-read when its mtime, size or inode differ from the cached
+    copy. Writes made through the catalog update it immediately.
+    """
+
+    def __init__(self, store: JSONDirectoryStore, watcher: Optional[DirectoryWatcher] = None,
+                 poll_interval: float = 2.0):
+        self.store = store
+        self.profiles_dir = store.profiles_dir
+        self.watcher = watcher if watcher is not None else create_watcher(self.profiles_dir, poll_interval)
+        # profile id -> (signature, data or None if unreadable, index fields)
+        self._entries: Dict[str, Tuple[Signature, Optional[Dict[str, Any]], Dict[str, Optional[str]]]] = {}
+        self._lock = threading.RLock()
+        self.refresh()
+
+    @staticmethod
+    def _is_profile(name: str) -> bool:
+        return name.endswith(".json") and not name.startswith(".")
+
+    def _read(self, profile_id: str, known: Optional[Signature] = None) -> bool:
+        """(Re)load one file if it changed; returns False if it no longer exists."""
+        try:
+            with open(os.path.join(self.profiles_dir, profile_id), "rb") as f:
+                # fstat the open file so the signature matches what is read
+                signature = _signature(os.fstat(f.fileno()))
+                if signature == known:
+                    return True
+                raw = f.read()
+        except FileNotFoundError:
+            return False
+        except OSError:
+            raw, signature = None, None
+        try:
+            data = loads_json(raw) if raw is not None else None
+        except ValueError:
+            data = None
+        fields = extract_index_fields(data) if isinstance(data, dict) else {}
+        self._entries[profile_id] = (signature, data if isinstance(data, dict) else None, fields)
+        return True
+
+    def refresh(self) -> None:
+        """Apply changes made to the directory since the last refresh."""
+        with self._lock:
+            changed = self.watcher.changes()
+            if changed is None:
+                self._rescan()
+                return
+            for name in changed:
+                if not self._is_profile(name):
+                    continue
+                entry = self._entries.get(name)
+                if not self._read(name, entry[0] if entry else None):
+                    self._entries.pop(name, None)
+
+    def _rescan(self):
+        """Reconcile the whole directory, re-reading only changed files."""
+        seen = set()
+        with os.scandir(self.profiles_dir) as it:
+            for dir_entry in it:
+                name = dir_entry.name
+                if not self._is_profile(name):
+                    continue
+                entry = self._entries.get(name)
+                try:
+                    if entry is not None and entry[0] == _signature(dir_entry.stat()):
+                        seen.add(name)
+                        continue
+                except OSError:
+                    continue
+                if self._read(name):
+                    seen.add(name)
+        for name in [name for name in self._entries if name not in seen]:
+            del self._entries[name]
+
+    def _remember(self, profile_id: str, data: Dict[str, Any]):
+        """Cache a profile just written through the catalog."""
+        try:
+            signature = _signature(os.stat(self.store.location(profile_id)))
+        except OSError:
+            self._entries.pop(profile_id, None)
+            return
+        self._entries[profile_id] = (signature, _copy(data), extract_index_fields(data))
+
+    def location(self, profile_id: str) -> str:
+        return self.store.location(profile_id)
+
+    def save(self, profile_id: str, data: Dict[str, Any]) -> str:
+        with self._lock:
+            location = self.store.save(profile_id, data)
+            self._remember(profile_id, data)
+        return location
+
+    def save_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        items = list(items)
+        with self._lock:
+            locations = self.store.save_many(items)
+            for profile_id, data in items:
+                self._remember(profile_id, data)
+        return locations
+
+    def load(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self.refresh()
+            entry = self._entries.get(profile_id)
+        if entry is None or entry[1] is None:
+            return None
+        return _copy(entry[1])
+
+    def delete(self, profile_id: str) -> bool:
+        with self._lock:
+            deleted = self.store.delete(profile_id)
+            self._entries.pop(profile_id, None)
+        return deleted
+
+    def exists(self, profile_id: str) -> bool:
+        with self._lock:
+            self.refresh()
+            return profile_id in self._entries
+
+    def list_ids(self) -> List[str]:
+        with self._lock:
+            self.refresh()
+            return list(self._entries)
+
+    def count(self) -> int:
+        with self._lock:
+            self.refresh()
+            return len(self._entries)
+
+    def sort_keys(self) -> List[SortKey]:
+        with self._lock:
+            self.refresh()
+            return [(fields.get("timestamp") or "", profile_id)
+                    for profile_id, (_, data, fields) in self._entries.items() if data is not None]
+
+    def query(self, filters: Optional[Dict[str, str]] = None, limit: Optional[int] = None,
+              offset: int = 0, newest_first: bool = True) -> List[str]:
+        filters = filters or {}
+        for key in filters:
+            if key not in INDEXED_FIELDS:
+                raise ValueError(f"Cannot filter on unindexed field: {key}")
+        with self._lock:
+            self.refresh()
+            matches = [
+                (fields.get("timestamp") or "", profile_id)
+                for profile_id, (_, data, fields) in self._entries.items()
+                if data is not None and all(fields.get(key) == value for key, value in filters.items())
+            ]
+        matches.sort(reverse=newest_first)
+        ids = [profile_id for _, profile_id in matches[offset:]]
+        return ids if limit is None else ids[:limit]
+
+    def close(self) -> None:
+        self.watcher.close()
+        self.store.close()
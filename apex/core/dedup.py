@@ -0,0 +1,204 @@
+"""
+Duplicate detection for saved profiles.
+
+Two profiles are duplicates when their canonical content matches: basic
+info, advanced settings, custom notes (with case and whitespace
+normalized) and the reference photo's checksum. Metadata such as the
+timestamp, the preset name and the generated prompt are left out.
+``ContentIndex`` maps each content hash to the profile that first had it
+and records which saved profiles are compact revisions of another.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from ..models.profile import AdvancedSettings, upgrade_profile_dict
+
+# "off" saves every profile in full; "reference" returns the existing
+# profile instead of saving a duplicate; "revision" saves a duplicate as a
+# small record pointing at the existing profile
+DEDUP_MODES = ("off", "reference", "revision")
+
+# Index file kept in the profiles directory
+INDEX_FILE = ".content-index.db"
+
+# Key marking a saved record as a revision, holding the id of its base profile
+REVISION_KEY = "revision_of"
+
+# Sections a revision leaves out when they equal its base profile's
+REVISION_SHARED = ("advanced_settings", "generated_prompt")
+
+BASIC_FIELDS = ("purpose", "attire", "background", "vibe")
+_ADVANCED_DEFAULTS = {name: field.default for name, field in AdvancedSettings.__dataclass_fields__.items()}
+
+def normalize_notes(notes: Optional[str]) -> str:
+    """Collapse whitespace and case so cosmetically different notes compare equal."""
+    if not notes:
+        return ""
+    return " ".join(notes.split()).casefold()
+
+def canonical_content(data: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a profile dict that make it semantically distinct."""
+    data = upgrade_profile_dict(data)
+    basic = data.get("basic_info") or {}
+    advanced = data.get("advanced_settings") or {}
+    additional = data.get("additional_info") or {}
+    return {
+        "basic_info": {name: basic.get(name) for name in BASIC_FIELDS},
+        "advanced_settings": {name: advanced.get(name, default) for name, default in _ADVANCED_DEFAULTS.items()},
+        "custom_notes": normalize_notes(additional.get("custom_notes")),
+        "reference_photo_sha256": additional.get("reference_photo_sha256")
+    }
+
+def content_hash(data: Dict[str, Any]) -> str:
+    """sha256 hex digest of ``canonical_content``."""
+    canonical = json.dumps(canonical_content(data), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def is_revision(data: Dict[str, Any]) -> bool:
+    return REVISION_KEY in data
+
+def make_revision(data: Dict[str, Any], base_id: str, base: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The compact record saved for a duplicate of ``base``.
+
+    Sections equal to the base's are left out; basic and additional info
+    and metadata are kept so listings and queries still see them.
+    """
+    revision = {key: value for key, value in data.items()
+                if not (key in REVISION_SHARED and value == base.get(key))}
+    revision[REVISION_KEY] = base_id
+    return revision
+
+def expand_revision(revision: Dict[str, Any], base: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild the full profile dict from a revision and its base."""
+    data = {key: value for key, value in base.items() if key != REVISION_KEY}
+    data.update((key, value) for key, value in revision.items() if key != REVISION_KEY)
+    return data
+
+class ContentIndex:
+    """
+    SQLite index of content hashes and revisions.
+
+    The ``hashes`` table maps a content hash to the full profile holding
+    that content; ``revisions`` maps each revision to its base profile.
+    Entries can go stale when profiles are changed by something that
+    doesn't update the index, so callers check a hit still exists. Safe to
+    share between processes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection for the current process (reopened after a fork)."""
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS hashes ("
+                    " hash TEXT PRIMARY KEY,"
+                    " profile_id TEXT NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_hashes_profile ON hashes (profile_id)")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS revisions ("
+                    " id TEXT PRIMARY KEY,"
+                    " base_id TEXT NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_revisions_base ON revisions (base_id)")
+                conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    @property
+    def built(self) -> bool:
+        """Whether existing profiles have been indexed (see ``build``)."""
+        with self._lock:
+            row = self._connection().execute("SELECT value FROM meta WHERE key = 'built'").fetchone()
+        return row is not None
+
+    def build(self, profiles: Iterable[Tuple[str, Optional[Dict[str, Any]]]]) -> int:
+        """Index (profile_id, stored data) pairs; the first profile with a hash keeps it."""
+        hashes = []
+        revisions = []
+        for profile_id, data in profiles:
+            if not isinstance(data, dict):
+                continue
+            if is_revision(data):
+                revisions.append((profile_id, data[REVISION_KEY]))
+                continue
+            try:
+                hashes.append((content_hash(data), profile_id))
+            except ValueError:
+                continue
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO hashes (hash, profile_id) VALUES (?, ?)", hashes)
+                conn.executemany("INSERT OR REPLACE INTO revisions (id, base_id) VALUES (?, ?)", revisions)
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('built', '1')")
+        return len(hashes)
+
+    def lookup(self, digest: str) -> Optional[str]:
+        """The profile holding content ``digest``, if any."""
+        with self._lock:
+            row = self._connection().execute("SELECT profile_id FROM hashes WHERE hash = ?", (digest,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, items: Iterable[Tuple[str, str]], revisions: Iterable[Tuple[str, str]] = ()):
+        """Record (hash, profile_id) owners and (revision_id, base_id) pairs."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO hashes (hash, profile_id) VALUES (?, ?)", items)
+                conn.executemany("INSERT OR REPLACE INTO revisions (id, base_id) VALUES (?, ?)", revisions)
+
+    def base_of(self, revision_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT base_id FROM revisions WHERE id = ?", (revision_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def revisions_of(self, base_id: str) -> List[str]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT id FROM revisions WHERE base_id = ? ORDER BY id", (base_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def transfer(self, profile_id: str, heir: str):
+        """Make ``heir`` the owner of ``profile_id``'s hashes and revisions."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("UPDATE hashes SET profile_id = ? WHERE profile_id = ?", (heir, profile_id))
+                conn.execute("DELETE FROM revisions WHERE id = ?", (heir,))
+                conn.execute("UPDATE revisions SET base_id = ? WHERE base_id = ?", (heir, profile_id))
+
+    def remove(self, profile_id: str):
+        """Forget a profile, as a hash owner and as a revision."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM hashes WHERE profile_id = ?", (profile_id,))
+                conn.execute("DELETE FROM revisions WHERE id = ?", (profile_id,))
+
+    def close(self) -> None:
+        """Close this process's connection."""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
@@ -0,0 +1,256 @@
+"""
+Latency and outcome metrics for the profile, prompt and generation pipeline.
+
+``Instrumentation.instrument`` wraps a ``ProfileManager``,
+``PromptGenerator``, ``ImageGenerator`` or ``ImageJudge`` so each call is
+timed into the ``apex_stage_seconds`` histogram and counted; ``stage``
+times any other block of code. Spans are also emitted through OpenTelemetry
+when tracing is enabled and the ``opentelemetry-api`` package is installed.
+
+When metrics are disabled (the default) ``instrument`` returns objects
+unchanged and ``stage`` returns a shared no-op context manager, so the only
+cost left is that attribute lookup.
+"""
+
+import contextlib
+import functools
+import time
+from typing import Any, Dict, List, Optional, Sequence
+from ..config.settings import config
+from ..utils.metrics import MetricsRegistry
+from .backends import ImageGenerator, ImageJudge, GeneratedImage, JudgeVerdict
+from .profile_manager import ProfileManager
+from .prompt_generator import PromptGenerator
+
+_NULL_STAGE = contextlib.nullcontext()
+
+def _load_tracer():
+    """An OpenTelemetry tracer, or None if the API package is not installed."""
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return None
+    return trace.get_tracer("apex")
+
+class _StageMetrics:
+    """The histogram and error series of one stage, resolved once."""
+
+    __slots__ = ("name", "observe", "error")
+
+    def __init__(self, instrumentation: "Instrumentation", name: str):
+        self.name = name
+        self.observe = instrumentation.stage_seconds.labels(stage=name).observe
+        self.error = instrumentation.stage_errors.labels(stage=name).inc
+
+class _Stage:
+    """Times one block into the stage histogram (and a span when tracing)."""
+
+    __slots__ = ("metrics", "tracer", "start", "span")
+
+    def __init__(self, metrics: _StageMetrics, tracer):
+        self.metrics = metrics
+        self.tracer = tracer
+        self.span = None
+
+    def __enter__(self):
+        if self.tracer is not None:
+            self.span = self.tracer.start_as_current_span(f"apex.{self.metrics.name}")
+            self.span.__enter__()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.metrics.error()
+        if self.span is not None:
+            self.span.__exit__(exc_type, exc, tb)
+        return False
+
+class Instrumentation:
+    """Pipeline metrics held in a ``MetricsRegistry``."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None, enabled: bool = True,
+                 tracing: bool = False):
+        self.enabled = enabled
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self.tracer = _load_tracer() if enabled and tracing else None
+        if not enabled:
+            return
+        registry = self.registry
+        self.stage_seconds = registry.histogram(
+            "apex_stage_seconds", "Time spent in each pipeline stage.", ["stage"])
+        self.stage_errors = registry.counter(
+            "apex_stage_errors_total", "Pipeline stage calls that raised.", ["stage"])
+        self.profiles_created = registry.counter(
+            "apex_profiles_created_total", "Profiles built, by validation result.", ["result"])
+        self.profiles_saved = registry.counter(
+            "apex_profiles_saved_total", "Profiles written to storage.")
+        self.profile_save_failures = registry.counter(
+            "apex_profile_save_failures_total", "Profile saves that failed.")
+        self.prompts_generated = registry.counter(
+            "apex_prompts_generated_total", "Prompts built from preferences.")
+        self.images_generated = registry.counter(
+            "apex_images_generated_total", "Candidate images returned by the generator.")
+        self.judgements = registry.counter(
+            "apex_judgements_total", "Images scored by the judge.")
+        self.compute_units = registry.counter(
+            "apex_compute_units_total", "Backend compute units consumed.", ["stage"])
+        self.http_request_seconds = registry.histogram(
+            "apex_http_request_seconds", "API request latency.", ["method", "route", "status"])
+        self._stages: Dict[str, _StageMetrics] = {}
+
+    @classmethod
+    def from_config(cls, metrics_config) -> "Instrumentation":
+        """Create instrumentation from a ``MetricsConfig``."""
+        return cls(enabled=metrics_config.enabled, tracing=metrics_config.tracing)
+
+    def stage(self, name: str):
+        """Context manager timing a block as pipeline stage ``name``."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self._stage_metrics(name), self.tracer)
+
+    def _stage_metrics(self, name: str) -> _StageMetrics:
+        metrics = self._stages.get(name)
+        if metrics is None:
+            metrics = self._stages.setdefault(name, _StageMetrics(self, name))
+        return metrics
+
+    def render(self) -> str:
+        """The metrics in the Prometheus text format."""
+        return self.registry.render()
+
+    def instrument(self, obj):
+        """
+        Wrap a pipeline component.
+
+        Returns ``obj`` itself when disabled, and for objects of any other
+        type (such as duck-typed backends), which are left untimed.
+        """
+        if not self.enabled or getattr(obj, "_apex_instrumented", False):
+            return obj
+        if isinstance(obj, ProfileManager):
+            return self._instrument_profile_manager(obj)
+        if isinstance(obj, PromptGenerator):
+            return self._instrument_prompt_generator(obj)
+        if isinstance(obj, ImageGenerator):
+            return InstrumentedImageGenerator(obj, self)
+        if isinstance(obj, ImageJudge):
+            return InstrumentedImageJudge(obj, self)
+        return obj
+
+    def _wrap(self, obj, method: str, stage: str, on_result=None):
+        """Replace ``obj.method`` on the instance with a timed version."""
+        original = getattr(obj, method)
+        metrics = self._stage_metrics(stage)
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            with _Stage(metrics, self.tracer):
+                result = original(*args, **kwargs)
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        setattr(obj, method, timed)
+
+    def _instrument_profile_manager(self, manager: ProfileManager) -> ProfileManager:
+        self._wrap(manager, "create_profile", "create_profile",
+                   lambda result: self.profiles_created.inc(result="valid" if result[1] else "invalid"))
+        saved = self.profiles_saved.labels().inc
+        failed = self.profile_save_failures.labels().inc
+        for method, count in (("save_profile", lambda location: 1),
+                              ("save_profiles", len)):
+            original = getattr(manager, method)
+
+            def save(*args, _original=original, _count=count, _metrics=self._stage_metrics(method), **kwargs):
+                try:
+                    with _Stage(_metrics, self.tracer):
+                        result = _original(*args, **kwargs)
+                except Exception:
+                    failed()
+                    raise
+                saved(_count(result))
+                return result
+
+            setattr(manager, method, functools.wraps(original)(save))
+        for method in ("load_profile", "query_profiles", "list_profiles", "list_summaries", "delete_profile"):
+            self._wrap(manager, method, method)
+        manager._apex_instrumented = True
+        return manager
+
+    def _instrument_prompt_generator(self, generator: PromptGenerator) -> PromptGenerator:
+        self._wrap(generator, "generate_prompt", "generate_prompt",
+                   lambda prompt, inc=self.prompts_generated.labels().inc: inc())
+        # generate_prompts calls generate_prompt, which does the counting
+        self._wrap(generator, "generate_prompts", "generate_prompts")
+        generator._apex_instrumented = True
+        return generator
+
+class InstrumentedImageGenerator(ImageGenerator):
+    """Times and counts the calls to a wrapped generator."""
+
+    _apex_instrumented = True
+
+    def __init__(self, generator: ImageGenerator, instrumentation: Instrumentation):
+        self.generator = generator
+        self.instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        # Expose the wrapped backend's attributes (model, compute_units, ...)
+        if name == "generator":
+            raise AttributeError(name)
+        return getattr(self.generator, name)
+
+    def generate(self, prompt: str, negative_prompt: str, seed: int,
+                 resolution: Optional[str] = None) -> GeneratedImage:
+        instrumentation = self.instrumentation
+        with instrumentation.stage("generate_image"):
+            image = self.generator.generate(prompt, negative_prompt, seed, resolution)
+        instrumentation.images_generated.inc()
+        instrumentation.compute_units.inc(image.compute_units, stage="generate_image")
+        return image
+
+class InstrumentedImageJudge(ImageJudge):
+    """Times and counts the calls to a wrapped judge."""
+
+    _apex_instrumented = True
+
+    def __init__(self, judge: ImageJudge, instrumentation: Instrumentation):
+        self.judge_backend = judge
+        self.instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        # Expose the wrapped backend's attributes (model, rubric_version, ...)
+        if name == "judge_backend":
+            raise AttributeError(name)
+        return getattr(self.judge_backend, name)
+
+    def _record(self, verdicts: Sequence[JudgeVerdict]):
+        self.instrumentation.judgements.inc(len(verdicts))
+        self.instrumentation.compute_units.inc(sum(v.compute_units for v in verdicts), stage="judge")
+
+    def judge(self, image: GeneratedImage, preferences: Dict[str, Any]) -> JudgeVerdict:
+        with self.instrumentation.stage("judge"):
+            verdict = self.judge_backend.judge(image, preferences)
+        self._record([verdict])
+        return verdict
+
+    def judge_batch(self, images: Sequence[GeneratedImage], preferences: Dict[str, Any]) -> List[JudgeVerdict]:
+        with self.instrumentation.stage("judge_batch"):
+            if hasattr(self.judge_backend, "judge_batch"):
+                verdicts = self.judge_backend.judge_batch(images, preferences)
+            else:
+                verdicts = [self.judge_backend.judge(image, preferences) for image in images]
+        self._record(verdicts)
+        return verdicts
+
+_default_instrumentation: Optional[Instrumentation] = None
+
+def get_instrumentation() -> Instrumentation:
+    """The process-wide instrumentation, configured from ``config.metrics``."""
+    global _default_instrumentation
+    if _default_instrumentation is None:
+        _default_instrumentation = Instrumentation.from_config(config.metrics)
+    return _default_instrumentation
@@ -0,0 +1,220 @@
+"""
+Persistent cache of judge verdicts.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+from .backends import ImageJudge, GeneratedImage, JudgeVerdict
+
+# Fields of BasicInfo and AdvancedSettings, which define what a judge checks
+PROFILE_FIELDS = ("purpose", "attire", "background", "vibe", "lighting", "mood",
+                  "age_range", "gender", "ethnicity", "resolution")
+
+def profile_fingerprint(profile: Dict[str, Any]) -> str:
+    """
+    Hash the parts of a profile a judge scores against.
+
+    Accepts either a ``ProfileData.to_dict()`` dictionary (using its
+    basic_info and advanced_settings) or flat preferences.
+    """
+    if "basic_info" in profile:
+        fields = {**(profile.get("basic_info") or {}), **(profile.get("advanced_settings") or {})}
+    else:
+        fields = profile
+    selected = {name: fields.get(name) for name in PROFILE_FIELDS if fields.get(name) is not None}
+    encoded = json.dumps(selected, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+class JudgeCache:
+    """
+    SQLite-backed verdict cache keyed by (image hash, profile hash, model, rubric).
+
+    Safe to share between processes: each process opens its own connection
+    to the WAL-mode database. Entries older than ``ttl_seconds`` are misses,
+    and the least recently used entries are evicted beyond ``max_entries``.
+    """
+
+    # Check the size bound every this many inserts rather than on each one
+    EVICT_INTERVAL = 100
+
+    def __init__(self, db_path: str = "data/judge_cache.db", max_entries: int = 100_000,
+                 ttl_seconds: Optional[float] = None):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._puts_since_evict = 0
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, judge_config) -> "JudgeCache":
+        """Create a cache from a ``JudgeConfig``."""
+        return cls(
+            db_path=judge_config.cache_path,
+            max_entries=judge_config.cache_max_entries,
+            ttl_seconds=judge_config.cache_ttl_seconds
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection for the current process (reopened after a fork)."""
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS verdicts ("
+                    " image_hash TEXT NOT NULL,"
+                    " profile_hash TEXT NOT NULL,"
+                    " model TEXT NOT NULL,"
+                    " rubric_version TEXT NOT NULL,"
+                    " verdict TEXT NOT NULL,"
+                    " created_at REAL NOT NULL,"
+                    " last_used REAL NOT NULL,"
+                    " PRIMARY KEY (image_hash, profile_hash, model, rubric_version))"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_verdicts_last_used ON verdicts (last_used)")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    @staticmethod
+    def key(image: GeneratedImage, profile: Dict[str, Any], model: str,
+            rubric_version: str) -> Tuple[str, str, str, str]:
+        """Build the cache key for judging ``image`` against ``profile``."""
+        image_hash = hashlib.sha256(image.data).hexdigest()
+        return image_hash, profile_fingerprint(profile), model, rubric_version
+
+    def get(self, key: Tuple[str, str, str, str]) -> Optional[JudgeVerdict]:
+        """Return the cached verdict or None, updating hit/miss counters."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT verdict, created_at FROM verdicts WHERE image_hash = ? AND profile_hash = ?"
+                " AND model = ? AND rubric_version = ?", key
+            ).fetchone()
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                with conn:
+                    conn.execute(
+                        "DELETE FROM verdicts WHERE image_hash = ? AND profile_hash = ?"
+                        " AND model = ? AND rubric_version = ?", key
+                    )
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            with conn:
+                conn.execute(
+                    "UPDATE verdicts SET last_used = ? WHERE image_hash = ? AND profile_hash = ?"
+                    " AND model = ? AND rubric_version = ?", (now,) + tuple(key)
+                )
+            self.hits += 1
+
+        data = json.loads(row[0])
+        return JudgeVerdict(score=data["score"], feedback=data["feedback"],
+                            criteria=data["criteria"], compute_units=0.0)
+
+    def put(self, key: Tuple[str, str, str, str], verdict: JudgeVerdict) -> None:
+        """Store a verdict."""
+        now = time.time()
+        encoded = json.dumps({"score": verdict.score, "feedback": verdict.feedback,
+                              "criteria": verdict.criteria})
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    tuple(key) + (encoded, now, now)
+                )
+            self._puts_since_evict += 1
+            if self._puts_since_evict >= self.EVICT_INTERVAL:
+                self._puts_since_evict = 0
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop expired entries and the least recently used beyond the bound."""
+        with conn:
+            if self.ttl_seconds is not None:
+                conn.execute("DELETE FROM verdicts WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            excess = conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM verdicts WHERE rowid IN "
+                    "(SELECT rowid FROM verdicts ORDER BY last_used LIMIT ?)", (excess,)
+                )
+
+    def evict(self) -> None:
+        """Enforce the size and TTL bounds now."""
+        with self._lock:
+            self._evict(self._connection())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self)
+        }
+
+    def close(self) -> None:
+        """Close this process's connection."""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+class CachingJudge(ImageJudge):
+    """
+    Wraps a judge so repeat (image, profile) pairs skip the VLM round-trip.
+
+    The judge model and rubric version are part of the key, taken from the
+    wrapped judge's ``model`` and ``rubric_version`` attributes when present.
+    """
+
+    def __init__(self, judge: ImageJudge, cache: JudgeCache, model: Optional[str] = None,
+                 rubric_version: Optional[str] = None):
+        self.judge_backend = judge
+        self.cache = cache
+        self.model = model or getattr(judge, "model", type(judge).__name__)
+        self.rubric_version = rubric_version or getattr(judge, "rubric_version", "1")
+
+    def judge(self, image: GeneratedImage, preferences: Dict[str, Any]) -> JudgeVerdict:
+        key = self.cache.key(image, preferences, self.model, self.rubric_version)
+        verdict = self.cache.get(key)
+        if verdict is None:
+            verdict = self.judge_backend.judge(image, preferences)
+            self.cache.put(key, verdict)
+        return verdict
+
+    def judge_batch(self, images: Sequence[GeneratedImage], preferences: Dict[str, Any]) -> List[JudgeVerdict]:
+        """Score many images, sending only cache misses to the wrapped judge."""
+        keys = [self.cache.key(image, preferences, self.model, self.rubric_version) for image in images]
+        verdicts: List[Optional[JudgeVerdict]] = [self.cache.get(key) for key in keys]
+        missing = [i for i, verdict in enumerate(verdicts) if verdict is None]
+        if missing:
+            batch = [images[i] for i in missing]
+            if hasattr(self.judge_backend, "judge_batch"):
+                fresh = self.judge_backend.judge_batch(batch, preferences)
+            else:
+                fresh = [self.judge_backend.judge(image, preferences) for image in batch]
+            for i, verdict in zip(missing, fresh):
+                self.cache.put(keys[i], verdict)
+                verdicts[i] = verdict
+        return verdicts
@@ -0,0 +1,97 @@
+"""
+Content-addressed storage for uploaded reference photos.
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import Optional, Tuple
+from ..utils.file_utils import format_file_size
+
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# Extensions a stored photo may carry ("" for uploads without one)
+PHOTO_EXTENSIONS = frozenset({"", ".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"})
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit."""
+
+class ReferencePhotoStore:
+    """
+    Streams uploads into ``uploads_dir`` under their SHA-256 hash.
+
+    Photos live at ``<uploads_dir>/<hash[:2]>/<hash><ext>``. Uploads are
+    hashed before anything is written, so content that is already stored is
+    never copied again.
+    """
+
+    def __init__(self, uploads_dir: str = "data/uploads", max_file_size: Optional[int] = None):
+        self.uploads_dir = uploads_dir
+        self.max_file_size = max_file_size
+
+    def path_for(self, sha256: str, extension: str = "") -> str:
+        """Storage path for content with the given hash."""
+        return os.path.join(self.uploads_dir, sha256[:2], f"{sha256}{extension}")
+
+    def _read_chunks(self, f):
+        """Yield chunks of ``f``, enforcing the size limit as they are read."""
+        total = 0
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            total += len(chunk)
+            if self.max_file_size is not None and total > self.max_file_size:
+                raise UploadTooLargeError(
+                    f"Reference photo exceeds the {format_file_size(self.max_file_size)} limit"
+                )
+            yield chunk
+
+    def hash_file(self, source_path: str) -> str:
+        """SHA-256 of a file, read in chunks."""
+        digest = hashlib.sha256()
+        with open(source_path, 'rb') as f:
+            for chunk in self._read_chunks(f):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def ingest(self, source_path: str) -> Tuple[str, str]:
+        """
+        Store an uploaded file and return ``(sha256, stored_path)``.
+
+        Raises:
+            UploadTooLargeError: if the file exceeds ``max_file_size``.
+            OSError: if the file cannot be read or stored.
+        """
+        # Cheap rejection before reading anything
+        if self.max_file_size is not None and os.path.getsize(source_path) > self.max_file_size:
+            raise UploadTooLargeError(
+                f"Reference photo exceeds the {format_file_size(self.max_file_size)} limit"
+            )
+
+        extension = os.path.splitext(source_path)[1].lower()
+        sha256 = self.hash_file(source_path)
+        stored_path = self.path_for(sha256, extension)
+        if os.path.exists(stored_path):
+            return sha256, stored_path
+
+        directory = os.path.dirname(stored_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload.", suffix=".tmp")
+        try:
+            digest = hashlib.sha256()
+            with open(source_path, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+                for chunk in self._read_chunks(src):
+                    digest.update(chunk)
+                    dst.write(chunk)
+            if digest.hexdigest() != sha256:
+                raise OSError(f"Reference photo changed while being stored: {source_path}")
+            os.replace(tmp_path, stored_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        return sha256, stored_path
@@ -2,18 +2,59 @@
 Profile management and file operations.
 """
 
-import json
 import os
-from datetime import datetime
-from typing import Dict, Any, Optional, Tuple
-from ..models.profile import ProfileData, Profile
+import threading
+from itertools import islice
+from typing import Dict, Any, Optional, Tuple, List, Iterable, Iterator, Callable
+from ..models.profile import ProfileData, ProfileSummary, Profile
+from ..utils.ids import new_ulid
+from . import archive
+from .dedup import (DEDUP_MODES, INDEX_FILE, ContentIndex, content_hash, expand_revision, is_revision,
+                    make_revision)
+from .photo_store import ReferencePhotoStore
+from .storage import (ProfileStore, JSONDirectoryStore, ShardedDirectoryStore, create_store, decode_cursor,
+                      encode_cursor, open_directory_store)
+from .catalog import ProfileCatalog
 
 class ProfileManager:
     """Manages profile creation, validation, and file operations."""
     
-    def __init__(self, profiles_dir: str = "data/profiles"):
+    def __init__(self, profiles_dir: str = "data/profiles", store: Optional[ProfileStore] = None,
+                 max_profiles: Optional[int] = None, photo_store: Optional[ReferencePhotoStore] = None,
+                 dedup_mode: str = "off"):
+        if dedup_mode not in DEDUP_MODES:
+            raise ValueError(f"Unknown dedup mode: {dedup_mode}")
         self.profiles_dir = profiles_dir
         self._ensure_directory_exists()
+        self.store = store if store is not None else open_directory_store(profiles_dir)
+        self.max_profiles = max_profiles
+        self.photo_store = photo_store if photo_store is not None else ReferencePhotoStore()
+        self.dedup_mode = dedup_mode
+        # Kept up to date whenever it exists, even with dedup off, so that
+        # revisions saved earlier survive changes to their base profile
+        index_path = os.path.join(profiles_dir, INDEX_FILE)
+        self.content_index = (ContentIndex(index_path)
+                              if dedup_mode != "off" or os.path.exists(index_path) else None)
+        self._dedup_lock = threading.Lock()
+        # Profiles in the store, counted once when a limit is first checked
+        # and then kept up to date by this manager's saves and deletes
+        self._profile_count: Optional[int] = None
+        self._count_lock = threading.Lock()
+        self._save_listeners: List[Callable[[List[Tuple[str, Dict[str, Any]]]], None]] = []
+        self._delete_listeners: List[Callable[[str], None]] = []
+    
+    @classmethod
+    def from_config(cls, profile_config, max_upload_size: Optional[int] = None) -> "ProfileManager":
+        """Create a manager from a ``ProfileConfig`` (and ``UIConfig.max_file_size``)."""
+        store = create_store(profile_config.storage_backend, profile_config.profiles_dir,
+                             profile_config.layout, profile_config.shard_depth)
+        if profile_config.catalog and isinstance(store, ShardedDirectoryStore):
+            raise ValueError("The profile catalog only supports the flat directory layout")
+        if profile_config.catalog and isinstance(store, JSONDirectoryStore):
+            store = ProfileCatalog(store, poll_interval=profile_config.catalog_poll_interval)
+        photo_store = ReferencePhotoStore(profile_config.uploads_dir, max_upload_size)
+        return cls(profile_config.profiles_dir, store=store, max_profiles=profile_config.max_profiles,
+                   photo_store=photo_store, dedup_mode=profile_config.dedup_mode)
     
     def _ensure_directory_exists(self):
         """Ensure the profiles directory exists."""
@@ -33,9 +74,24 @@ class ProfileManager:
         """
         # Validate basic inputs
         is_valid, message = Profile.validate_basic_info(purpose, attire, background, vibe)
+        if is_valid:
+            is_valid, message = Profile.validate_choices(
+                lighting=lighting, mood=mood, age_range=age_range, gender=gender,
+                ethnicity=ethnicity, resolution=resolution
+            )
         if not is_valid:
             return None, False, message
         
+        # Store the reference photo by content hash
+        photo_sha256 = None
+        if photo_path:
+            try:
+                photo_sha256, photo_path = self.photo_store.ingest(photo_path)
+            except ValueError as e:
+                return None, False, f"⚠️ {e}"
+            except OSError as e:
+                return None, False, f"⚠️ Could not store reference photo: {e}"
+        
         # Create profile data
         profile = Profile.create_profile(
             purpose=purpose,
@@ -48,60 +104,325 @@ class ProfileManager:
             gender=gender,
             ethnicity=ethnicity,
             resolution=resolution,
-            reference_photo="uploaded" if photo_path else None,
+            reference_photo=photo_path,
             custom_notes=custom_notes.strip() if custom_notes else None,
-            preset_used=preset_name
+            preset_used=preset_name,
+            reference_photo_sha256=photo_sha256
         )
         
         return profile, True, "✅ Profile created successfully"
     
+    @staticmethod
+    def new_filename() -> str:
+        """Generate a unique, time-sortable profile filename."""
+        return f"portrait_profile_{new_ulid()}.json"
+    
     def save_profile(self, profile_data: ProfileData, filename: Optional[str] = None) -> str:
-        """Save profile to JSON file."""
+        """Save profile to the configured store and return its location."""
         if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"portrait_profile_{timestamp}.json"
+            filename = self.new_filename()
         
         if not filename.endswith('.json'):
             filename += '.json'
         
-        filepath = os.path.join(self.profiles_dir, filename)
+        data = profile_data.to_dict()
+        if self.content_index is not None:
+            return self._save_indexed([(filename, data)])[0]
+        new_count = 1 if self.max_profiles is not None and not self.store.exists(filename) else 0
+        self._check_capacity(new_count)
+        location = self.store.save(filename, data)
+        self._count_added(new_count)
+        self._notify_saved([(filename, data)])
+        return location
+    
+    def save_profiles(self, profiles: Iterable[ProfileData], batch_size: int = 500,
+                      filenames: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Save many profiles, flushing them to disk once per batch (one
+        ``syncfs`` or SQLite commit; one fsync per file where neither applies).
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(profile_data.to_dict(), f, indent=2, ensure_ascii=False)
+        Each profile gets a fresh unique filename unless ``filenames`` supplies
+        them in the same order. Returns the saved locations in input order
+        (with ``dedup_mode="reference"``, a duplicate's is the existing
+        profile's location).
+        """
+        if filenames is None:
+            pairs = ((self.new_filename(), profile) for profile in profiles)
+        else:
+            pairs = zip(filenames, profiles)
         
-        return filepath
+        locations = []
+        while True:
+            batch = [(filename, profile.to_dict()) for filename, profile in islice(pairs, batch_size)]
+            if not batch:
+                break
+            if self.content_index is not None:
+                locations.extend(self._save_indexed(batch))
+                continue
+            new_count = self._new_count(batch, filenames is None)
+            self._check_capacity(new_count)
+            locations.extend(self.store.save_many(batch))
+            self._count_added(new_count)
+            self._notify_saved(batch)
+        return locations
     
-    def load_profile(self, filename: str) -> Optional[Dict[str, Any]]:
-        """Load profile from JSON file."""
-        filepath = os.path.join(self.profiles_dir, filename)
+    def duplicate_location(self, profile_data: ProfileData, filename: Optional[str] = None) -> Optional[str]:
+        """
+        Where saving ``profile_data`` would point instead of writing it.
         
-        if not os.path.exists(filepath):
+        With ``dedup_mode="reference"``, the location of the saved profile
+        with the same content; None if it would be written (other modes, an
+        existing ``filename`` being overwritten, or no duplicate).
+        """
+        if self.dedup_mode != "reference":
+            return None
+        if filename and self.store.exists(filename if filename.endswith('.json') else filename + '.json'):
             return None
+        with self._dedup_lock:
+            owner = self._content_index().lookup(content_hash(profile_data.to_dict()))
+            base = self.store.load(owner) if owner is not None else None
+        if base is None or is_revision(base):
+            return None
+        return self.store.location(owner)
+    
+    def _content_index(self) -> ContentIndex:
+        """The content index, first indexing every saved profile if it is new."""
+        index = self.content_index
+        if not index.built:
+            index.build((profile_id, self.store.load(profile_id)) for profile_id in self.store.iter_ids())
+        return index
+    
+    def _save_indexed(self, batch: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """
+        Save (filename, data) pairs, deduplicating new profiles per ``dedup_mode``.
+        
+        A filename that already exists is overwritten in full; any
+        revisions of its previous content are handed to a new base first.
+        """
+        with self._dedup_lock:
+            index = self._content_index()
+            deduplicate = self.dedup_mode != "off"
+            writes = []  # (filename, data as stored)
+            saved = []  # (filename, full data) for listeners
+            owners = []  # (hash, filename) of profiles saved in full
+            revisions = []  # (filename, base filename)
+            locations = []
+            pending: Dict[str, Tuple[str, Dict[str, Any]]] = {}  # hash -> profile saved earlier in this batch
+            for filename, data in batch:
+                digest = content_hash(data)
+                base_id = base = None
+                if self.store.exists(filename):
+                    self._release(filename)
+                elif deduplicate:
+                    base_id, base = pending.get(digest, (None, None))
+                    if base_id is None:
+                        base_id = index.lookup(digest)
+                        # The index may be stale: the profile must still be there
+                        base = self.store.load(base_id) if base_id is not None else None
+                        if base is None or is_revision(base):
+                            base_id = base = None
+                
+                if base_id is None:
+                    writes.append((filename, data))
+                    owners.append((digest, filename))
+                    pending.setdefault(digest, (filename, data))
+                elif self.dedup_mode == "reference":
+                    locations.append(self.store.location(base_id))
+                    continue
+                else:
+                    writes.append((filename, make_revision(data, base_id, base)))
+                    revisions.append((filename, base_id))
+                saved.append((filename, data))
+                locations.append(self.store.location(filename))
+            
+            if not writes:
+                return locations
+            new_count = self._new_count(writes)
+            self._check_capacity(new_count)
+            if len(writes) == 1:
+                self.store.save(*writes[0])
+            else:
+                self.store.save_many(writes)
+            self._count_added(new_count)
+            index.add(owners, revisions)
+        self._notify_saved(saved)
+        return locations
+    
+    def _release(self, filename: str):
+        """
+        Drop ``filename`` from the content index before it is overwritten or deleted.
+        
+        Its revisions can't keep pointing at it: the first becomes a full
+        profile and the new base of the others.
+        """
+        index = self.content_index
+        heirs = index.revisions_of(filename)
+        base = self.store.load(filename) if heirs else None
+        if base is None or is_revision(base):
+            index.remove(filename)
+            return
+        heir = heirs[0]
+        heir_record = self.store.load(heir)
+        heir_data = expand_revision(heir_record, base) if heir_record else base
+        writes = [(heir, heir_data)]
+        for other in heirs[1:]:
+            record = self.store.load(other)
+            if record is not None:
+                writes.append((other, make_revision(expand_revision(record, base), heir, heir_data)))
+        self.store.save_many(writes)
+        index.transfer(filename, heir)
+    
+    def add_save_listener(self, listener: Callable[[List[Tuple[str, Dict[str, Any]]]], None]):
+        """Call ``listener`` with [(filename, profile dict), ...] after every save."""
+        self._save_listeners.append(listener)
+    
+    def add_delete_listener(self, listener: Callable[[str], None]):
+        """Call ``listener`` with the filename after every successful delete."""
+        self._delete_listeners.append(listener)
+    
+    def _notify_saved(self, items: List[Tuple[str, Dict[str, Any]]]):
+        for listener in self._save_listeners:
+            listener(items)
+    
+    def _new_count(self, batch: List[Tuple[str, Dict[str, Any]]], fresh: bool = False) -> int:
+        """How many of a batch's filenames are not saved yet (only needed with a limit)."""
+        if self.max_profiles is None:
+            return 0
+        if fresh:
+            return len(batch)
+        return sum(1 for filename, _ in batch if not self.store.exists(filename))
+    
+    def _check_capacity(self, new_count: int):
+        """
+        Refuse new profiles once ``max_profiles`` would be exceeded.
         
+        The store is counted only the first time; saves by other processes
+        are picked up when this manager is next created.
+        """
+        if self.max_profiles is None:
+            return
+        with self._count_lock:
+            if self._profile_count is None:
+                self._profile_count = self.store.count()
+            if self._profile_count + new_count > self.max_profiles:
+                raise ValueError(f"Profile limit of {self.max_profiles} reached")
+    
+    def _count_added(self, delta: int):
+        with self._count_lock:
+            if self._profile_count is not None:
+                self._profile_count += delta
+    
+    def load_profile(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Load profile from the configured store (a revision is returned in full)."""
+        data = self.store.load(filename)
+        if data is not None and is_revision(data):
+            base = self.store.load(data["revision_of"])
+            if base is None or is_revision(base):
+                return None
+            data = expand_revision(data, base)
+        return data
+    
+    def load_profile_data(self, filename: str) -> Optional[ProfileData]:
+        """Load a profile as ``ProfileData``, upgrading older layouts; None if unreadable."""
+        data = self.load_profile(filename)
+        if data is None:
+            return None
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
+            return ProfileData.from_dict(data)
+        except ValueError:
             return None
     
     def list_profiles(self) -> list[str]:
         """List all saved profiles."""
-        if not os.path.exists(self.profiles_dir):
-            return []
+        return self.store.list_ids()
+    
+    def iter_profiles(self) -> Iterator[str]:
+        """Iterate over saved profile ids without building the full list first."""
+        return self.store.iter_ids()
+    
+    def query_profiles(self, limit: Optional[int] = None, offset: int = 0,
+                       newest_first: bool = True, **filters: str) -> List[str]:
+        """
+        List saved profiles filtered on basic info or preset, newest first.
         
-        return [f for f in os.listdir(self.profiles_dir) if f.endswith('.json')]
+        Filters may be any of purpose, attire, background, vibe and preset_used.
+        """
+        return self.store.query(filters, limit=limit, offset=offset, newest_first=newest_first)
+    
+    def iter_summaries(self, newest_first: bool = True, after: Optional[str] = None,
+                       page_size: int = 100, **filters: str) -> Iterator[ProfileSummary]:
+        """
+        Lazily yield summaries of saved profiles, newest first by default.
+        
+        Filters are as for ``query_profiles``, and so is the (timestamp, id)
+        order. ``after`` is a cursor from ``list_summaries``. Profiles are
+        read ``page_size`` at a time, so walking every profile never holds
+        more than one page.
+        """
+        after_key = decode_cursor(after) if after else None
+        for page, _ in self.store.summary_pages(filters, newest_first, after_key, page_size):
+            yield from self._complete_summaries(page)
+    
+    def list_summaries(self, limit: int = 50, cursor: Optional[str] = None, newest_first: bool = True,
+                       **filters: str) -> Tuple[List[ProfileSummary], Optional[str]]:
+        """
+        One page of profile summaries and the cursor for the next page.
+        
+        Pass the returned cursor back to continue where this page ended; it
+        is None once there are no more profiles. Unlike an offset, a cursor
+        stays valid while profiles are added or removed.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        after = decode_cursor(cursor) if cursor else None
+        page, last = next(iter(self.store.summary_pages(filters, newest_first, after, limit)), ([], None))
+        return self._complete_summaries(page), encode_cursor(last) if len(page) == limit else None
+    
+    def _complete_summaries(self, page: List[ProfileSummary]) -> List[ProfileSummary]:
+        """Fill in the prompt preview of revisions, which share their base's prompt."""
+        if self.content_index is None:
+            return page
+        for i, summary in enumerate(page):
+            if summary.prompt_preview is None and self.content_index.base_of(summary.id) is not None:
+                data = self.load_profile(summary.id)
+                if data is not None:
+                    page[i] = ProfileSummary.from_dict(summary.id, data)
+        return page
+    
+    def count_profiles(self) -> int:
+        """Number of saved profiles."""
+        return self.store.count()
     
     def delete_profile(self, filename: str) -> bool:
-        """Delete a profile file."""
-        filepath = os.path.join(self.profiles_dir, filename)
+        """Delete a saved profile."""
+        if self.content_index is not None:
+            with self._dedup_lock:
+                self._release(filename)
+                deleted = self.store.delete(filename)
+        else:
+            deleted = self.store.delete(filename)
+        if deleted:
+            self._count_added(-1)
+            for listener in self._delete_listeners:
+                listener(filename)
+        return deleted
+    
+    def export_profiles(self, path: str, profile_ids: Optional[Iterable[str]] = None,
+                        **options) -> Dict[str, Any]:
+        """
+        Pack profiles (default: all) and their reference photos into one archive.
         
-        if os.path.exists(filepath):
-            try:
-                os.remove(filepath)
-                return True
-            except OSError:
-                return False
-        return False
+        See ``apex.core.archive.export_profiles`` for the format and options.
+        """
+        return archive.export_profiles(self, path, profile_ids, **options)
+    
+    def import_profiles(self, path: str, **options) -> Dict[str, Any]:
+        """
+        Load an archive from ``export_profiles``, verifying checksums; resumable.
+        
+        See ``apex.core.archive.import_profiles`` for the options.
+        """
+        return archive.import_profiles(self, path, **options)
     
     def get_presets(self) -> Dict[str, Dict[str, str]]:
         """Get predefined profile presets."""
@@ -0,0 +1,111 @@
+"""
+Token-budget-aware prompt assembly.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Sequence
+
+# Words, numbers and individual punctuation marks
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+class ApproximateTokenizer:
+    """
+    Fast local token counter.
+
+    Counts words and punctuation marks, charging long words one extra token
+    per ``chars_per_token`` characters to approximate subword tokenizers such
+    as the T5/CLIP encoders used by Flux. It errs towards overcounting so a
+    prompt that fits here also fits the real encoder.
+    """
+
+    def __init__(self, chars_per_token: int = 8):
+        self.chars_per_token = chars_per_token
+
+    def count_tokens(self, text: str) -> int:
+        """Approximate the number of tokens in ``text``."""
+        step = self.chars_per_token
+        return sum(1 + (len(token) - 1) // step for token in _TOKEN_PATTERN.findall(text))
+
+class HuggingFaceTokenizer:
+    """Adapter exposing a Hugging Face tokenizer through ``count_tokens``."""
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with the wrapped tokenizer, excluding special tokens."""
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+@dataclass
+class PromptFragment:
+    """A piece of a prompt with a drop priority (lower is dropped first)."""
+    text: str
+    priority: int
+    compressible: bool = False
+
+class PromptBudget:
+    """Assembles prompt fragments so they fit a token budget."""
+
+    def __init__(self, max_tokens: int, tokenizer=None, separator: str = ", ",
+                 cache_size: int = 8192):
+        self.max_tokens = max_tokens
+        self.tokenizer = tokenizer or ApproximateTokenizer()
+        self.separator = separator
+        # Fragments repeat across requests, so their counts are memoized
+        self.count = lru_cache(maxsize=cache_size)(self.tokenizer.count_tokens)
+        self.separator_tokens = self.count(separator.strip()) if separator.strip() else 0
+
+    def total_tokens(self, texts: Sequence[str]) -> int:
+        """Token count of ``texts`` joined with the separator."""
+        if not texts:
+            return 0
+        return sum(self.count(text) for text in texts) + self.separator_tokens * (len(texts) - 1)
+
+    def assemble(self, fragments: List[PromptFragment]) -> str:
+        """
+        Join fragments, dropping or compressing the lowest priorities first.
+
+        Fragments are considered from the lowest priority up (later fragments
+        first on ties). A compressible fragment is cut at a word boundary to
+        use whatever budget remains; anything else is dropped whole. The
+        surviving fragments keep their original order.
+        """
+        texts = [fragment.text for fragment in fragments]
+        total = self.total_tokens(texts)
+        if total <= self.max_tokens:
+            return self.separator.join(texts)
+
+        kept = list(texts)
+        order = sorted(range(len(fragments)), key=lambda i: (fragments[i].priority, -i))
+        for index in order:
+            if total <= self.max_tokens:
+                break
+            fragment_tokens = self.count(kept[index]) + self.separator_tokens
+            total -= fragment_tokens
+            if fragments[index].compressible:
+                available = self.max_tokens - total - self.separator_tokens
+                compressed = self._truncate(kept[index], available)
+                if compressed:
+                    kept[index] = compressed
+                    total += self.count(compressed) + self.separator_tokens
+                    continue
+            kept[index] = None
+
+        return self.separator.join(text for text in kept if text)
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """Keep the longest word prefix of ``text`` within ``max_tokens``."""
+        if max_tokens <= 0:
+            return ""
+        words = text.split()
+        low, high = 0, len(words)
+        # Token counts grow with the number of words, so binary search works
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.tokenizer.count_tokens(" ".join(words[:middle])) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return " ".join(words[:low]).rstrip(",;:")
@@ -2,107 +2,156 @@
 Advanced prompt generation for Flux AI models.
 """
 
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+from ..config.settings import PromptConfig
+from ..config.vocabulary import Vocabulary, get_vocabulary
+from .prompt_budget import PromptBudget, PromptFragment
+
+# Fixed fragments shared by every prompt
+PHOTOGRAPHY_TAGS = (
+    "professional photography, high resolution, cinematic lighting, "
+    "sharp focus, professional color grading, detailed facial features"
+)
+
+# Choice fields whose options map to prompt phrases
+PROMPT_CHOICE_FIELDS = ("purpose", "attire", "background", "vibe", "lighting", "mood")
+
+# Drop priorities when a prompt exceeds the token budget (lowest goes first)
+PRIORITY_PHOTOGRAPHY = 1
+PRIORITY_QUALITY = 2
+PRIORITY_EMPHASIS = 3
+PRIORITY_CUSTOM_NOTES = 4
+PRIORITY_DESCRIPTION = 5
 
 class PromptGenerator:
     """Generates optimized prompts for Flux AI portrait generation."""
     
-    def __init__(self):
-        self.purpose_details = {
-            "LinkedIn": "professional headshot optimized for social media",
-            "Resume": "formal professional portrait for career applications",
-            "Corporate Website": "executive-level corporate portrait",
-            "Personal Branding": "distinctive personal brand portrait",
-            "Business Card": "compact professional headshot",
-            "Other": "professional portrait"
-        }
-        
-        self.attire_details = {
-            "Business Formal": "sharp business suit, professional tie, polished appearance",
-            "Business Casual": "smart blazer, dress shirt, refined casual look",
-            "Smart Casual": "stylish casual wear, modern professional appearance",
-            "Creative Professional": "fashionable, artistic professional attire",
-            "Academic": "scholarly attire, professional academic dress",
-            "Other": "appropriate professional clothing"
-        }
-        
-        self.background_details = {
-            "Corporate Office": "modern office environment, soft bokeh, professional lighting",
-            "Plain Color": "clean gradient background, studio lighting",
-            "Outdoor": "natural outdoor setting, soft natural lighting",
-            "Studio-like": "professional studio setup, controlled lighting",
-            "Library/Academic": "scholarly environment, books, academic setting",
-            "Creative Space": "artistic workspace, creative elements, modern aesthetic",
-            "Other": "appropriate professional background"
-        }
-        
-        self.vibe_details = {
-            "Confident": "confident expression, direct gaze, strong posture",
-            "Friendly": "warm smile, approachable demeanor, friendly eyes",
-            "Approachable": "gentle smile, open expression, welcoming appearance",
-            "Authoritative": "commanding presence, serious expression, leadership aura",
-            "Creative": "artistic expression, creative energy, innovative look",
-            "Sophisticated": "refined elegance, intellectual appearance, polished style",
-            "Warm": "genuine warmth, kind expression, compassionate presence"
-        }
+    def __init__(self, cache_size: int = 4096, prompt_config: Optional[PromptConfig] = None,
+                 tokenizer=None, vocabulary: Optional[Vocabulary] = None):
+        self.prompt_config = prompt_config or PromptConfig()
+        self.budget = PromptBudget(self.prompt_config.max_prompt_length, tokenizer)
+        self.quality_suffix = "".join(f", {tag}" for tag in self.prompt_config.quality_tags)
+        self._quality_tokens = self.budget.total_tokens(self.prompt_config.quality_tags) + (
+            self.budget.separator_tokens if self.prompt_config.quality_tags else 0
+        )
         
-        self.lighting_details = {
-            "Natural Light": "soft natural lighting, window light",
-            "Studio Lighting": "professional studio lighting setup",
-            "Soft Lighting": "gentle, diffused lighting",
-            "Dramatic Lighting": "dramatic shadows and highlights",
-            "Golden Hour": "warm golden hour lighting",
-            "Professional Flash": "professional flash photography lighting"
-        }
+        self.vocabulary = vocabulary or get_vocabulary()
+        self.purpose_details = self.vocabulary.details("purpose")
+        self.attire_details = self.vocabulary.details("attire")
+        self.background_details = self.vocabulary.details("background")
+        self.vibe_details = self.vocabulary.details("vibe")
+        self.lighting_details = self.vocabulary.details("lighting")
+        self.mood_details = self.vocabulary.details("mood")
+        self._fallbacks = {name: self.vocabulary.fallback(name) for name in PROMPT_CHOICE_FIELDS}
+        self._default_lighting = self.vocabulary.default("lighting")
+        self._default_mood = self.vocabulary.default("mood")
         
-        self.mood_details = {
-            "Professional": "professional demeanor",
-            "Casual": "relaxed, casual atmosphere",
-            "Serious": "serious, focused expression",
-            "Energetic": "dynamic, energetic presence",
-            "Calm": "calm, peaceful demeanor",
-            "Inspiring": "inspiring, motivational presence"
-        }
+        # The (purpose, attire, background, vibe, lighting, mood) space is
+        # small, so the descriptive prefix is memoized per combination.
+        self._prefix = lru_cache(maxsize=cache_size)(self._build_prefix)
     
-    def generate_prompt(self, profile_data: Dict[str, Any]) -> str:
-        """Generate an advanced Flux prompt based on profile data."""
-        
-        # Extract basic info
-        purpose = profile_data.get('purpose', '')
-        attire = profile_data.get('attire', '')
-        background = profile_data.get('background', '')
-        vibe = profile_data.get('vibe', '')
-        
-        # Extract advanced settings
-        lighting = profile_data.get('lighting', 'Professional Flash')
-        mood = profile_data.get('mood', 'Professional')
-        custom_notes = profile_data.get('custom_notes', '')
+    def clear_cache(self):
+        """Drop memoized prefixes, e.g. after editing the detail dictionaries."""
+        self._prefix.cache_clear()
+    
+    def _build_prefix(self, purpose: str, attire: str, background: str, vibe: str,
+                      lighting: str, mood: str) -> Tuple[str, str, int]:
+        """
+        Build the prompt up to (but excluding) custom notes and quality tags.
         
-        # Build detailed descriptions
-        purpose_desc = self.purpose_details.get(purpose, 'professional portrait')
-        attire_desc = self.attire_details.get(attire, 'professional attire')
-        background_desc = self.background_details.get(background, 'professional background')
-        vibe_desc = self.vibe_details.get(vibe, 'professional demeanor')
-        lighting_desc = self.lighting_details.get(lighting, 'professional lighting')
-        mood_desc = self.mood_details.get(mood, 'professional demeanor')
+        Returns the full prefix, the descriptive part alone, and the prefix
+        token count.
+        """
+        fallbacks = self._fallbacks
+        purpose_desc = self.purpose_details.get(purpose, fallbacks["purpose"])
+        attire_desc = self.attire_details.get(attire, fallbacks["attire"])
+        background_desc = self.background_details.get(background, fallbacks["background"])
+        vibe_desc = self.vibe_details.get(vibe, fallbacks["vibe"])
+        lighting_desc = self.lighting_details.get(lighting, fallbacks["lighting"])
+        mood_desc = self.mood_details.get(mood, fallbacks["mood"])
         
-        # Construct the main prompt
-        prompt = (
+        description = (
             f"Ultra-realistic {purpose_desc}, featuring {attire_desc}, "
             f"set against {background_desc}, with {vibe_desc}, "
-            f"{lighting_desc}, {mood_desc}, "
-            f"professional photography, high resolution, cinematic lighting, "
-            f"sharp focus, professional color grading, detailed facial features"
+            f"{lighting_desc}, {mood_desc}"
+        )
+        prefix = f"{description}, {PHOTOGRAPHY_TAGS}"
+        return prefix, description, self.budget.total_tokens([description, PHOTOGRAPHY_TAGS])
+    
+    def generate_prompt(self, profile_data: Dict[str, Any]) -> str:
+        """Generate an advanced Flux prompt based on profile data."""
+        get = profile_data.get
+        prefix, description, tokens = self._prefix(
+            get('purpose', ''),
+            get('attire', ''),
+            get('background', ''),
+            get('vibe', ''),
+            get('lighting', self._default_lighting),
+            get('mood', self._default_mood)
         )
         
+        tokens += self._quality_tokens
+        
         # Add custom notes if provided
-        if custom_notes and custom_notes.strip():
-            prompt += f", {custom_notes.strip()}"
+        custom_notes = get('custom_notes', '')
+        if custom_notes:
+            custom_notes = custom_notes.strip()
+        if custom_notes:
+            tokens += self.budget.count(custom_notes) + self.budget.separator_tokens
+            if tokens <= self.budget.max_tokens:
+                return f"{prefix}, {custom_notes}{self.quality_suffix}"
+        elif tokens <= self.budget.max_tokens:
+            return prefix + self.quality_suffix
         
-        # Add quality modifiers
-        prompt += ", masterpiece, best quality, highly detailed, photorealistic"
+        return self._assemble_within_budget(description, custom_notes)
+    
+    def generate_emphasized_prompt(self, profile_data: Dict[str, Any],
+                                   emphasis: Sequence[str]) -> str:
+        """
+        Generate the prompt for ``profile_data`` followed by ``emphasis``.
+        
+        Used when refining from judge feedback. The result stays within the
+        token budget; emphasis is dropped after the photography and quality
+        tags but before custom notes and the description.
+        """
+        prompt = self.generate_prompt(profile_data)
+        if not emphasis:
+            return prompt
+        tokens = (self.budget.count(prompt) + self.budget.separator_tokens
+                  + self.budget.total_tokens(emphasis))
+        if tokens <= self.budget.max_tokens:
+            return ", ".join([prompt, *emphasis])
         
-        return prompt
+        get = profile_data.get
+        _, description, _ = self._prefix(
+            get('purpose', ''),
+            get('attire', ''),
+            get('background', ''),
+            get('vibe', ''),
+            get('lighting', self._default_lighting),
+            get('mood', self._default_mood)
+        )
+        custom_notes = (get('custom_notes', '') or '').strip()
+        return self._assemble_within_budget(description, custom_notes, emphasis)
+    
+    def _assemble_within_budget(self, description: str, custom_notes: Optional[str],
+                                emphasis: Sequence[str] = ()) -> str:
+        """Fit an over-long prompt into the token budget by priority."""
+        fragments = [
+            PromptFragment(description, PRIORITY_DESCRIPTION),
+            PromptFragment(PHOTOGRAPHY_TAGS, PRIORITY_PHOTOGRAPHY)
+        ]
+        if custom_notes:
+            fragments.append(PromptFragment(custom_notes, PRIORITY_CUSTOM_NOTES, compressible=True))
+        fragments.extend(PromptFragment(tag, PRIORITY_QUALITY) for tag in self.prompt_config.quality_tags)
+        fragments.extend(PromptFragment(text, PRIORITY_EMPHASIS) for text in emphasis)
+        return self.budget.assemble(fragments)
+    
+    def generate_prompts(self, batch: Iterable[Dict[str, Any]]) -> List[str]:
+        """Generate prompts for many profiles, sharing the memoized prefixes."""
+        generate = self.generate_prompt
+        return [generate(profile_data) for profile_data in batch]
     
     def generate_negative_prompt(self) -> str:
         """Generate a negative prompt to avoid unwanted elements."""
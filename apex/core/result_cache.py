@@ -0,0 +1,266 @@
+"""
+Content-addressed cache of generated portraits.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from ..utils.file_utils import atomic_write
+from .backends import ImageGenerator, GeneratedImage
+
+# Whether the seed is part of the key: "exact" reuses an image only for the
+# same seed, "any" for any seed (the prompt alone decides the portrait)
+SEED_POLICIES = ("exact", "any")
+
+_WHITESPACE = re.compile(r"\s+")
+_SEPARATOR = re.compile(r"\s*,\s*")
+
+def normalize_prompt(prompt: Optional[str]) -> str:
+    """Collapse whitespace and separator spacing so cosmetic differences share a key."""
+    if not prompt:
+        return ""
+    text = _WHITESPACE.sub(" ", prompt).strip()
+    return _SEPARATOR.sub(", ", text).strip(", ")
+
+def result_key(prompt: str, negative_prompt: str, resolution: Optional[str], seed: int,
+               seed_policy: str = "exact", model: str = "") -> str:
+    """Cache key (sha256 hex) for a generation request."""
+    if seed_policy not in SEED_POLICIES:
+        raise ValueError(f"Unknown seed policy: {seed_policy}")
+    material = [normalize_prompt(prompt), normalize_prompt(negative_prompt), resolution or "",
+                seed if seed_policy == "exact" else None, model]
+    return hashlib.sha256(json.dumps(material, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+class GenerationResultCache:
+    """
+    Generated images on disk with an SQLite metadata index.
+
+    Images live at ``<cache_dir>/<key[:2]>/<key>.<format>``; the index
+    (``<cache_dir>/index.db``) records each entry's size, generation
+    metadata and last use, plus a running total of the stored bytes. Once
+    stored images exceed ``max_bytes`` the least recently used are evicted.
+    Safe to share between processes.
+    """
+
+    def __init__(self, cache_dir: str = "data/results", max_bytes: int = 2 * 1024 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.compute_units_saved = 0.0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, profile_config) -> "GenerationResultCache":
+        """Create a cache from a ``ProfileConfig``."""
+        return cls(profile_config.results_dir, profile_config.results_cache_bytes)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection for the current process (reopened after a fork)."""
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(os.path.join(self.cache_dir, "index.db"), timeout=30,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    " key TEXT PRIMARY KEY,"
+                    " path TEXT NOT NULL,"
+                    " format TEXT NOT NULL,"
+                    " size INTEGER NOT NULL,"
+                    " prompt TEXT NOT NULL,"
+                    " seed INTEGER NOT NULL,"
+                    " compute_units REAL NOT NULL,"
+                    " metadata TEXT NOT NULL,"
+                    " created_at REAL NOT NULL,"
+                    " last_used REAL NOT NULL,"
+                    " hits INTEGER NOT NULL DEFAULT 0)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_results_last_used ON results (last_used)")
+                # Kept up to date by every insert and delete, so puts don't sum the table
+                conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+                conn.execute(
+                    "INSERT OR IGNORE INTO meta (key, value) "
+                    "SELECT 'total_bytes', COALESCE(SUM(size), 0) FROM results"
+                )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def path_for(self, key: str, fmt: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{fmt}")
+
+    def get(self, key: str) -> Optional[GeneratedImage]:
+        """Return the cached image (with ``compute_units`` 0), or None."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT path, format, prompt, seed, compute_units, metadata FROM results WHERE key = ?",
+                (key,)
+            ).fetchone()
+        # Read the file without holding the lock
+        data = None
+        if row is not None:
+            try:
+                with open(row[0], "rb") as f:
+                    data = f.read()
+            except OSError:
+                # The file went missing underneath the index
+                with self._lock:
+                    self._delete(self._connection(), [key])
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            conn = self._connection()
+            with conn:
+                conn.execute("UPDATE results SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                             (time.time(), key))
+            self.hits += 1
+            self.bytes_saved += len(data)
+            self.compute_units_saved += row[4]
+
+        metadata = json.loads(row[5])
+        metadata["cache_key"] = key
+        metadata["cache_hit"] = True
+        return GeneratedImage(data=data, prompt=row[2], seed=row[3], format=row[1],
+                              compute_units=0.0, metadata=metadata)
+
+    def put(self, key: str, image: GeneratedImage) -> str:
+        """Store an image under ``key``; returns its path."""
+        path = self.path_for(key, image.format)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A lost cache file only costs a regeneration, so skip the fsync
+        atomic_write(path, image.data, fsync=False)
+        now = time.time()
+        metadata = json.dumps(image.metadata, default=str)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                replaced = conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO results "
+                    "(key, path, format, size, prompt, seed, compute_units, metadata, created_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, path, image.format, len(image.data), image.prompt, image.seed,
+                     image.compute_units, metadata, now, now)
+                )
+                self._add_bytes(conn, len(image.data) - (replaced[0] if replaced else 0))
+            victims = self._evict(conn) if self._total_bytes(conn) > self.max_bytes else []
+        self._remove_files(victims)
+        return path
+
+    @staticmethod
+    def _total_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT value FROM meta WHERE key = 'total_bytes'").fetchone()[0]
+
+    @staticmethod
+    def _add_bytes(conn: sqlite3.Connection, delta: int):
+        conn.execute("UPDATE meta SET value = value + ? WHERE key = 'total_bytes'", (delta,))
+
+    def _delete(self, conn: sqlite3.Connection, keys) -> int:
+        """Drop index entries (not their files) and return their bytes."""
+        freed = 0
+        with conn:
+            for key in keys:
+                row = conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    freed += row[0]
+            self._add_bytes(conn, -freed)
+        return freed
+
+    def _evict(self, conn: sqlite3.Connection) -> List[Tuple[str, int]]:
+        """Drop least recently used entries until within budget; return their (path, size)."""
+        excess = self._total_bytes(conn) - self.max_bytes
+        if excess <= 0:
+            return []
+        freed = 0
+        victims = []
+        for key, path, size in conn.execute("SELECT key, path, size FROM results ORDER BY last_used"):
+            if freed >= excess:
+                break
+            victims.append((key, path, size))
+            freed += size
+        self._delete(conn, [key for key, _, _ in victims])
+        return [(path, size) for _, path, size in victims]
+
+    @staticmethod
+    def _remove_files(victims: List[Tuple[str, int]]) -> int:
+        """Delete evicted files (outside the lock); return the bytes they held."""
+        for path, _ in victims:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return sum(size for _, size in victims)
+
+    def evict(self) -> int:
+        """Enforce the size bound now; return bytes freed."""
+        with self._lock:
+            victims = self._evict(self._connection())
+        return self._remove_files(victims)
+
+    @property
+    def total_bytes(self) -> int:
+        """Bytes of images currently cached."""
+        with self._lock:
+            return self._total_bytes(self._connection())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate and savings for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "compute_units_saved": self.compute_units_saved,
+            "entries": len(self),
+            "total_bytes": self.total_bytes
+        }
+
+    def close(self) -> None:
+        """Close this process's connection."""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+class CachingImageGenerator(ImageGenerator):
+    """
+    Wraps a generator so identical requests reuse the stored portrait.
+
+    ``model`` (default: the wrapped generator's ``model`` attribute or class
+    name) is part of the key so different checkpoints never share results.
+    """
+
+    def __init__(self, generator: ImageGenerator, cache: GenerationResultCache,
+                 seed_policy: str = "exact", model: Optional[str] = None):
+        if seed_policy not in SEED_POLICIES:
+            raise ValueError(f"Unknown seed policy: {seed_policy}")
+        self.generator = generator
+        self.cache = cache
+        self.seed_policy = seed_policy
+        self.model = model or getattr(generator, "model", type(generator).__name__)
+
+    def generate(self, prompt: str, negative_prompt: str, seed: int,
+                 resolution: Optional[str] = None) -> GeneratedImage:
+        key = result_key(prompt, negative_prompt, resolution, seed, self.seed_policy, self.model)
+        image = self.cache.get(key)
+        if image is None:
+            image = self.generator.generate(prompt, negative_prompt, seed, resolution)
+            self.cache.put(key, image)
+        return image
@@ -0,0 +1,148 @@
+"""
+Parallel best-of-N candidate scheduling.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Optional, List, Tuple
+from .agentic_loop import GenerationResult, IterationRecord, STOP_ACCEPTED, STOP_MAX_ITERATIONS
+from .backends import (StylePlanner, ImageGenerator, ImageJudge, StylePlan, JUDGED_FIELDS,
+                       TemplateStylePlanner, StubImageGenerator, StubImageJudge)
+from .instrumentation import get_instrumentation
+from ..config.vocabulary import get_vocabulary
+
+class CandidateScheduler:
+    """
+    Generates N prompt variants at once and keeps the best-judged candidate.
+
+    Each round fans ``candidates`` variants of the plan (different seeds,
+    field emphasis and lighting) out to a worker pool. Every worker judges
+    its image as soon as it is generated, so verdicts stream back in
+    completion order; the first one over ``accept_threshold`` cancels the
+    work still queued. Rounds after the first refine the best plan so far.
+    """
+
+    def __init__(self, planner: Optional[StylePlanner] = None,
+                 generator: Optional[ImageGenerator] = None,
+                 judge: Optional[ImageJudge] = None,
+                 candidates: int = 4,
+                 max_workers: Optional[int] = None,
+                 accept_threshold: float = 0.85,
+                 rounds: int = 1,
+                 base_seed: int = 0):
+        self.planner = planner or TemplateStylePlanner()
+        instrumentation = get_instrumentation()
+        self.generator = instrumentation.instrument(generator or StubImageGenerator())
+        self.judge = instrumentation.instrument(judge or StubImageJudge())
+        self.candidates = max(1, candidates)
+        self.max_workers = max_workers or self.candidates
+        self.accept_threshold = accept_threshold
+        self.rounds = max(1, rounds)
+        self.base_seed = base_seed
+        # Lighting phrases come from the planner's prompt generator when it has one
+        prompt_generator = getattr(self.planner, "prompt_generator", None)
+        self.lighting_details = (prompt_generator.lighting_details if prompt_generator is not None
+                                 else get_vocabulary().details("lighting"))
+
+    def variants(self, plan: StylePlan, round_index: int = 0) -> List[Tuple[StylePlan, int]]:
+        """
+        Derive ``candidates`` (plan, seed) pairs from one plan.
+
+        The first variant is the plan itself; the others each add emphasis
+        on one requested field and a lighting description, cycling through
+        the combinations. Variants are built by the planner's ``emphasize``,
+        so they keep to its prompt budget and skip phrases already present.
+        """
+        preferences = plan.preferences
+        emphases = [f"emphasis on {preferences[name]} {name}" for name in JUDGED_FIELDS
+                    if preferences.get(name)]
+        lighting = preferences.get("lighting")
+        # Keep a requested lighting style; otherwise explore the options
+        if lighting:
+            lighting_options = [self.lighting_details.get(lighting, lighting)]
+        else:
+            lighting_options = list(self.lighting_details.values())
+
+        seed = self.base_seed + round_index * self.candidates
+        variants = [(plan, seed)]
+        for i in range(1, self.candidates):
+            additions = [lighting_options[(i - 1) % len(lighting_options)]]
+            if emphases:
+                additions.insert(0, emphases[(i - 1) % len(emphases)])
+            variants.append((self.planner.emphasize(plan, additions), seed + i))
+        return variants
+
+    def _run_candidate(self, plan: StylePlan, seed: int, stop: threading.Event):
+        """Generate and judge one candidate unless the round is already won."""
+        if stop.is_set():
+            return None
+        start = time.perf_counter()
+        image = self.generator.generate(plan.prompt, plan.negative_prompt, seed,
+                                        plan.preferences.get("resolution"))
+        judge_start = time.perf_counter()
+        verdict = self.judge.judge(image, plan.preferences)
+        return image, verdict, judge_start - start, time.perf_counter() - judge_start
+
+    def generate(self, preferences: Dict[str, Any]) -> GenerationResult:
+        """Run up to ``rounds`` fan-outs and return the best candidate."""
+        start = time.perf_counter()
+        plan = self.planner.plan(preferences)
+        result = GenerationResult(accepted=False, stop_reason=STOP_MAX_ITERATIONS,
+                                  image=None, verdict=None, plan=plan)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for round_index in range(self.rounds):
+                if round_index > 0:
+                    plan = self.planner.refine(result.plan, result.verdict)
+                if self._run_round(executor, plan, round_index, result):
+                    break
+        finally:
+            # Return as soon as a winner is found instead of waiting for stragglers
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        result.total_seconds = time.perf_counter() - start
+        return result
+
+    def _run_round(self, executor: ThreadPoolExecutor, plan: StylePlan, round_index: int,
+                   result: GenerationResult) -> bool:
+        """Fan one round out; return True once a candidate is accepted."""
+        stop = threading.Event()
+        futures = {}
+        for variant_index, (variant, seed) in enumerate(self.variants(plan, round_index)):
+            future = executor.submit(self._run_candidate, variant, seed, stop)
+            futures[future] = (round_index * self.candidates + variant_index, variant, seed)
+
+        try:
+            for future in as_completed(futures):
+                outcome = future.result()
+                if outcome is None:
+                    continue
+                image, verdict, generation_seconds, judge_seconds = outcome
+                iteration, variant, seed = futures[future]
+                cost = image.compute_units + verdict.compute_units
+                result.total_compute_units += cost
+                result.iterations.append(IterationRecord(
+                    iteration=iteration,
+                    prompt=variant.prompt,
+                    seed=seed,
+                    score=verdict.score,
+                    feedback=verdict.feedback,
+                    generation_seconds=generation_seconds,
+                    judge_seconds=judge_seconds,
+                    compute_units=cost
+                ))
+
+                if result.verdict is None or verdict.score > result.verdict.score:
+                    result.image, result.verdict, result.plan = image, verdict, variant
+                if verdict.score >= self.accept_threshold:
+                    result.accepted = True
+                    result.stop_reason = STOP_ACCEPTED
+                    return True
+            return False
+        finally:
+            # Drop queued candidates; running ones finish but are ignored
+            stop.set()
+            for future in futures:
+                future.cancel()
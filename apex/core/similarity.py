@@ -0,0 +1,267 @@
+"""
+Similarity index over saved profiles ("find portraits like this one").
+
+Each profile is reduced to the vocabulary codes of its choice fields plus
+an embedding of its custom notes. A query scores every profile at once
+with NumPy: weighted exact matches on the choice fields plus the cosine
+similarity of the notes.
+"""
+
+import re
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from ..config.vocabulary import Vocabulary, get_vocabulary
+
+# Choice fields compared by the index, with their default weights
+DEFAULT_FIELD_WEIGHTS = {
+    "purpose": 1.0,
+    "attire": 1.0,
+    "background": 1.0,
+    "vibe": 1.0,
+    "lighting": 0.5,
+    "mood": 0.5,
+    "age_range": 0.25,
+    "gender": 0.25,
+    "ethnicity": 0.25,
+    "resolution": 0.1,
+}
+
+WEIGHT_SCALE = 100
+
+# Score notes for every profile rather than a candidate subset above this share
+FULL_SCAN_FRACTION = 0.25
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+class TextEmbedder:
+    """Turns texts into L2-normalized float32 vectors of a fixed dimension."""
+
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed ``texts`` as an array of shape (len(texts), dim)."""
+        raise NotImplementedError
+
+class HashingEmbedder(TextEmbedder):
+    """
+    Dependency-free embedder hashing words and word pairs into ``dim`` buckets.
+
+    Deterministic across processes (CRC32, not ``hash``). Swap in a
+    sentence-transformer or similar for semantic matching.
+    """
+
+    def __init__(self, dim: int = 64):
+        self.dim = dim
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            if not text:
+                continue
+            words = _TOKEN_PATTERN.findall(text.lower())
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+def _flatten(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Accept ``ProfileData.to_dict()`` output as well as flat preferences."""
+    if "basic_info" not in data:
+        return data
+    flat = {}
+    for section in ("basic_info", "advanced_settings", "additional_info"):
+        flat.update(data.get(section) or {})
+    return flat
+
+class ProfileIndex:
+    """
+    In-memory k-nearest-neighbour index over profiles.
+
+    Stores one row of choice codes (uint8, or uint16 for a vocabulary with
+    256 or more options in a field) and one notes embedding (float32) per
+    profile in growable arrays, so a query is a handful of vectorized
+    comparisons and one matrix-vector product. Attach it to a
+    ``ProfileManager`` to keep it current as profiles are saved or deleted.
+    """
+
+    def __init__(self, vocabulary: Optional[Vocabulary] = None,
+                 embedder: Optional[TextEmbedder] = None,
+                 field_weights: Optional[Dict[str, float]] = None,
+                 notes_weight: float = 1.0, initial_capacity: int = 1024):
+        self.vocabulary = vocabulary or get_vocabulary()
+        self.embedder = embedder or HashingEmbedder()
+        weights = DEFAULT_FIELD_WEIGHTS if field_weights is None else field_weights
+        self.fields = [name for name in weights if name in self.vocabulary.fields]
+        self.field_weights = {name: weights[name] for name in self.fields}
+        # Field scores are summed as integers, weights quantized to 1/WEIGHT_SCALE
+        self._int_weights = [int(round(weights[name] * WEIGHT_SCALE)) for name in self.fields]
+        self._score_dtype = np.uint16 if sum(self._int_weights) < 2 ** 16 else np.uint32
+        self.notes_weight = notes_weight
+
+        largest = max((len(self.vocabulary.fields[name]) for name in self.fields), default=0)
+        code_dtype = np.uint8 if largest < 2 ** 8 else np.uint16
+        # One contiguous row per field, so each field comparison is a linear scan
+        self._codes = np.zeros((len(self.fields), initial_capacity), dtype=code_dtype)
+        self._notes = np.zeros((initial_capacity, self.embedder.dim), dtype=np.float32)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, profile_id: str) -> bool:
+        return profile_id in self._rows
+
+    def _encode_codes(self, flat: Dict[str, Any]) -> List[int]:
+        """Vocabulary code + 1 per field; 0 stands for missing or unknown."""
+        codes = []
+        for name in self.fields:
+            code = self.vocabulary.fields[name].codes.get(flat.get(name))
+            codes.append(0 if code is None else code + 1)
+        return codes
+
+    def _reserve(self, count: int):
+        """Grow the arrays (doubling) to hold ``count`` rows."""
+        capacity = len(self._notes)
+        if count <= capacity:
+            return
+        while capacity < count:
+            capacity *= 2
+        codes = np.zeros((self._codes.shape[0], capacity), dtype=self._codes.dtype)
+        notes = np.zeros((capacity, self._notes.shape[1]), dtype=self._notes.dtype)
+        codes[:, :len(self._ids)] = self._codes[:, :len(self._ids)]
+        notes[:len(self._ids)] = self._notes[:len(self._ids)]
+        self._codes, self._notes = codes, notes
+
+    def add(self, profile_id: str, data: Dict[str, Any]):
+        """Index (or re-index) one profile."""
+        self.add_many([(profile_id, data)])
+
+    def add_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]):
+        """Index many profiles, embedding their notes in one call."""
+        items = [(profile_id, _flatten(data)) for profile_id, data in items]
+        if not items:
+            return
+        codes = np.array([self._encode_codes(flat) for _, flat in items], dtype=self._codes.dtype)
+        notes = self.embedder.embed([flat.get("custom_notes") or "" for _, flat in items])
+
+        with self._lock:
+            self._reserve(len(self._ids) + len(items))
+            for i, (profile_id, _) in enumerate(items):
+                row = self._rows.get(profile_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._ids.append(profile_id)
+                    self._rows[profile_id] = row
+                self._codes[:, row] = codes[i]
+                self._notes[row] = notes[i]
+
+    def remove(self, profile_id: str) -> bool:
+        """Drop a profile, moving the last row into its place."""
+        with self._lock:
+            row = self._rows.pop(profile_id, None)
+            if row is None:
+                return False
+            last = len(self._ids) - 1
+            if row != last:
+                moved = self._ids[last]
+                self._ids[row] = moved
+                self._rows[moved] = row
+                self._codes[:, row] = self._codes[:, last]
+                self._notes[row] = self._notes[last]
+            self._ids.pop()
+            return True
+
+    def query(self, preferences: Dict[str, Any], k: int = 5,
+              min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        The ``k`` most similar profiles as (id, score), best first.
+
+        Scores are in [0, 1]: the weighted share of matching choice fields
+        among those given in ``preferences``, plus the notes similarity when
+        the query has notes.
+        """
+        flat = _flatten(preferences)
+        query_codes = self._encode_codes(flat)
+        notes = flat.get("custom_notes") or ""
+        query_notes = self.embedder.embed([notes])[0] if notes else None
+
+        with self._lock:
+            count = len(self._ids)
+            if count == 0 or k <= 0:
+                return []
+            k = min(k, count)
+
+            # Weighted exact matches on the choice fields, in integer units
+            field_scores = np.zeros(count, dtype=self._score_dtype)
+            matches = np.empty(count, dtype=bool)
+            total_weight = 0
+            for column, code in enumerate(query_codes):
+                weight = self._int_weights[column]
+                if code == 0 or weight == 0:
+                    continue
+                np.equal(self._codes[column, :count], code, out=matches)
+                field_scores += matches * self._score_dtype(weight)
+                total_weight += weight
+            total = total_weight / WEIGHT_SCALE
+
+            if query_notes is None:
+                rows = np.arange(count)
+                scores = field_scores / WEIGHT_SCALE
+            else:
+                total += self.notes_weight
+                # Notes add at most notes_weight, so a profile whose field
+                # score trails the k-th best by more than that cannot rank
+                kth_best = int(np.partition(field_scores, count - k)[count - k])
+                cutoff = kth_best - self.notes_weight * WEIGHT_SCALE
+                rows = np.flatnonzero(field_scores >= cutoff)
+                if len(rows) > FULL_SCAN_FRACTION * count:
+                    rows = np.arange(count)
+                    notes = self._notes[:count]
+                else:
+                    notes = self._notes[rows]
+                # Opposed notes count as unrelated, not as a penalty
+                similarity = np.maximum(notes @ query_notes, 0)
+                scores = field_scores[rows] / WEIGHT_SCALE + self.notes_weight * similarity
+            if total == 0:
+                return []
+            scores /= total
+
+            k = min(k, len(rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(self._ids[rows[i]], float(scores[i])) for i in top if scores[i] >= min_score]
+
+    def best_match(self, preferences: Dict[str, Any], min_score: float = 0.95) -> Optional[Tuple[str, float]]:
+        """The closest profile if it scores at least ``min_score``, e.g. to reuse its prompt."""
+        matches = self.query(preferences, k=1, min_score=min_score)
+        return matches[0] if matches else None
+
+    def attach(self, profile_manager) -> "ProfileIndex":
+        """Keep the index current with a manager's saves and deletes."""
+        profile_manager.add_save_listener(self.add_many)
+        profile_manager.add_delete_listener(self.remove)
+        return self
+
+    @classmethod
+    def build(cls, profile_manager, batch_size: int = 1000, attach: bool = True, **kwargs) -> "ProfileIndex":
+        """Index every profile a manager has saved, optionally attaching to it."""
+        index = cls(**kwargs)
+        if attach:
+            # Attach first so saves made while building are not missed
+            index.attach(profile_manager)
+        batch = []
+        for profile_id in profile_manager.iter_profiles():
+            data = profile_manager.load_profile(profile_id)
+            if data is not None:
+                batch.append((profile_id, data))
+            if len(batch) >= batch_size:
+                index.add_many(batch)
+                batch = []
+        index.add_many(batch)
+        return index
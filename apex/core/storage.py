@@ -0,0 +1,676 @@
+"""
+Storage backends for saved profiles.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Tuple, Callable
+from ..models.profile import ProfileSummary
+from ..utils.file_utils import atomic_write, atomic_write_many, sync_directory
+from ..utils.serialization import dumps_json, loads_json
+
+# Profile fields that storage backends can filter on
+INDEXED_FIELDS = ("purpose", "attire", "background", "vibe", "preset_used")
+
+# Records the on-disk layout of a JSON profile directory (absent means flat)
+LAYOUT_FILE = ".apex-layout"
+LAYOUTS = ("flat", "sharded")
+
+def extract_index_fields(data: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """Pull the indexed fields out of a serialized profile."""
+    basic_info = data.get("basic_info") or {}
+    additional_info = data.get("additional_info") or {}
+    metadata = data.get("metadata") or {}
+    return {
+        "timestamp": metadata.get("timestamp"),
+        "purpose": basic_info.get("purpose"),
+        "attire": basic_info.get("attire"),
+        "background": basic_info.get("background"),
+        "vibe": basic_info.get("vibe"),
+        "preset_used": additional_info.get("preset_used")
+    }
+
+# (timestamp, id): the order summaries are listed in; a missing timestamp is ""
+SortKey = Tuple[str, str]
+
+def sort_key(profile_id: str, data: Dict[str, Any]) -> SortKey:
+    return extract_index_fields(data).get("timestamp") or "", profile_id
+
+def encode_cursor(key: SortKey) -> str:
+    """Opaque cursor string for a summary listing position."""
+    return f"{key[0]}|{key[1]}"
+
+def decode_cursor(cursor: str) -> SortKey:
+    """Inverse of ``encode_cursor``; raises ``ValueError`` for anything else."""
+    # Profile ids never contain "|", so the last one separates them
+    timestamp, separator, profile_id = cursor.rpartition("|")
+    if not separator or not profile_id:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return timestamp, profile_id
+
+def _check_filters(filters: Dict[str, str]) -> None:
+    for key in filters:
+        if key not in INDEXED_FIELDS:
+            raise ValueError(f"Cannot filter on unindexed field: {key}")
+
+class ProfileStore:
+    """Base class for profile storage backends.
+
+    Profiles are addressed by a string id (the filename used by the
+    original JSON layout, e.g. ``portrait_profile_<...>.json``) and stored
+    as the dictionary produced by ``ProfileData.to_dict``.
+    """
+
+    def save(self, profile_id: str, data: Dict[str, Any]) -> str:
+        """Persist a profile and return its location."""
+        raise NotImplementedError
+
+    def save_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """Persist several (profile_id, data) pairs and return their locations."""
+        return [self.save(profile_id, data) for profile_id, data in items]
+
+    def load(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Load a profile, or None if it does not exist."""
+        raise NotImplementedError
+
+    def delete(self, profile_id: str) -> bool:
+        """Delete a profile, returning True if it existed."""
+        raise NotImplementedError
+
+    def exists(self, profile_id: str) -> bool:
+        """Check whether a profile exists."""
+        raise NotImplementedError
+
+    def list_ids(self) -> List[str]:
+        """List all stored profile ids."""
+        raise NotImplementedError
+
+    def iter_ids(self) -> Iterator[str]:
+        """Iterate over the stored profile ids (lazily where the backend allows)."""
+        return iter(self.list_ids())
+
+    def count(self) -> int:
+        """Number of stored profiles."""
+        return len(self.list_ids())
+
+    def query(self, filters: Optional[Dict[str, str]] = None, limit: Optional[int] = None,
+              offset: int = 0, newest_first: bool = True) -> List[str]:
+        """Return profile ids matching ``filters``, ordered by timestamp."""
+        raise NotImplementedError
+
+    def sort_keys(self) -> Iterable[SortKey]:
+        """(timestamp, id) of every readable profile."""
+        for profile_id in self.iter_ids():
+            data = self.load(profile_id)
+            if data is not None:
+                yield sort_key(profile_id, data)
+
+    def summary_pages(self, filters: Optional[Dict[str, str]] = None, newest_first: bool = True,
+                      after: Optional[SortKey] = None,
+                      page_size: int = 100) -> Iterator[Tuple[List[ProfileSummary], SortKey]]:
+        """
+        Yield summaries of the profiles matching ``filters``, one page at a time.
+
+        Profiles are ordered by (timestamp, id), like ``query``. Each page
+        comes with the key of its last profile; pass it as ``after`` to
+        resume listing there. Only one page of profiles is loaded at a
+        time: each page takes one pass over ``sort_keys`` to pick the next
+        candidates, which are then loaded and filtered.
+        """
+        filters = filters or {}
+        _check_filters(filters)
+        select = heapq.nlargest if newest_first else heapq.nsmallest
+        # Over-fetch candidates when filtering, since some will be rejected,
+        # and fetch more each time a pass leaves the page short so a rare
+        # match doesn't cost a pass per few hundred ids
+        batch_size = page_size if not filters else max(page_size, 256)
+        max_batch_size = max(page_size, 16384)
+        page: List[ProfileSummary] = []
+        while True:
+            if after is None:
+                candidates = self.sort_keys()
+            elif newest_first:
+                candidates = (key for key in self.sort_keys() if key < after)
+            else:
+                candidates = (key for key in self.sort_keys() if key > after)
+            batch = select(batch_size, candidates)
+            filled = False
+            for key in batch:
+                after = key
+                profile_id = key[1]
+                data = self.load(profile_id)
+                if data is None:
+                    continue
+                fields = extract_index_fields(data)
+                if not all(fields.get(key) == value for key, value in filters.items()):
+                    continue
+                try:
+                    page.append(ProfileSummary.from_dict(profile_id, data))
+                except ValueError:
+                    continue
+                if len(page) == page_size:
+                    yield page, after
+                    page = []
+                    filled = True
+            if len(batch) < batch_size:
+                break
+            if not filled:
+                batch_size = min(batch_size * 2, max_batch_size)
+        if page:
+            yield page, after
+
+    def location(self, profile_id: str) -> str:
+        """Human readable location of a profile."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+
+class JSONDirectoryStore(ProfileStore):
+    """One JSON file per profile in a flat directory (the original layout)."""
+
+    def __init__(self, profiles_dir: str):
+        self.profiles_dir = profiles_dir
+        os.makedirs(self.profiles_dir, exist_ok=True)
+        # profile id -> ((st_mtime_ns, st_size, st_ino), timestamp) for sort_keys
+        self._timestamps: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+
+    def location(self, profile_id: str) -> str:
+        return os.path.join(self.profiles_dir, profile_id)
+
+    def _existing_path(self, profile_id: str) -> Optional[str]:
+        """Path of the file holding ``profile_id``, or None if there is none."""
+        filepath = self.location(profile_id)
+        return filepath if os.path.exists(filepath) else None
+
+    def save(self, profile_id: str, data: Dict[str, Any]) -> str:
+        filepath = self.location(profile_id)
+        atomic_write(filepath, dumps_json(data, indent=True))
+        return filepath
+
+    def save_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        return atomic_write_many(
+            (self.location(profile_id), dumps_json(data, indent=True))
+            for profile_id, data in items
+        )
+
+    def load(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        filepath = self._existing_path(profile_id)
+
+        if filepath is None:
+            return None
+
+        try:
+            with open(filepath, 'rb') as f:
+                return loads_json(f.read())
+        except (json.JSONDecodeError, IOError):
+            return None
+
+    def delete(self, profile_id: str) -> bool:
+        filepath = self._existing_path(profile_id)
+
+        if filepath is not None:
+            try:
+                os.remove(filepath)
+                return True
+            except OSError:
+                return False
+        return False
+
+    def exists(self, profile_id: str) -> bool:
+        return self._existing_path(profile_id) is not None
+
+    @staticmethod
+    def _scan(directory: str) -> Iterator[str]:
+        """Profile filenames directly inside ``directory``, read lazily."""
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.name.endswith('.json'):
+                        yield entry.name
+        except FileNotFoundError:
+            return
+
+    @staticmethod
+    def _listdir(directory: str) -> List[str]:
+        """Profile filenames directly inside ``directory`` (faster than ``_scan`` for a full list)."""
+        try:
+            return [f for f in os.listdir(directory) if f.endswith('.json')]
+        except FileNotFoundError:
+            return []
+
+    def iter_ids(self) -> Iterator[str]:
+        return self._scan(self.profiles_dir)
+
+    def list_ids(self) -> List[str]:
+        return self._listdir(self.profiles_dir)
+
+    def count(self) -> int:
+        return sum(1 for _ in self.iter_ids())
+
+    def sort_keys(self) -> Iterator[SortKey]:
+        # Timestamps live inside the files, so only files changed since the
+        # last pass are parsed again; the rest cost a stat
+        cached = self._timestamps
+        seen = {}
+        for profile_id in self.iter_ids():
+            try:
+                st = os.stat(self.location(profile_id))
+            except FileNotFoundError:
+                # A sharded store may still hold it at its flat-layout path
+                try:
+                    st = os.stat(self._existing_path(profile_id) or "")
+                except OSError:
+                    continue
+            except OSError:
+                continue
+            signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+            entry = cached.get(profile_id)
+            if entry is None or entry[0] != signature:
+                data = self.load(profile_id)
+                if data is None:
+                    continue
+                entry = (signature, sort_key(profile_id, data)[0])
+            seen[profile_id] = entry
+            yield entry[1], profile_id
+        self._timestamps = seen
+
+    def query(self, filters: Optional[Dict[str, str]] = None, limit: Optional[int] = None,
+              offset: int = 0, newest_first: bool = True) -> List[str]:
+        # No index: every file has to be parsed to filter and order it
+        filters = filters or {}
+        _check_filters(filters)
+        matches = []
+        for profile_id in self.iter_ids():
+            data = self.load(profile_id)
+            if data is None:
+                continue
+            fields = extract_index_fields(data)
+            if all(fields.get(key) == value for key, value in filters.items()):
+                matches.append((fields.get("timestamp") or "", profile_id))
+
+        matches.sort(reverse=newest_first)
+        ids = [profile_id for _, profile_id in matches[offset:]]
+        return ids if limit is None else ids[:limit]
+
+def shard_path(profile_id: str, depth: int) -> str:
+    """
+    Relative shard directory of a profile id, e.g. ``"3f"`` or ``"3f/a0"``.
+
+    Shards are named by a hash of the id rather than its own prefix: profile
+    ids are ULIDs, whose leading characters are the creation time, so a
+    prefix would send every new profile to the same directory.
+    """
+    digest = hashlib.blake2b(profile_id.encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(*(digest[2 * level:2 * level + 2] for level in range(depth)))
+
+class ShardedDirectoryStore(JSONDirectoryStore):
+    """
+    One JSON file per profile, spread over 256**depth subdirectories.
+
+    Keeps every directory small enough for ext4 and NFS to stay fast at
+    millions of profiles. Profiles left at the top level by the flat layout
+    are still found (and moved into their shard when saved again), so a
+    directory stays usable while ``migrate_to_sharded`` runs.
+    """
+
+    def __init__(self, profiles_dir: str, depth: int = 1):
+        super().__init__(profiles_dir)
+        if not 1 <= depth <= 4:
+            raise ValueError("Shard depth must be between 1 and 4")
+        self.depth = depth
+        self._shards = set()
+        # Whether flat-layout files may still be at the top level
+        self._legacy = next(self._scan(profiles_dir), None) is not None
+
+    def location(self, profile_id: str) -> str:
+        return os.path.join(self.profiles_dir, shard_path(profile_id, self.depth), profile_id)
+
+    def _existing_path(self, profile_id: str) -> Optional[str]:
+        filepath = self.location(profile_id)
+        if os.path.exists(filepath):
+            return filepath
+        legacy = os.path.join(self.profiles_dir, profile_id)
+        return legacy if os.path.exists(legacy) else None
+
+    def _ensure_shard(self, filepath: str):
+        directory = os.path.dirname(filepath)
+        if directory not in self._shards:
+            os.makedirs(directory, exist_ok=True)
+            self._shards.add(directory)
+
+    def _drop_legacy(self, profile_id: str):
+        """Remove a superseded top-level copy of a profile."""
+        if self._legacy:
+            try:
+                os.remove(os.path.join(self.profiles_dir, profile_id))
+            except FileNotFoundError:
+                pass
+
+    def save(self, profile_id: str, data: Dict[str, Any]) -> str:
+        self._ensure_shard(self.location(profile_id))
+        filepath = super().save(profile_id, data)
+        self._drop_legacy(profile_id)
+        return filepath
+
+    def save_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        items = list(items)
+        for profile_id, _ in items:
+            self._ensure_shard(self.location(profile_id))
+        locations = super().save_many(items)
+        for profile_id, _ in items:
+            self._drop_legacy(profile_id)
+        return locations
+
+    def delete(self, profile_id: str) -> bool:
+        deleted = False
+        # Both copies can exist if a flat-layout process wrote one mid-migration
+        while True:
+            filepath = self._existing_path(profile_id)
+            if filepath is None:
+                return deleted
+            try:
+                os.remove(filepath)
+            except OSError:
+                return deleted
+            deleted = True
+
+    def _walk(self, directory: str, level: int) -> Iterator[str]:
+        if level == self.depth:
+            # Shards are small, so each is read in one call
+            yield from self._listdir(directory)
+            return
+        try:
+            with os.scandir(directory) as it:
+                shards = sorted(entry.path for entry in it
+                                if len(entry.name) == 2 and entry.is_dir(follow_symlinks=False))
+        except FileNotFoundError:
+            return
+        for shard in shards:
+            yield from self._walk(shard, level + 1)
+
+    def iter_ids(self) -> Iterator[str]:
+        """Walk the shards one directory at a time, then any flat-layout leftovers."""
+        yield from self._walk(self.profiles_dir, 0)
+        for profile_id in self._scan(self.profiles_dir):
+            if not os.path.exists(self.location(profile_id)):
+                yield profile_id
+
+    def list_ids(self) -> List[str]:
+        return list(self.iter_ids())
+
+def read_layout(profiles_dir: str) -> Dict[str, Any]:
+    """The layout recorded in a profile directory (flat if none is recorded)."""
+    try:
+        with open(os.path.join(profiles_dir, LAYOUT_FILE), "rb") as f:
+            layout = loads_json(f.read())
+    except FileNotFoundError:
+        return {"layout": "flat"}
+    if not isinstance(layout, dict) or layout.get("layout") not in LAYOUTS:
+        raise ValueError(f"Unrecognised profile layout file in {profiles_dir}")
+    return layout
+
+def write_layout(profiles_dir: str, layout: str, depth: int = 1) -> None:
+    """Record the layout of a profile directory."""
+    os.makedirs(profiles_dir, exist_ok=True)
+    atomic_write(os.path.join(profiles_dir, LAYOUT_FILE),
+                 dumps_json({"layout": layout, "depth": depth}, indent=True))
+
+def open_directory_store(profiles_dir: str, layout: str = "flat", shard_depth: int = 1) -> JSONDirectoryStore:
+    """
+    Open a JSON profile directory in the layout it records.
+
+    ``layout`` and ``shard_depth`` only apply to a directory with no recorded
+    layout; choosing "sharded" records it, and any flat-layout profiles
+    already there stay readable until ``migrate_to_sharded`` moves them.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown profile directory layout: {layout}")
+    recorded = read_layout(profiles_dir)
+    if recorded["layout"] == "sharded":
+        return ShardedDirectoryStore(profiles_dir, int(recorded.get("depth", 1)))
+    if layout == "sharded":
+        store = ShardedDirectoryStore(profiles_dir, shard_depth)
+        write_layout(profiles_dir, "sharded", shard_depth)
+        return store
+    return JSONDirectoryStore(profiles_dir)
+
+def migrate_to_sharded(profiles_dir: str, depth: int = 1,
+                       progress: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+    """
+    Move a flat profile directory into the sharded layout, online.
+
+    The layout is recorded first, so processes that open the directory from
+    then on use the sharded store, which also reads the files not yet
+    moved. Each file is hard-linked into its shard and then unlinked, so a
+    profile is never missing; if the shard already holds a newer copy
+    (saved through a sharded store meanwhile) the flat one is just removed.
+    Running it again finishes an interrupted migration or picks up files
+    written by processes still using the flat layout. Returns counts of
+    ``moved`` and ``superseded`` files.
+    """
+    recorded = read_layout(profiles_dir)
+    if recorded["layout"] == "sharded":
+        depth = int(recorded.get("depth", 1))
+    store = ShardedDirectoryStore(profiles_dir, depth)
+    if recorded["layout"] == "flat":
+        write_layout(profiles_dir, "sharded", depth)
+
+    moved = superseded = 0
+    touched = set()
+    for profile_id in JSONDirectoryStore._scan(profiles_dir):
+        source = os.path.join(profiles_dir, profile_id)
+        target = store.location(profile_id)
+        store._ensure_shard(target)
+        try:
+            os.link(source, target)
+            moved += 1
+            touched.add(os.path.dirname(target))
+        except FileExistsError:
+            superseded += 1
+        except FileNotFoundError:
+            continue  # deleted or moved by someone else meanwhile
+        try:
+            os.remove(source)
+        except FileNotFoundError:
+            pass
+        if progress is not None and (moved + superseded) % 10000 == 0:
+            progress(moved + superseded)
+
+    for directory in touched:
+        sync_directory(directory)
+    sync_directory(profiles_dir)
+    return {"moved": moved, "superseded": superseded}
+
+class SQLiteProfileStore(ProfileStore):
+    """Embedded SQLite store with indexes on the commonly filtered fields."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Gradio calls handlers from worker threads, so share one connection
+        # behind a lock rather than tying it to the creating thread.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create the profiles table and its indexes."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                " id TEXT PRIMARY KEY,"
+                " timestamp TEXT,"
+                " purpose TEXT,"
+                " attire TEXT,"
+                " background TEXT,"
+                " vibe TEXT,"
+                " preset_used TEXT,"
+                " data TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_profiles_timestamp ON profiles (timestamp, id)"
+            )
+            # Missing timestamps are stored as "" so (timestamp, id) keysets can compare them
+            self._conn.execute("UPDATE profiles SET timestamp = '' WHERE timestamp IS NULL")
+            for field_name in INDEXED_FIELDS:
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_profiles_{field_name} "
+                    f"ON profiles ({field_name}, timestamp)"
+                )
+
+    def location(self, profile_id: str) -> str:
+        return f"{self.db_path}#{profile_id}"
+
+    @staticmethod
+    def _row(profile_id: str, data: Dict[str, Any]) -> Tuple:
+        """Build the table row for a profile."""
+        fields = extract_index_fields(data)
+        return (
+            profile_id,
+            fields["timestamp"] or "",
+            fields["purpose"],
+            fields["attire"],
+            fields["background"],
+            fields["vibe"],
+            fields["preset_used"],
+            dumps_json(data).decode("utf-8")
+        )
+
+    def save(self, profile_id: str, data: Dict[str, Any]) -> str:
+        return self.save_many([(profile_id, data)])[0]
+
+    def save_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        rows = [self._row(profile_id, data) for profile_id, data in items]
+        # One transaction, hence one commit, for the whole batch
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO profiles "
+                "(id, timestamp, purpose, attire, background, vibe, preset_used, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return [self.location(row[0]) for row in rows]
+
+    def load(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM profiles WHERE id = ?", (profile_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        try:
+            return loads_json(row[0])
+        except json.JSONDecodeError:
+            return None
+
+    def delete(self, profile_id: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM profiles WHERE id = ?", (profile_id,))
+        return cursor.rowcount > 0
+
+    def exists(self, profile_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM profiles WHERE id = ?", (profile_id,)
+            ).fetchone()
+        return row is not None
+
+    def list_ids(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT id FROM profiles ORDER BY id").fetchall()
+        return [row[0] for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def query(self, filters: Optional[Dict[str, str]] = None, limit: Optional[int] = None,
+              offset: int = 0, newest_first: bool = True) -> List[str]:
+        filters = filters or {}
+        clauses = []
+        params: List[Any] = []
+        for key, value in filters.items():
+            if key not in INDEXED_FIELDS:
+                raise ValueError(f"Cannot filter on unindexed field: {key}")
+            clauses.append(f"{key} = ?")
+            params.append(value)
+
+        sql = "SELECT id FROM profiles"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        order = "DESC" if newest_first else "ASC"
+        sql += f" ORDER BY timestamp {order}, id {order}"
+        # SQLite requires a LIMIT clause before OFFSET; -1 means no limit
+        sql += " LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [row[0] for row in rows]
+
+    def sort_keys(self) -> Iterable[SortKey]:
+        with self._lock:
+            return self._conn.execute("SELECT timestamp, id FROM profiles").fetchall()
+
+    def summary_pages(self, filters: Optional[Dict[str, str]] = None, newest_first: bool = True,
+                      after: Optional[SortKey] = None,
+                      page_size: int = 100) -> Iterator[Tuple[List[ProfileSummary], SortKey]]:
+        # Keyset pagination on the (timestamp, id) index; the filters run in SQL
+        filters = filters or {}
+        _check_filters(filters)
+        order = "DESC" if newest_first else "ASC"
+        page: List[ProfileSummary] = []
+        while True:
+            clauses = [f"{key} = ?" for key in filters]
+            params: List[Any] = list(filters.values())
+            if after is not None:
+                clauses.append("(timestamp, id) < (?, ?)" if newest_first else "(timestamp, id) > (?, ?)")
+                params.extend(after)
+            sql = "SELECT timestamp, id, data FROM profiles"
+            if clauses:
+                sql += " WHERE " + " AND ".join(clauses)
+            sql += f" ORDER BY timestamp {order}, id {order} LIMIT ?"
+            params.append(page_size - len(page))
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+            for timestamp, profile_id, data in rows:
+                after = (timestamp, profile_id)
+                try:
+                    page.append(ProfileSummary.from_dict(profile_id, loads_json(data)))
+                except ValueError:
+                    continue
+            if len(page) == page_size:
+                yield page, after
+                page = []
+            elif not rows:
+                break
+        if page:
+            yield page, after
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def create_store(backend: str, profiles_dir: str, layout: str = "flat", shard_depth: int = 1) -> ProfileStore:
+    """
+    Create a storage backend by name ("json" or "sqlite").
+
+    ``layout`` and ``shard_depth`` choose how a new JSON directory is laid
+    out (see ``open_directory_store``).
+    """
+    if backend == "json":
+        return open_directory_store(profiles_dir, layout, shard_depth)
+    if backend == "sqlite":
+        return SQLiteProfileStore(os.path.join(profiles_dir, "profiles.db"))
+    raise ValueError(f"Unknown profile storage backend: {backend}")
@@ -0,0 +1,233 @@
+"""
+VLM judge client for OpenAI-compatible endpoints (e.g. vLLM, see VLM-Guide.md).
+"""
+
+import base64
+import json
+import math
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Sequence
+from .backends import ImageJudge, GeneratedImage, JudgeVerdict, JUDGED_FIELDS
+
+# Retry on throttling and transient server errors
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+MIME_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+    "ppm": "image/x-portable-pixmap",
+}
+
+RUBRIC_VERSION = "1"
+RUBRIC = (
+    "You are judging an AI-generated professional portrait against the client's request.\n"
+    "Request: {request}\n"
+    "Score each of {criteria} from 0 to 10 for how well the image matches, then give an "
+    "overall score from 0 to 10 and one sentence of feedback on what to improve.\n"
+    "Reply with JSON only: {{\"score\": <0-10>, \"criteria\": {{<name>: <0-10>}}, "
+    "\"feedback\": \"...\"}}"
+)
+BATCH_SUFFIX = (
+    "\nThere are {count} images, in order. Reply with a JSON array holding one such "
+    "object per image, in the same order."
+)
+
+_JSON_PATTERN = re.compile(r"(\{.*\}|\[.*\])", re.DOTALL)
+_SCORE_PATTERN = re.compile(r"score\"?\s*[:=]\s*([0-9]+(?:\.[0-9]+)?)", re.IGNORECASE)
+
+class JudgeError(RuntimeError):
+    """Raised when the judge endpoint cannot produce a verdict."""
+
+def parse_verdict(payload: Any, score_scale: float = 10.0) -> JudgeVerdict:
+    """Convert a parsed judge reply into a ``JudgeVerdict`` scored in [0, 1]."""
+    if not isinstance(payload, dict) or "score" not in payload:
+        raise JudgeError(f"Judge reply has no score: {payload!r}")
+
+    def normalize(value) -> float:
+        try:
+            score = float(value)
+        except (TypeError, ValueError):
+            raise JudgeError(f"Judge score is not a number: {value!r}") from None
+        if not math.isfinite(score):
+            raise JudgeError(f"Judge score is not a number: {value!r}")
+        return max(0.0, min(1.0, score / score_scale))
+
+    criteria = payload.get("criteria") or {}
+    return JudgeVerdict(
+        score=normalize(payload["score"]),
+        feedback=str(payload.get("feedback", "")),
+        criteria={str(name): normalize(value) for name, value in criteria.items()
+                  if isinstance(value, (int, float)) and math.isfinite(value)}
+    )
+
+def parse_reply(content: str, score_scale: float = 10.0) -> List[JudgeVerdict]:
+    """
+    Parse a model reply into verdicts.
+
+    Accepts a JSON object or array, optionally wrapped in prose or code
+    fences. Falls back to a bare ``score: N`` when there is no valid JSON.
+    """
+    match = _JSON_PATTERN.search(content)
+    if match:
+        try:
+            payload = json.loads(match.group(1))
+        except json.JSONDecodeError:
+            payload = None
+        if isinstance(payload, list):
+            return [parse_verdict(item, score_scale) for item in payload]
+        if isinstance(payload, dict):
+            return [parse_verdict(payload, score_scale)]
+
+    score = _SCORE_PATTERN.search(content)
+    if score:
+        return [parse_verdict({"score": score.group(1), "feedback": content.strip()}, score_scale)]
+    raise JudgeError(f"Could not parse judge reply: {content[:200]!r}")
+
+class VLMJudgeClient(ImageJudge):
+    """
+    Scores candidates with a VLM behind an OpenAI-compatible chat endpoint.
+
+    One pooled HTTP session is shared by all calls, at most ``max_in_flight``
+    requests run at once, and transient failures are retried with jittered
+    exponential backoff. ``images_per_request`` > 1 packs several candidates
+    into one request for models that accept multiple images.
+    """
+
+    def __init__(self, base_url: str, model: str, api_key: Optional[str] = None,
+                 max_in_flight: int = 8, timeout: float = 60.0, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 images_per_request: int = 1, max_tokens: int = 256,
+                 score_scale: float = 10.0, json_mode: bool = False):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.model = model
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.images_per_request = max(1, images_per_request)
+        self.max_tokens = max_tokens
+        self.score_scale = score_scale
+        self.json_mode = json_mode
+        self.rubric_version = RUBRIC_VERSION
+
+        self._requests = requests
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers["Content-Type"] = "application/json"
+        if api_key:
+            self._session.headers["Authorization"] = f"Bearer {api_key}"
+
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+
+    @classmethod
+    def from_config(cls, judge_config) -> "VLMJudgeClient":
+        """Create a client from a ``JudgeConfig``."""
+        return cls(
+            base_url=judge_config.base_url,
+            model=judge_config.model,
+            api_key=judge_config.api_key,
+            max_in_flight=judge_config.max_in_flight,
+            timeout=judge_config.timeout,
+            max_retries=judge_config.max_retries,
+            images_per_request=judge_config.images_per_request
+        )
+
+    def _build_messages(self, images: Sequence[GeneratedImage], preferences: Dict[str, Any]) -> List[Dict]:
+        """Build the chat message carrying the rubric and the images."""
+        request = ", ".join(f"{name}: {value}" for name, value in preferences.items()
+                            if value and isinstance(value, str))
+        criteria = ", ".join(name for name in JUDGED_FIELDS if preferences.get(name))
+        text = RUBRIC.format(request=request, criteria=criteria or "overall fit")
+        if len(images) > 1:
+            text += BATCH_SUFFIX.format(count=len(images))
+
+        content: List[Dict[str, Any]] = [{"type": "text", "text": text}]
+        for image in images:
+            mime = MIME_TYPES.get(image.format.lower(), "application/octet-stream")
+            encoded = base64.b64encode(image.data).decode("ascii")
+            content.append({"type": "image_url", "image_url": {"url": f"data:{mime};base64,{encoded}"}})
+        return [{"role": "user", "content": content}]
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Delay before retry ``attempt``, honouring Retry-After when given."""
+        if retry_after:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+        # Full jitter keeps many clients from retrying in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _post(self, body: Dict[str, Any]) -> str:
+        """POST a chat completion with retries; return the reply text."""
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            with self._slots:
+                try:
+                    response = self._session.post(self.url, json=body, timeout=self.timeout)
+                except (self._requests.ConnectionError, self._requests.Timeout) as e:
+                    last_error = f"{type(e).__name__}: {e}"
+                else:
+                    if response.status_code == 200:
+                        try:
+                            return response.json()["choices"][0]["message"]["content"]
+                        except (ValueError, KeyError, IndexError, TypeError):
+                            raise JudgeError(f"Malformed judge response: {response.text[:200]!r}")
+                    if response.status_code not in RETRY_STATUSES:
+                        raise JudgeError(f"Judge returned HTTP {response.status_code}: {response.text[:200]}")
+                    last_error = f"HTTP {response.status_code}"
+                    retry_after = response.headers.get("Retry-After")
+            if attempt < self.max_retries:
+                time.sleep(self._backoff(attempt, retry_after))
+        raise JudgeError(f"Judge request failed after {self.max_retries + 1} attempts: {last_error}")
+
+    def _judge_group(self, images: Sequence[GeneratedImage], preferences: Dict[str, Any]) -> List[JudgeVerdict]:
+        """Score one request's worth of images."""
+        body = {
+            "model": self.model,
+            "messages": self._build_messages(images, preferences),
+            "max_tokens": self.max_tokens * len(images),
+            "temperature": 0.0,
+        }
+        if self.json_mode:
+            body["response_format"] = {"type": "json_object"}
+        verdicts = parse_reply(self._post(body), self.score_scale)
+        if len(verdicts) != len(images):
+            if len(images) == 1:
+                return verdicts[:1]
+            # The model lost track of a multi-image request; score singly
+            return [self._judge_group([image], preferences)[0] for image in images]
+        return verdicts
+
+    def judge(self, image: GeneratedImage, preferences: Dict[str, Any]) -> JudgeVerdict:
+        """Score one image."""
+        return self._judge_group([image], preferences)[0]
+
+    def judge_batch(self, images: Sequence[GeneratedImage], preferences: Dict[str, Any]) -> List[JudgeVerdict]:
+        """Score many images concurrently, returning verdicts in input order."""
+        size = self.images_per_request
+        groups = [images[i:i + size] for i in range(0, len(images), size)]
+        futures = [self._executor.submit(self._judge_group, group, preferences) for group in groups]
+        verdicts = []
+        for future in futures:
+            verdicts.extend(future.result())
+        return verdicts
+
+    def close(self) -> None:
+        """Release pooled connections and worker threads."""
+        self._executor.shutdown(wait=True)
+        self._session.close()
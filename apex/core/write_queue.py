@@ -0,0 +1,109 @@
+"""
+Background persistence queue for asyncio request handlers.
+"""
+
+import asyncio
+from typing import Dict, Optional, List, Tuple
+from ..models.profile import ProfileData
+from .dedup import content_hash
+from .profile_manager import ProfileManager
+
+class AsyncProfileWriter:
+    """
+    Saves profiles on background workers so handlers never wait on disk.
+
+    The queue is bounded: once ``max_pending`` saves are outstanding,
+    ``submit`` waits for room, which pushes back on callers instead of
+    letting memory grow without limit when the disk falls behind. Workers
+    drain up to ``batch_size`` queued profiles at a time and write them with
+    ``ProfileManager.save_profiles``, which flushes each batch together.
+    """
+
+    def __init__(self, profile_manager: ProfileManager, max_pending: int = 256, workers: int = 2,
+                 batch_size: int = 64):
+        self.profile_manager = profile_manager
+        self.max_pending = max_pending
+        self.workers = workers
+        self.batch_size = batch_size
+        self.saved = 0
+        self.failed: List[Tuple[str, str]] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # content hash -> location of profiles queued in reference dedup mode
+        self._queued_content: Dict[str, str] = {}
+
+    def _start(self):
+        """Create the queue and workers on the running event loop."""
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, profile_data: ProfileData, filename: Optional[str] = None) -> str:
+        """
+        Queue a profile for saving and return where it will be stored.
+
+        Waits only if the queue is full. With ``dedup_mode="reference"`` a
+        duplicate of a saved or queued profile is not queued at all, and
+        that profile's location is returned instead.
+        """
+        if self._queue is None:
+            self._start()
+        manager = self.profile_manager
+        digest = None
+        if manager.dedup_mode == "reference":
+            digest = content_hash(profile_data.to_dict())
+            queued = self._queued_content.get(digest)
+            if queued is not None:
+                return queued
+            existing = await asyncio.to_thread(manager.duplicate_location, profile_data, filename)
+            if existing is not None:
+                return existing
+        filename = filename or manager.new_filename()
+        if not filename.endswith('.json'):
+            filename += '.json'
+        location = manager.store.location(filename)
+        if digest is not None:
+            self._queued_content.setdefault(digest, location)
+        await self._queue.put((profile_data, filename, digest))
+        return location
+
+    @property
+    def pending(self) -> int:
+        """Number of saves waiting in the queue."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self):
+        """Drain the queue in batches, running the blocking save in a thread."""
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            profiles = [profile_data for profile_data, _, _ in batch]
+            filenames = [filename for _, filename, _ in batch]
+            try:
+                await asyncio.to_thread(self.profile_manager.save_profiles, profiles,
+                                        self.batch_size, filenames)
+                self.saved += len(batch)
+            except Exception as e:
+                self.failed.extend((filename, str(e)) for filename in filenames)
+            finally:
+                # Saved profiles are found through the content index from now on
+                for _, filename, digest in batch:
+                    if digest is not None and \
+                            self._queued_content.get(digest) == self.profile_manager.store.location(filename):
+                        del self._queued_content[digest]
+                    self._queue.task_done()
+
+    async def flush(self):
+        """Wait until every queued profile has been saved or has failed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self):
+        """Flush outstanding saves and stop the workers."""
+        await self.flush()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
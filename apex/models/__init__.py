@@ -2,13 +2,17 @@
 Models package initialization.
 """
 
-from .profile import Profile, ProfileData, BasicInfo, AdvancedSettings, AdditionalInfo, Metadata
+from .profile import (Profile, ProfileData, ProfileSummary, BasicInfo, AdvancedSettings, AdditionalInfo, Metadata,
+                      SCHEMA_VERSION, upgrade_profile_dict)
 
 __all__ = [
     "Profile",
     "ProfileData", 
+    "ProfileSummary",
     "BasicInfo",
     "AdvancedSettings",
     "AdditionalInfo", 
-    "Metadata"
+    "Metadata",
+    "SCHEMA_VERSION",
+    "upgrade_profile_dict"
 ]
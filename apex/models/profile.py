@@ -2,11 +2,27 @@
 Data models for APEX profile system.
 """
 
+import sys
 from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
+from ..config.vocabulary import get_vocabulary
+from ..utils.serialization import dumps_json, loads_json, dumps_msgpack, loads_msgpack
 
-@dataclass
+# Current profile layout, written to Metadata.version
+SCHEMA_VERSION = "2.0"
+
+# Characters of the generated prompt shown in a profile summary
+PROMPT_PREVIEW_LENGTH = 120
+
+# Slots save memory when many profiles are kept loaded (Python 3.10+)
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+def _intern(value, _intern=sys.intern, _str=str):
+    """Intern strings so the few distinct choice values are shared by all profiles."""
+    return _intern(value) if type(value) is _str else value
+
+@dataclass(**_DATACLASS_OPTIONS)
 class BasicInfo:
     """Basic portrait information."""
     purpose: str
@@ -14,7 +30,7 @@ class BasicInfo:
     background: str
     vibe: str
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class AdvancedSettings:
     """Advanced portrait settings."""
     lighting: str = "Professional Flash"
@@ -24,21 +40,22 @@ class AdvancedSettings:
     ethnicity: str = "Not Specified"
     resolution: str = "1024x1024 (Standard)"
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class AdditionalInfo:
     """Additional profile information."""
     reference_photo: Optional[str] = None
     custom_notes: Optional[str] = None
     preset_used: Optional[str] = None
+    reference_photo_sha256: Optional[str] = None
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Metadata:
     """Profile metadata."""
     timestamp: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-    version: str = "2.0"
+    version: str = SCHEMA_VERSION
     created_by: str = "APEX Portrait Generator"
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ProfileData:
     """Complete profile data structure."""
     basic_info: BasicInfo
@@ -67,7 +84,8 @@ class ProfileData:
             "additional_info": {
                 "reference_photo": self.additional_info.reference_photo,
                 "custom_notes": self.additional_info.custom_notes,
-                "preset_used": self.additional_info.preset_used
+                "preset_used": self.additional_info.preset_used,
+                "reference_photo_sha256": self.additional_info.reference_photo_sha256
             },
             "metadata": {
                 "timestamp": self.metadata.timestamp,
@@ -77,6 +95,142 @@ class ProfileData:
             "generated_prompt": self.generated_prompt
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProfileData":
+        """
+        Build a profile from ``to_dict`` output, upgrading older layouts.
+
+        Raises ``ValueError`` for unknown schema versions or missing fields.
+        """
+        data = upgrade_profile_dict(data)
+        intern = _intern
+        try:
+            basic = data["basic_info"]
+            advanced = data.get("advanced_settings") or {}
+            additional = data.get("additional_info") or {}
+            metadata = data["metadata"]
+            default = _DEFAULT_ADVANCED
+            return cls(
+                BasicInfo(intern(basic["purpose"]), intern(basic["attire"]),
+                          intern(basic["background"]), intern(basic["vibe"])),
+                AdvancedSettings(
+                    intern(advanced.get("lighting", default.lighting)),
+                    intern(advanced.get("mood", default.mood)),
+                    intern(advanced.get("age_range", default.age_range)),
+                    intern(advanced.get("gender", default.gender)),
+                    intern(advanced.get("ethnicity", default.ethnicity)),
+                    intern(advanced.get("resolution", default.resolution))
+                ),
+                AdditionalInfo(
+                    additional.get("reference_photo"),
+                    additional.get("custom_notes"),
+                    intern(additional.get("preset_used")),
+                    additional.get("reference_photo_sha256")
+                ),
+                Metadata(
+                    metadata.get("timestamp") or Metadata().timestamp,
+                    intern(metadata.get("version", SCHEMA_VERSION)),
+                    intern(metadata.get("created_by", _DEFAULT_CREATED_BY))
+                ),
+                data.get("generated_prompt")
+            )
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"Invalid profile data: {e}") from e
+
+    def to_json(self, indent: bool = False) -> bytes:
+        """Encode as UTF-8 JSON."""
+        return dumps_json(self.to_dict(), indent)
+
+    @classmethod
+    def from_json(cls, data) -> "ProfileData":
+        """Decode JSON produced by ``to_json`` (or a saved profile file)."""
+        return cls.from_dict(loads_json(data))
+
+    def to_msgpack(self) -> bytes:
+        """Encode in the compact binary format (requires msgpack)."""
+        return dumps_msgpack(self.to_dict())
+
+    @classmethod
+    def from_msgpack(cls, data: bytes) -> "ProfileData":
+        """Decode a profile encoded by ``to_msgpack``."""
+        return cls.from_dict(loads_msgpack(data))
+
+@dataclass(**_DATACLASS_OPTIONS)
+class ProfileSummary:
+    """The few fields a profile listing shows, without the rest of the profile."""
+    id: str
+    timestamp: Optional[str]
+    purpose: Optional[str]
+    preset_used: Optional[str]
+    prompt_preview: Optional[str]
+
+    @classmethod
+    def from_dict(cls, profile_id: str, data: Dict[str, Any],
+                  preview_length: int = PROMPT_PREVIEW_LENGTH) -> "ProfileSummary":
+        """Summarize ``to_dict`` output (of any known version); raises ``ValueError`` if invalid."""
+        data = upgrade_profile_dict(data)
+        try:
+            prompt = data.get("generated_prompt")
+            if prompt and len(prompt) > preview_length:
+                prompt = prompt[:preview_length].rstrip() + "…"
+            return cls(
+                profile_id,
+                (data.get("metadata") or {}).get("timestamp"),
+                (data.get("basic_info") or {}).get("purpose"),
+                (data.get("additional_info") or {}).get("preset_used"),
+                prompt
+            )
+        except (TypeError, AttributeError) as e:
+            raise ValueError(f"Invalid profile data: {e}") from e
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "timestamp": self.timestamp,
+            "purpose": self.purpose,
+            "preset_used": self.preset_used,
+            "prompt_preview": self.prompt_preview
+        }
+
+_DEFAULT_ADVANCED = AdvancedSettings()
+_DEFAULT_CREATED_BY = Metadata.__dataclass_fields__["created_by"].default
+
+def _upgrade_from_1_0(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Nest the flat 1.0 layout (see user_form_simple.py) into sections."""
+    return {
+        "basic_info": {name: data.get(name) for name in ("purpose", "attire", "background", "vibe")},
+        "advanced_settings": {},
+        "additional_info": {
+            "reference_photo": data.get("reference_photo"),
+            "custom_notes": data.get("custom_notes")
+        },
+        "metadata": {
+            "timestamp": data.get("timestamp") or Metadata().timestamp,
+            "version": "2.0"
+        },
+        "generated_prompt": data.get("generated_prompt")
+    }
+
+# Upgrade steps keyed by the version they read; each returns the next version
+_UPGRADES = {
+    "1.0": _upgrade_from_1_0
+}
+
+def upgrade_profile_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Bring a profile dictionary of any known version to ``SCHEMA_VERSION``."""
+    if not isinstance(data, dict):
+        raise ValueError("Profile data must be a dictionary")
+    metadata = data.get("metadata")
+    # Only the flat 1.0 layout has no metadata section
+    version = metadata.get("version", SCHEMA_VERSION) if isinstance(metadata, dict) else "1.0"
+    while version != SCHEMA_VERSION:
+        upgrade = _UPGRADES.get(version)
+        if upgrade is None:
+            raise ValueError(f"Unsupported profile version: {version}")
+        data = upgrade(data)
+        version = data["metadata"]["version"]
+    return data
+
 class Profile:
     """Profile utility class for validation and operations."""
     
@@ -91,6 +245,15 @@ class Profile:
             return False, "⚠️ Please select a background style"
         if not vibe:
             return False, "⚠️ Please select your desired vibe"
+        return Profile.validate_choices(purpose=purpose, attire=attire, background=background, vibe=vibe)
+    
+    @staticmethod
+    def validate_choices(**values: str) -> Tuple[bool, str]:
+        """Check that each given choice field holds one of its vocabulary options."""
+        invalid = get_vocabulary().invalid_fields(values, values)
+        if invalid:
+            name = invalid[0]
+            return False, f"⚠️ '{values[name]}' is not a valid {name.replace('_', ' ')}"
         return True, "✅ All inputs valid"
     
     @staticmethod
@@ -99,11 +262,12 @@ class Profile:
                       age_range: str = "Not Specified", gender: str = "Not Specified",
                       ethnicity: str = "Not Specified", resolution: str = "1024x1024 (Standard)",
                       reference_photo: Optional[str] = None, custom_notes: Optional[str] = None,
-                      preset_used: Optional[str] = None) -> ProfileData:
+                      preset_used: Optional[str] = None,
+                      reference_photo_sha256: Optional[str] = None) -> ProfileData:
         """Create a ProfileData instance."""
         return ProfileData(
             basic_info=BasicInfo(purpose, attire, background, vibe),
             advanced_settings=AdvancedSettings(lighting, mood, age_range, gender, ethnicity, resolution),
-            additional_info=AdditionalInfo(reference_photo, custom_notes, preset_used),
+            additional_info=AdditionalInfo(reference_photo, custom_notes, preset_used, reference_photo_sha256),
             metadata=Metadata()
         )
@@ -2,27 +2,45 @@
 Gradio user interface for APEX portrait generation.
 """
 
+import asyncio
+import json
 import gradio as gr
 from typing import Optional, Tuple
 from ..core.profile_manager import ProfileManager
 from ..core.prompt_generator import PromptGenerator
+from ..core.instrumentation import get_instrumentation
+from ..core.write_queue import AsyncProfileWriter
+from ..models.profile import ProfileData
+from ..config.settings import config
 
 class APEXInterface:
     """Main interface class for APEX portrait generation."""
     
-    def __init__(self):
-        self.profile_manager = ProfileManager()
-        self.prompt_generator = PromptGenerator()
+    def __init__(self, profile_manager: Optional[ProfileManager] = None,
+                 prompt_generator: Optional[PromptGenerator] = None):
+        self.instrumentation = get_instrumentation()
+        self.profile_manager = self.instrumentation.instrument(
+            profile_manager or ProfileManager.from_config(config.profile, max_upload_size=config.ui.max_file_size)
+        )
+        self.prompt_generator = self.instrumentation.instrument(
+            prompt_generator or PromptGenerator(prompt_config=config.prompt)
+        )
+        self.writer = AsyncProfileWriter(
+            self.profile_manager,
+            max_pending=config.profile.write_queue_size,
+            workers=config.profile.write_workers,
+            batch_size=config.profile.write_batch_size
+        )
     
-    def collect_user_preferences(self, purpose: str, attire: str, background: str, vibe: str, 
-                               photo: Optional[str], custom_notes: str, lighting: str, 
-                               mood: str, age_range: str, gender: str, ethnicity: str,
-                               resolution: str, save_profile: bool, preset_name: str = None) -> Tuple[str, str, str, str]:
+    def _build_profile(self, purpose: str, attire: str, background: str, vibe: str,
+                       photo: Optional[str], custom_notes: str, lighting: str,
+                       mood: str, age_range: str, gender: str, ethnicity: str,
+                       resolution: str, preset_name: str = None) -> Tuple[Optional[ProfileData], str, str]:
         """
-        Collect and validate user preferences, then create a comprehensive style profile.
+        Validate preferences and build the profile with its generated prompt.
         
         Returns:
-            tuple: (JSON profile string, status message, advanced prompt, saved file path)
+            tuple: (ProfileData or None if invalid, validation message, advanced prompt)
         """
         # Create profile using ProfileManager
         profile_data, is_valid, message = self.profile_manager.create_profile(
@@ -42,7 +60,7 @@ class APEXInterface:
         )
         
         if not is_valid:
-            return "", message, "", ""
+            return None, message, ""
         
         # Generate advanced prompt
         prompt_data = {
@@ -56,6 +74,24 @@ class APEXInterface:
         }
         advanced_prompt = self.prompt_generator.generate_prompt(prompt_data)
         profile_data.generated_prompt = advanced_prompt
+        return profile_data, message, advanced_prompt
+    
+    def collect_user_preferences(self, purpose: str, attire: str, background: str, vibe: str, 
+                               photo: Optional[str], custom_notes: str, lighting: str, 
+                               mood: str, age_range: str, gender: str, ethnicity: str,
+                               resolution: str, save_profile: bool, preset_name: str = None) -> Tuple[str, str, str, str]:
+        """
+        Collect and validate user preferences, then create a comprehensive style profile.
+        
+        Returns:
+            tuple: (JSON profile string, status message, advanced prompt, saved file path)
+        """
+        profile_data, message, advanced_prompt = self._build_profile(
+            purpose, attire, background, vibe, photo, custom_notes, lighting,
+            mood, age_range, gender, ethnicity, resolution, preset_name
+        )
+        if profile_data is None:
+            return "", message, "", ""
         
         # Save to file if requested
         saved_file = ""
@@ -69,8 +105,44 @@ class APEXInterface:
             save_message = ""
         
         # Generate outputs
-        import json
-        json_output = json.dumps(profile_data.to_dict(), indent=2)
+        with self.instrumentation.stage("serialize"):
+            json_output = json.dumps(profile_data.to_dict(), indent=2)
+        success_message = f"✅ Advanced style profile generated successfully!{save_message}"
+        
+        return json_output, success_message, advanced_prompt, saved_file
+    
+    async def collect_user_preferences_async(self, purpose: str, attire: str, background: str, vibe: str,
+                                             photo: Optional[str], custom_notes: str, lighting: str,
+                                             mood: str, age_range: str, gender: str, ethnicity: str,
+                                             resolution: str, save_profile: bool,
+                                             preset_name: str = None) -> Tuple[str, str, str, str]:
+        """
+        Asyncio version of ``collect_user_preferences``.
+        
+        The profile is built in a worker thread, since ingesting a reference
+        photo hashes and copies the upload, and saving is handed to the
+        background write queue, so no step blocks other sessions on the event
+        loop. Failed background saves are recorded on ``self.writer.failed``.
+        
+        Returns:
+            tuple: (JSON profile string, status message, advanced prompt, saved file path)
+        """
+        profile_data, message, advanced_prompt = await asyncio.to_thread(
+            self._build_profile,
+            purpose, attire, background, vibe, photo, custom_notes, lighting,
+            mood, age_range, gender, ethnicity, resolution, preset_name
+        )
+        if profile_data is None:
+            return "", message, "", ""
+        
+        saved_file = ""
+        save_message = ""
+        if save_profile:
+            saved_file = await self.writer.submit(profile_data)
+            save_message = f" | 💾 Saving to: {saved_file}"
+        
+        with self.instrumentation.stage("serialize"):
+            json_output = json.dumps(profile_data.to_dict(), indent=2)
         success_message = f"✅ Advanced style profile generated successfully!{save_message}"
         
         return json_output, success_message, advanced_prompt, saved_file
@@ -92,6 +164,7 @@ def create_interface() -> gr.Blocks:
     """Create and configure the Gradio interface."""
     
     interface = APEXInterface()
+    vocabulary = interface.prompt_generator.vocabulary
     
     # Custom CSS for better styling
     css = """
@@ -148,21 +221,21 @@ def create_interface() -> gr.Blocks:
         with gr.Row():
             with gr.Column():
                 purpose = gr.Dropdown(
-                    choices=["LinkedIn", "Resume", "Corporate Website", "Personal Branding", "Business Card", "Other"],
+                    choices=vocabulary.choices("purpose"),
                     label="📌 What is the portrait for?"
                 )
                 attire = gr.Dropdown(
-                    choices=["Business Formal", "Business Casual", "Smart Casual", "Creative Professional", "Academic", "Other"],
+                    choices=vocabulary.choices("attire"),
                     label="👔 Preferred attire"
                 )
             
             with gr.Column():
                 background = gr.Dropdown(
-                    choices=["Corporate Office", "Plain Color", "Outdoor", "Studio-like", "Library/Academic", "Creative Space", "Other"],
+                    choices=vocabulary.choices("background"),
                     label="🏢 Background style"
                 )
                 vibe = gr.Dropdown(
-                    choices=["Confident", "Friendly", "Approachable", "Authoritative", "Creative", "Sophisticated", "Warm"],
+                    choices=vocabulary.choices("vibe"),
                     label="😊 Desired vibe"
                 )
         
@@ -172,36 +245,36 @@ def create_interface() -> gr.Blocks:
             with gr.Row():
                 with gr.Column():
                     lighting = gr.Dropdown(
-                        choices=["Natural Light", "Studio Lighting", "Soft Lighting", "Dramatic Lighting", "Golden Hour", "Professional Flash"],
+                        choices=vocabulary.choices("lighting"),
                         label="💡 Lighting Style",
-                        value="Professional Flash"
+                        value=vocabulary.default("lighting")
                     )
                     mood = gr.Dropdown(
-                        choices=["Professional", "Casual", "Serious", "Energetic", "Calm", "Inspiring"],
+                        choices=vocabulary.choices("mood"),
                         label="🎭 Overall Mood",
-                        value="Professional"
+                        value=vocabulary.default("mood")
                     )
                     resolution = gr.Dropdown(
-                        choices=["1024x1024 (Standard)", "1536x1024 (Wide)", "1024x1536 (Portrait)", "2048x2048 (High-Res)"],
+                        choices=vocabulary.choices("resolution"),
                         label="📐 Resolution",
-                        value="1024x1024 (Standard)"
+                        value=vocabulary.default("resolution")
                     )
                 
                 with gr.Column():
                     age_range = gr.Dropdown(
-                        choices=["20-30", "30-40", "40-50", "50-60", "60+", "Not Specified"],
+                        choices=vocabulary.choices("age_range"),
                         label="🎂 Age Range",
-                        value="Not Specified"
+                        value=vocabulary.default("age_range")
                     )
                     gender = gr.Dropdown(
-                        choices=["Male", "Female", "Non-binary", "Not Specified"],
+                        choices=vocabulary.choices("gender"),
                         label="👤 Gender",
-                        value="Not Specified"
+                        value=vocabulary.default("gender")
                     )
                     ethnicity = gr.Dropdown(
-                        choices=["Asian", "Black", "Caucasian", "Hispanic", "Middle Eastern", "Mixed", "Not Specified"],
+                        choices=vocabulary.choices("ethnicity"),
                         label="🌍 Ethnicity",
-                        value="Not Specified"
+                        value=vocabulary.default("ethnicity")
                     )
         
         # Upload and Notes Section
@@ -258,7 +331,7 @@ def create_interface() -> gr.Blocks:
         
         # Event handlers
         submit_btn.click(
-            fn=interface.collect_user_preferences,
+            fn=interface.collect_user_preferences_async,
             inputs=[purpose, attire, background, vibe, photo, custom_notes, 
                    lighting, mood, age_range, gender, ethnicity, resolution, save_profile],
             outputs=[output, status, advanced_prompt, saved_file]
@@ -270,8 +343,12 @@ def create_interface() -> gr.Blocks:
             outputs=[purpose, attire, background, vibe, custom_notes]
         )
         
+        # Advanced settings go back to their defaults: "" is not a valid choice
         clear_btn.click(
-            fn=lambda: ("", "", "", "", None, "", "", "", "", "", "", "", False, "", "", "", ""),
+            fn=lambda: ("", "", "", "", None, "",
+                        *(vocabulary.default(field) for field in
+                          ("lighting", "mood", "age_range", "gender", "ethnicity", "resolution")),
+                        False, "", "", "", ""),
             outputs=[purpose, attire, background, vibe, photo, custom_notes, 
                     lighting, mood, age_range, gender, ethnicity, resolution, save_profile,
                     output, status, advanced_prompt, saved_file]
@@ -302,4 +379,8 @@ def create_interface() -> gr.Blocks:
         - 📊 **Detailed Metadata**: Complete tracking and version information
         """)
     
+    demo.queue(
+        max_size=config.ui.queue_max_size,
+        default_concurrency_limit=config.ui.concurrency_limit
+    )
     return demo
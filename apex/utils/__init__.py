@@ -2,14 +2,29 @@
 Utils package initialization.
 """
 
-from .file_utils import ensure_directory, copy_file, get_file_size, format_file_size, sanitize_filename
+from .file_utils import (ensure_directory, copy_file, atomic_write, sync_directory,
+                         get_file_size, file_sha256, format_file_size, sanitize_filename)
+from .ids import new_ulid
 from .validators import Validator
 
 __all__ = [
     "ensure_directory",
     "copy_file", 
+    "atomic_write",
+    "sync_directory",
     "get_file_size",
+    "file_sha256",
     "format_file_size",
     "sanitize_filename",
+    "new_ulid",
+    "ImagePreprocessor",
+    "DerivedImageCache",
     "Validator"
 ]
+
+def __getattr__(name):
+    # Image processing imports Pillow, so it is only loaded when first used
+    if name in ("ImagePreprocessor", "DerivedImageCache"):
+        from . import image_processing
+        return getattr(image_processing, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
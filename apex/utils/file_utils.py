@@ -2,9 +2,13 @@
 Utility functions for APEX.
 """
 
+import hashlib
 import os
 import shutil
-from typing import Optional
+import sys
+import tempfile
+from functools import lru_cache
+from typing import Optional, Union, Iterable, Tuple, List
 
 def ensure_directory(path: str) -> None:
     """Ensure a directory exists, create if it doesn't."""
@@ -18,6 +22,125 @@ def copy_file(src: str, dst: str) -> bool:
     except (IOError, OSError):
         return False
 
+def atomic_write(path: str, data: Union[str, bytes], fsync: bool = True) -> None:
+    """
+    Write a file atomically by writing a temporary file and renaming it.
+    
+    Readers see either the old contents or the new ones, never a partial
+    write. With ``fsync`` disabled the caller is responsible for flushing
+    the data to disk (see ``sync_directory``).
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if fsync:
+        sync_directory(directory)
+
+def atomic_write_many(items: Iterable[Tuple[str, Union[str, bytes]]]) -> List[str]:
+    """
+    Atomically write many files with one flush for the whole batch.
+    
+    Every temporary file is written first, then all of them are flushed
+    together (see ``sync_files``), and only then renamed into place, so
+    every file is either absent or complete; each directory written to is
+    then fsynced once.
+    """
+    pending = []
+    try:
+        for path, data in items:
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            directory = os.path.dirname(path) or "."
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+            pending.append((tmp_path, path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+        sync_files([tmp_path for tmp_path, _ in pending])
+        
+        directories = set()
+        for tmp_path, path in pending:
+            os.replace(tmp_path, path)
+            directories.add(os.path.dirname(path) or ".")
+    except BaseException:
+        for tmp_path, _ in pending:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        raise
+    
+    for directory in directories:
+        sync_directory(directory)
+    return [path for _, path in pending]
+
+@lru_cache(maxsize=None)
+def _libc_syncfs():
+    """libc ``syncfs`` (Linux only, not wrapped by ``os``), or None."""
+    if not sys.platform.startswith("linux"):
+        return None
+    import ctypes
+
+    try:
+        syncfs = ctypes.CDLL(None, use_errno=True).syncfs
+    except (OSError, AttributeError):
+        return None
+    syncfs.argtypes = [ctypes.c_int]
+    return syncfs
+
+def _fsync_path(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def sync_files(paths: List[str]) -> None:
+    """
+    Flush written files to disk.
+    
+    Where ``syncfs`` is available this is one call per filesystem, however
+    many files there are; otherwise (or if it fails) each file is fsynced.
+    """
+    by_device = {}
+    for path in paths:
+        by_device.setdefault(os.stat(path).st_dev, []).append(path)
+    syncfs = _libc_syncfs()
+    for device_paths in by_device.values():
+        if syncfs is not None and len(device_paths) > 1:
+            fd = os.open(device_paths[0], os.O_RDONLY)
+            try:
+                if syncfs(fd) == 0:
+                    continue
+            finally:
+                os.close(fd)
+        for path in device_paths:
+            _fsync_path(path)
+
+def sync_directory(path: str) -> None:
+    """Flush directory entries (renames, creations) to disk where supported."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
 def get_file_size(filepath: str) -> Optional[int]:
     """Get file size in bytes."""
     try:
@@ -25,6 +148,14 @@ def get_file_size(filepath: str) -> Optional[int]:
     except OSError:
         return None
 
+def file_sha256(filepath: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 def format_file_size(size_bytes: int) -> str:
     """Format file size in human readable format."""
     if size_bytes == 0:
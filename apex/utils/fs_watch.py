@@ -0,0 +1,139 @@
+"""
+Change notification for a single directory.
+
+On Linux the kernel's inotify API is used through ctypes; elsewhere (or if
+inotify is unavailable, e.g. the watch limit is exhausted) the directory is
+rescanned on an interval instead.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import sys
+import time
+from typing import Optional, Set
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF)
+# Events meaning the watch itself is gone or events were dropped
+_RESCAN_MASK = IN_Q_OVERFLOW | IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+class DirectoryWatcher:
+    """Reports which entries of a directory changed since the last call."""
+
+    def changes(self) -> Optional[Set[str]]:
+        """
+        Names created, modified or removed since the previous call.
+
+        Returns None when the caller should rescan the whole directory
+        (the first call, dropped events, or a polling interval elapsing).
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the watcher."""
+
+class PollingWatcher(DirectoryWatcher):
+    """Asks for a full rescan at most every ``interval`` seconds."""
+
+    def __init__(self, path: str, interval: float = 2.0):
+        self.path = path
+        self.interval = interval
+        self._last_scan = None
+
+    def changes(self) -> Optional[Set[str]]:
+        now = time.monotonic()
+        if self._last_scan is not None and now - self._last_scan < self.interval:
+            return set()
+        self._last_scan = now
+        return None
+
+class InotifyWatcher(DirectoryWatcher):
+    """Non-blocking inotify watch on one directory (Linux only)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = -1
+        self._libc = _load_libc()
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise _os_error(path)
+        self._fd = fd
+        self._started = False
+        if self._libc.inotify_add_watch(fd, os.fsencode(path), WATCH_MASK) < 0:
+            error = _os_error(path)
+            self.close()
+            raise error
+
+    def changes(self) -> Optional[Set[str]]:
+        if self._fd < 0:
+            raise ValueError("watcher is closed")
+        names: Set[str] = set()
+        rescan = not self._started
+        self._started = True
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buffer):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                if mask & _RESCAN_MASK:
+                    rescan = True
+                elif length:
+                    name = buffer[offset:offset + length].rstrip(b"\0")
+                    names.add(os.fsdecode(name))
+                offset += length
+        return None if rescan else names
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __del__(self):
+        self.close()
+
+_libc = None
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        _libc = libc
+    return _libc
+
+def _os_error(path: str) -> OSError:
+    code = ctypes.get_errno()
+    return OSError(code, os.strerror(code), path)
+
+def create_watcher(path: str, poll_interval: float = 2.0) -> DirectoryWatcher:
+    """An inotify watcher where available, otherwise a polling one."""
+    try:
+        return InotifyWatcher(path)
+    except (OSError, AttributeError):
+        return PollingWatcher(path, poll_interval)
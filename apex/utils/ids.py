@@ -0,0 +1,51 @@
+"""
+Sortable unique identifiers for APEX records.
+"""
+
+import os
+import threading
+import time
+
+# Crockford's base32 alphabet, as used by the ULID spec
+_ENCODING = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+_lock = threading.Lock()
+_last_timestamp = -1
+_last_random = 0
+
+def _encode(value: int, length: int) -> str:
+    """Encode an integer as fixed-width Crockford base32."""
+    chars = []
+    for _ in range(length):
+        chars.append(_ENCODING[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+def new_ulid() -> str:
+    """
+    Generate a monotonic ULID.
+
+    The first 10 characters encode the millisecond timestamp and the last 16
+    are random, so IDs sort by creation time. IDs created within the same
+    millisecond in this process increment the random part instead of drawing
+    a new one, which keeps them strictly increasing.
+    """
+    global _last_timestamp, _last_random
+
+    with _lock:
+        timestamp = int(time.time() * 1000)
+        if timestamp <= _last_timestamp:
+            timestamp = _last_timestamp
+            randomness = _last_random + 1
+            if randomness > _RANDOM_MAX:
+                # Random space for this millisecond exhausted; borrow the next one
+                timestamp += 1
+                randomness = int.from_bytes(os.urandom(10), "big")
+        else:
+            randomness = int.from_bytes(os.urandom(10), "big")
+        _last_timestamp = timestamp
+        _last_random = randomness
+
+    return _encode(timestamp, 10) + _encode(randomness, 16)
@@ -0,0 +1,226 @@
+"""
+Reference photo preprocessing: orientation fix, EXIF strip, resized variants.
+"""
+
+import io
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+from .file_utils import atomic_write, file_sha256
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional until preprocessing is used
+    Image = None
+    ImageOps = None
+
+DEFAULT_SIZES = (256, 1024)
+JPEG_QUALITY = 90
+
+def _require_pillow():
+    """Raise a helpful error if Pillow is missing."""
+    if Image is None:
+        raise ImportError("Image preprocessing requires Pillow: pip install Pillow")
+
+def render_variants(source_path: str, targets: Dict[int, str]) -> Dict[int, str]:
+    """
+    Decode ``source_path`` once and write a JPEG variant per target size.
+
+    ``targets`` maps the longest-edge size to the output path. Variants are
+    orientation-corrected and carry no EXIF data. Runs in worker processes.
+    """
+    _require_pillow()
+    largest = max(targets)
+    with Image.open(source_path) as image:
+        # Let the JPEG decoder downscale by a power of two while decoding
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGB")
+
+        # Largest first, so each smaller variant resamples fewer pixels
+        for size in sorted(targets, reverse=True):
+            image.thumbnail((size, size), Image.LANCZOS)
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+            atomic_write(targets[size], buffer.getvalue(), fsync=False)
+
+    return dict(targets)
+
+class DerivedImageCache:
+    """
+    On-disk cache of derived images keyed by source hash and target size.
+
+    Files live at ``<cache_dir>/<hash[:2]>/<hash>_<size>.jpg``. Hits refresh
+    the file's modification time, and once the cache holds more than
+    ``max_bytes`` the least recently used files are evicted.
+    """
+
+    def __init__(self, cache_dir: str = "data/derived", max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, profile_config) -> "DerivedImageCache":
+        """Create a cache from a ``ProfileConfig``."""
+        return cls(profile_config.derived_dir, profile_config.derived_cache_bytes)
+
+    def path_for(self, sha256: str, size: int) -> str:
+        """Cache path for a variant."""
+        return os.path.join(self.cache_dir, sha256[:2], f"{sha256}_{size}.jpg")
+
+    def get(self, sha256: str, size: int) -> Optional[str]:
+        """Return the cached variant path, or None on a miss."""
+        path = self.path_for(sha256, size)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def _scan(self) -> Iterable[Tuple[float, int, str]]:
+        """Yield (mtime, size, path) for every cached file."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".jpg"):
+                    stat = entry.stat()
+                    yield stat.st_mtime, stat.st_size, entry.path
+
+    @property
+    def total_bytes(self) -> int:
+        """Bytes currently held by the cache."""
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._scan())
+            return self._total_bytes
+
+    def add(self, paths: Iterable[str]) -> None:
+        """Account for newly written variants and evict if over budget."""
+        added = 0
+        for path in paths:
+            try:
+                added += os.path.getsize(path)
+            except OSError:
+                pass
+        with self._lock:
+            if self._total_bytes is None:
+                # The first scan already counts the files just written
+                self._total_bytes = sum(size for _, size, _ in self._scan())
+            else:
+                self._total_bytes += added
+            over_budget = self._total_bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def evict(self) -> int:
+        """Remove least recently used variants until within budget; return bytes freed."""
+        with self._lock:
+            entries = sorted(self._scan())
+            total = sum(size for _, size, _ in entries)
+            freed = 0
+            for _, size, path in entries:
+                if total - freed <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    freed += size
+                except OSError:
+                    pass
+            self._total_bytes = total - freed
+            return freed
+
+class ImagePreprocessor:
+    """
+    Produces resized, orientation-corrected copies of reference photos.
+
+    Decoding and resizing run in a process pool. All sizes requested for one
+    photo are rendered from a single decode, and concurrent requests for the
+    same photo share one job.
+    """
+
+    def __init__(self, cache: Optional[DerivedImageCache] = None, sizes: Iterable[int] = DEFAULT_SIZES,
+                 max_workers: Optional[int] = None):
+        _require_pillow()
+        self.cache = cache or DerivedImageCache()
+        self.sizes = tuple(sizes)
+        self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple[str, Tuple[int, ...]], Future] = {}
+
+    @classmethod
+    def from_config(cls, profile_config, **kwargs) -> "ImagePreprocessor":
+        """Create a preprocessor caching under ``ProfileConfig.derived_dir`` within its byte budget."""
+        return cls(DerivedImageCache.from_config(profile_config), **kwargs)
+
+    def submit(self, source_path: str, sha256: Optional[str] = None,
+               sizes: Optional[Iterable[int]] = None) -> Future:
+        """
+        Schedule variants for a photo.
+
+        Returns a future resolving to ``{size: path}``. Pass ``sha256`` when
+        the content hash is already known (e.g. from ``ReferencePhotoStore``)
+        to skip rehashing the file.
+        """
+        sha256 = sha256 or file_sha256(source_path)
+        sizes = tuple(sorted(set(sizes or self.sizes)))
+
+        results = {}
+        missing = {}
+        for size in sizes:
+            path = self.cache.get(sha256, size)
+            if path is None:
+                missing[size] = self.cache.path_for(sha256, size)
+            else:
+                results[size] = path
+
+        if not missing:
+            future = Future()
+            future.set_result(results)
+            return future
+
+        key = (sha256, tuple(sorted(missing)))
+        with self._lock:
+            job = self._in_flight.get(key)
+            started = job is None
+            if started:
+                for path in missing.values():
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                job = self._executor.submit(render_variants, source_path, missing)
+                self._in_flight[key] = job
+        # Registered outside the lock: callbacks run inline if the job is done
+        if started:
+            job.add_done_callback(lambda done: self._finish(key, done))
+
+        future = Future()
+
+        def resolve(done: Future):
+            error = done.exception()
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result({**results, **done.result()})
+
+        job.add_done_callback(resolve)
+        return future
+
+    def _finish(self, key, job: Future):
+        """Forget a finished job and account its output in the cache."""
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if job.exception() is None:
+            self.cache.add(job.result().values())
+
+    def preprocess(self, source_path: str, sha256: Optional[str] = None,
+                   sizes: Optional[Iterable[int]] = None) -> Dict[int, str]:
+        """Blocking version of ``submit``."""
+        return self.submit(source_path, sha256, sizes).result()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes."""
+        self._executor.shutdown(wait=wait)
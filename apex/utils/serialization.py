@@ -0,0 +1,47 @@
+"""
+JSON and binary encoders for profile data.
+
+orjson is used for JSON when installed (output is the same as the stdlib
+encoder's); msgpack provides a compact binary encoding. Both are optional.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional until the binary encoding is used
+    msgpack = None
+
+def dumps_json(data: Any, indent: bool = False) -> bytes:
+    """Encode ``data`` as UTF-8 JSON, indented by two spaces if requested."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, indent=2 if indent else None, ensure_ascii=False,
+                      separators=None if indent else (",", ":")).encode("utf-8")
+
+def loads_json(data: Union[bytes, str]) -> Any:
+    """Decode JSON; raises ``json.JSONDecodeError`` on malformed input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _require_msgpack():
+    """Raise a helpful error if msgpack is missing."""
+    if msgpack is None:
+        raise ImportError("The binary profile encoding requires msgpack: pip install msgpack")
+
+def dumps_msgpack(data: Any) -> bytes:
+    """Encode ``data`` as msgpack."""
+    _require_msgpack()
+    return msgpack.packb(data, use_bin_type=True)
+
+def loads_msgpack(data: bytes) -> Any:
+    """Decode msgpack produced by ``dumps_msgpack``."""
+    _require_msgpack()
+    return msgpack.unpackb(data, raw=False)
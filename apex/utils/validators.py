@@ -4,6 +4,10 @@ Validation utilities for APEX.
 
 import re
 from typing import Dict, Any, List, Tuple
+from ..config.vocabulary import get_vocabulary
+
+# Saved profile ids are plain ``.json`` file names, never paths
+PROFILE_ID_PATTERN = re.compile(r'[A-Za-z0-9][A-Za-z0-9._-]*\.json')
 
 class Validator:
     """Validation utilities for profile data."""
@@ -14,16 +18,16 @@ class Validator:
         pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
         return re.match(pattern, email) is not None
     
+    @staticmethod
+    def validate_profile_id(profile_id: Any) -> bool:
+        """Validate a profile id is a bare profile file name (no directories or ``..``)."""
+        return (isinstance(profile_id, str) and ".." not in profile_id
+                and PROFILE_ID_PATTERN.fullmatch(profile_id) is not None)
+    
     @staticmethod
     def validate_resolution(resolution: str) -> bool:
         """Validate resolution format."""
-        valid_resolutions = [
-            "1024x1024 (Standard)",
-            "1536x1024 (Wide)", 
-            "1024x1536 (Portrait)",
-            "2048x2048 (High-Res)"
-        ]
-        return resolution in valid_resolutions
+        return get_vocabulary().is_valid("resolution", resolution)
     
     @staticmethod
     def validate_required_fields(data: Dict[str, Any], required_fields: List[str]) -> Tuple[bool, List[str]]:
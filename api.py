@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+APEX: Agentic Portrait EXperience
+Headless HTTP/JSON API entry point.
+"""
+
+import sys
+import os
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from apex.api.server import main
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from apex.ui.gradio_interface import create_interface
 from apex.config.settings import config
+from apex.core.instrumentation import get_instrumentation
 
 def main():
     """Main application entry point."""
@@ -19,6 +20,9 @@ def main():
     print(f"📊 Version: 2.0.0")
     print(f"🌐 Host: {config.ui.host}:{config.ui.port}")
     print(f"📁 Profiles directory: {config.profile.profiles_dir}")
+    if config.metrics.enabled and config.metrics.port:
+        get_instrumentation().registry.serve(config.metrics.port, config.metrics.host)
+        print(f"📈 Metrics: http://{config.metrics.host}:{config.metrics.port}/metrics")
     print("-" * 50)
     
     # Create and launch the interface
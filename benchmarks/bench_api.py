@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the headless HTTP API.
+
+Starts the API under uvicorn in a subprocess (one worker, so one core) and
+drives POST /prompts and POST /prompts/batch from several client processes,
+each reusing one keep-alive connection.
+
+Usage:
+    python benchmarks/bench_api.py --clients 4 --requests 2000
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILE = {
+    "purpose": "LinkedIn",
+    "attire": "Business Formal",
+    "background": "Corporate Office",
+    "vibe": "Confident",
+    "custom_notes": "Round glasses"
+}
+
+def free_port() -> int:
+    """Find an unused local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for_server(port: int, timeout: float = 15.0) -> float:
+    """Block until /health answers; return seconds waited."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return time.perf_counter() - start
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("API server did not start")
+
+def client(args):
+    """Send ``count`` requests over one keep-alive connection."""
+    port, path, body, count = args
+    payload = json.dumps(body).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    for _ in range(count):
+        conn.request("POST", path, payload, headers)
+        response = conn.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{path} returned {response.status}")
+    conn.close()
+    return count
+
+def run_load(port, path, body, clients, requests):
+    """Run ``requests`` requests spread over ``clients`` processes; return req/s."""
+    per_client = max(1, requests // clients)
+    with multiprocessing.Pool(clients) as pool:
+        start = time.perf_counter()
+        total = sum(pool.map(client, [(port, path, body, per_client)] * clients))
+        elapsed = time.perf_counter() - start
+    return total / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    port = free_port()
+    env = dict(os.environ, APEX_API_PORT=str(port), PYTHONPATH=ROOT)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env["APEX_PROFILES_DIR"] = tmpdir
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "api.py")],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            startup = wait_for_server(port)
+            print(f"server ready in {startup * 1000:.0f}ms (port {port})")
+
+            rate = run_load(port, "/prompts", PROFILE, args.clients, args.requests)
+            print(f"POST /prompts        {rate:10.0f} req/s")
+
+            batch = {"items": [PROFILE] * args.batch_size}
+            rate = run_load(port, "/prompts/batch", batch, args.clients,
+                            max(args.clients, args.requests // args.batch_size))
+            print(f"POST /prompts/batch  {rate:10.0f} req/s "
+                  f"({rate * args.batch_size:.0f} prompts/s, batch of {args.batch_size})")
+        finally:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
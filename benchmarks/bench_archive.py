@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Export/import throughput benchmark for profile archives.
+
+Saves ``--profiles`` profiles into a temporary directory, exports them to
+one archive and imports it into a second directory.
+
+Usage:
+    python benchmarks/bench_archive.py --profiles 100000 --workers 4
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.core.profile_manager import ProfileManager
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="apex-bench-archive-")
+    try:
+        source = ProfileManager(os.path.join(directory, "source"))
+        profiles = [source.create_profile("LinkedIn", "Business Formal", "Corporate Office", "Confident",
+                                          custom_notes=f"profile {i}")[0] for i in range(args.profiles)]
+        source.save_profiles(profiles, batch_size=1000)
+        del profiles
+
+        archive = os.path.join(directory, "profiles.tar")
+        start = time.perf_counter()
+        stats = source.export_profiles(archive, chunk_size=args.chunk_size, workers=args.workers)
+        elapsed = time.perf_counter() - start
+        print(f"export: {stats['profiles']} profiles in {elapsed:.2f}s "
+              f"({stats['profiles'] / elapsed:,.0f}/s), archive {stats['bytes'] / 1e6:.1f}MB")
+
+        target = ProfileManager(os.path.join(directory, "target"))
+        start = time.perf_counter()
+        stats = target.import_profiles(archive, workers=args.workers)
+        elapsed = time.perf_counter() - start
+        print(f"import: {stats['profiles']} profiles in {elapsed:.2f}s ({stats['profiles'] / elapsed:,.0f}/s)")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the ``apex batch`` pipeline.
+
+Writes a JSONL input of ``--rows`` preference records (a mix of valid and
+invalid rows) and streams it through ``run_batch``, reporting rows/s and
+peak memory. ``--dry-run`` skips writing profile files, which isolates
+validation and prompt generation from disk throughput.
+
+Usage:
+    python benchmarks/bench_batch.py --rows 1000000 --workers 4 --dry-run
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.cli import read_rows, run_batch
+from apex.config.settings import config
+
+PURPOSES = ("LinkedIn", "Resume", "Corporate Website", "Personal Branding")
+VIBES = ("Confident", "Friendly", "Approachable", "Authoritative")
+
+def write_input(path: str, rows: int):
+    """Write ``rows`` JSONL records; every 100th is missing its purpose."""
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(rows):
+            record = {
+                "purpose": PURPOSES[i % len(PURPOSES)] if i % 100 else "",
+                "attire": "Business Formal",
+                "background": "Corporate Office",
+                "vibe": VIBES[i % len(VIBES)],
+                "custom_notes": f"employee {i}"
+            }
+            f.write(json.dumps(record) + "\n")
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process and its finished children."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Don't write profile files")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_path = os.path.join(tmpdir, "input.jsonl")
+        start = time.perf_counter()
+        write_input(input_path, args.rows)
+        print(f"wrote {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+        profile_config = dataclasses.replace(config.profile, profiles_dir=os.path.join(tmpdir, "profiles"),
+                                             uploads_dir=os.path.join(tmpdir, "uploads"),
+                                             max_profiles=None)
+        ok = errors = 0
+        start = time.perf_counter()
+        for result in run_batch(read_rows(input_path), profile_config, save=not args.dry_run,
+                                workers=args.workers, chunk_size=args.chunk_size):
+            if "error" in result:
+                errors += 1
+            else:
+                ok += 1
+        elapsed = time.perf_counter() - start
+
+    mode = "dry run" if args.dry_run else "saving profiles"
+    print(f"{ok + errors} rows ({ok} ok, {errors} errors), {args.workers} workers, {mode}")
+    print(f"elapsed {elapsed:.1f}s, {(ok + errors) / elapsed:,.0f} rows/s, "
+          f"peak RSS {peak_rss_mb():.0f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Cold start and repeat-read benchmark for the in-memory profile catalog.
+
+Writes ``--profiles`` profiles into a temporary directory, then times the
+catalog's initial load against a plain JSON directory store, and repeated
+list/load calls served from each.
+
+Usage:
+    python benchmarks/bench_catalog.py --profiles 100000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.core.catalog import ProfileCatalog
+from apex.core.profile_manager import ProfileManager
+from apex.core.storage import JSONDirectoryStore
+from apex.utils.fs_watch import PollingWatcher, create_watcher
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label}: {time.perf_counter() - start:.3f}s")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=100_000)
+    parser.add_argument("--loads", type=int, default=10_000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="apex-bench-catalog-")
+    try:
+        manager = ProfileManager(directory)
+        profile, _, _ = manager.create_profile("LinkedIn", "Business Formal", "Corporate Office", "Confident")
+        timed(f"write {args.profiles} profiles", lambda: manager.save_profiles([profile] * args.profiles, batch_size=1000))
+
+        store = JSONDirectoryStore(directory)
+        ids = timed("plain store: list", store.list_ids)[:args.loads]
+        timed(f"plain store: load {len(ids)}", lambda: [store.load(profile_id) for profile_id in ids])
+        timed("plain store: list again", store.list_ids)
+
+        watcher = create_watcher(directory)
+        print(f"watcher: {type(watcher).__name__}")
+        catalog = timed("catalog: cold start", lambda: ProfileCatalog(store, watcher=watcher))
+        timed("catalog: list", catalog.list_ids)
+        timed(f"catalog: load {len(ids)}", lambda: [catalog.load(profile_id) for profile_id in ids])
+        catalog.close()
+
+        polling = PollingWatcher(directory, interval=0)
+        catalog = ProfileCatalog(store, watcher=polling)
+        timed("catalog (polling): rescan of unchanged directory", catalog.refresh)
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
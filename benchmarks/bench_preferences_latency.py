@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for the "Generate Advanced Profile" handler.
+
+Simulates many concurrent users submitting the form and compares the
+synchronous handler (run on a bounded worker pool, as Gradio does for
+sync functions) with the asyncio handler backed by the write queue.
+A slow disk is simulated by delaying every profile save.
+
+Usage:
+    python benchmarks/bench_preferences_latency.py --users 200 --slow-disk-ms 20
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.core.profile_manager import ProfileManager
+from apex.core.prompt_generator import PromptGenerator
+from apex.core.storage import JSONDirectoryStore
+from apex.ui.gradio_interface import APEXInterface
+
+FORM = ("LinkedIn", "Business Formal", "Corporate Office", "Confident", None,
+        "Round glasses", "Studio Lighting", "Professional", "30-40", "Not Specified",
+        "Not Specified", "1024x1024 (Standard)", True)
+
+class SlowDiskStore(JSONDirectoryStore):
+    """JSON store where every flush to disk takes at least ``delay`` seconds."""
+
+    def __init__(self, profiles_dir: str, delay: float):
+        super().__init__(profiles_dir)
+        self.delay = delay
+
+    def save(self, profile_id, data):
+        time.sleep(self.delay)
+        return super().save(profile_id, data)
+
+    def save_many(self, items):
+        time.sleep(self.delay)
+        return super().save_many(items)
+
+def slow_manager(profiles_dir, delay):
+    """ProfileManager on a simulated slow disk."""
+    return ProfileManager(profiles_dir, store=SlowDiskStore(profiles_dir, delay))
+
+def percentile(samples, pct):
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def report(label, latencies, elapsed):
+    """Print latency percentiles and throughput."""
+    print(f"{label:<6} p50={percentile(latencies, 50) * 1000:8.2f}ms "
+          f"p99={percentile(latencies, 99) * 1000:8.2f}ms "
+          f"throughput={len(latencies) / elapsed:8.1f} req/s")
+
+def bench_sync(interface, users, requests_per_user, concurrency_limit):
+    """All users submit at once; a bounded pool runs the sync handler."""
+    latencies = []
+
+    def request(queued_at):
+        interface.collect_user_preferences(*FORM)
+        latencies.append(time.perf_counter() - queued_at)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency_limit) as pool:
+        for _ in range(users * requests_per_user):
+            pool.submit(request, time.perf_counter())
+    return latencies, time.perf_counter() - start
+
+async def bench_async(interface, users, requests_per_user):
+    """Each user is a coroutine submitting requests back to back."""
+    latencies = []
+
+    async def user():
+        for _ in range(requests_per_user):
+            queued_at = time.perf_counter()
+            await interface.collect_user_preferences_async(*FORM)
+            latencies.append(time.perf_counter() - queued_at)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(users)))
+    handler_elapsed = time.perf_counter() - start
+    await interface.writer.close()
+    return latencies, handler_elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests-per-user", type=int, default=5)
+    parser.add_argument("--slow-disk-ms", type=float, default=20.0)
+    parser.add_argument("--concurrency-limit", type=int, default=16)
+    parser.add_argument("--write-queue-size", type=int, default=256)
+    parser.add_argument("--write-workers", type=int, default=2)
+    args = parser.parse_args()
+
+    delay = args.slow_disk_ms / 1000
+    print(f"{args.users} users x {args.requests_per_user} requests, "
+          f"{args.slow_disk_ms}ms per save, concurrency limit {args.concurrency_limit}")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        generator = PromptGenerator()
+        sync_interface = APEXInterface(slow_manager(os.path.join(tmpdir, "sync"), delay), generator)
+        latencies, elapsed = bench_sync(sync_interface, args.users, args.requests_per_user,
+                                        args.concurrency_limit)
+        report("sync", latencies, elapsed)
+
+        async_interface = APEXInterface(slow_manager(os.path.join(tmpdir, "async"), delay), generator)
+        async_interface.writer.max_pending = args.write_queue_size
+        async_interface.writer.workers = args.write_workers
+        latencies, elapsed = asyncio.run(bench_async(async_interface, args.users, args.requests_per_user))
+        report("async", latencies, elapsed)
+
+if __name__ == "__main__":
+    main()
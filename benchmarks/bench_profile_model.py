@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Memory and serialization benchmark for ProfileData.
+
+Measures the memory held per resident profile (raw dicts as loaded from
+disk versus ProfileData built with from_dict) and the encode/decode cost
+of each available encoding (stdlib json, orjson, msgpack).
+
+Usage:
+    python benchmarks/bench_profile_model.py --profiles 100000
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.models.profile import Profile, ProfileData
+from apex.utils import serialization
+
+PURPOSES = ("LinkedIn", "Resume", "Corporate Website", "Personal Branding")
+VIBES = ("Confident", "Friendly", "Approachable", "Authoritative")
+
+def sample_dicts(count: int):
+    """Profiles as they come back from storage: freshly decoded dicts."""
+    encoded = [
+        json.dumps(Profile.create_profile(PURPOSES[i % 4], "Business Formal", "Corporate Office",
+                                          VIBES[i % 4], custom_notes=f"employee {i}").to_dict())
+        for i in range(count)
+    ]
+    return [json.loads(data) for data in encoded]
+
+def resident_bytes(build) -> int:
+    """Bytes still allocated after ``build()`` returns its objects."""
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return size
+
+def timed(label: str, func, count: int):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:28s} {elapsed / count * 1e6:7.2f} us/profile")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=100_000)
+    args = parser.parse_args()
+    count = args.profiles
+
+    print(f"memory per resident profile ({count} profiles)")
+    dict_bytes = resident_bytes(lambda: sample_dicts(count)) / count
+    model_bytes = resident_bytes(lambda: [ProfileData.from_dict(d) for d in sample_dicts(count)]) / count
+    print(f"  raw dicts                    {dict_bytes:7.0f} bytes")
+    print(f"  ProfileData                  {model_bytes:7.0f} bytes ({model_bytes / dict_bytes:.0%})")
+
+    dicts = sample_dicts(count)
+    profiles = [ProfileData.from_dict(d) for d in dicts]
+    print("encode/decode")
+    timed("to_dict", lambda: [p.to_dict() for p in profiles], count)
+    timed("from_dict", lambda: [ProfileData.from_dict(d) for d in dicts], count)
+
+    encoded = [json.dumps(d, indent=2, ensure_ascii=False) for d in dicts]
+    timed("json.dumps (stdlib)", lambda: [json.dumps(d, indent=2, ensure_ascii=False) for d in dicts], count)
+    timed("json.loads (stdlib)", lambda: [json.loads(e) for e in encoded], count)
+    if serialization.orjson is not None:
+        encoded = [p.to_json(indent=True) for p in profiles]
+        timed("to_json (orjson)", lambda: [p.to_json(indent=True) for p in profiles], count)
+        timed("from_json (orjson)", lambda: [ProfileData.from_json(e) for e in encoded], count)
+    else:
+        print("  orjson not installed")
+    if serialization.msgpack is not None:
+        encoded = [p.to_msgpack() for p in profiles]
+        size = sum(len(e) for e in encoded) / count
+        timed("to_msgpack", lambda: [p.to_msgpack() for p in profiles], count)
+        timed("from_msgpack", lambda: [ProfileData.from_msgpack(e) for e in encoded], count)
+        json_size = sum(len(p.to_json()) for p in profiles) / count
+        print(f"  msgpack size {size:.0f} bytes vs compact JSON {json_size:.0f} bytes")
+    else:
+        print("  msgpack not installed")
+
+if __name__ == "__main__":
+    main()
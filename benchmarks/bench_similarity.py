@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Query latency benchmark for the profile similarity index.
+
+Fills a ProfileIndex with ``--profiles`` synthetic profiles (random choice
+fields and short notes) and times k-nearest-neighbour queries.
+
+Usage:
+    python benchmarks/bench_similarity.py --profiles 1000000 --queries 100
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.config.vocabulary import get_vocabulary
+from apex.core.similarity import ProfileIndex
+
+NOTE_WORDS = ("round", "glasses", "navy", "tie", "beard", "smile", "earrings", "blazer",
+              "short", "hair", "warm", "tones", "no", "jewelry", "scarf", "headscarf")
+
+def random_profile(rng: random.Random, vocabulary) -> dict:
+    profile = {name: rng.choice(vocabulary.choices(name)) for name in vocabulary.fields}
+    profile["custom_notes"] = " ".join(rng.choices(NOTE_WORDS, k=rng.randint(0, 6)))
+    return profile
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = get_vocabulary()
+    index = ProfileIndex(vocabulary=vocabulary)
+
+    start = time.perf_counter()
+    for offset in range(0, args.profiles, args.batch_size):
+        count = min(args.batch_size, args.profiles - offset)
+        index.add_many((f"p{offset + i}", random_profile(rng, vocabulary)) for i in range(count))
+    elapsed = time.perf_counter() - start
+    print(f"indexed {len(index)} profiles in {elapsed:.1f}s ({len(index) / elapsed:,.0f}/s)")
+
+    latencies = []
+    for _ in range(args.queries):
+        query = random_profile(rng, vocabulary)
+        start = time.perf_counter()
+        index.query(query, k=args.k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    print(f"query k={args.k}: median {statistics.median(latencies):.1f}ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f}ms")
+
+if __name__ == "__main__":
+    main()
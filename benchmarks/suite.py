@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite with stored baselines and regression checks.
+
+Times prompt generation, profile serialization, ProfileManager
+save/load/list against a JSON profile directory at each requested scale,
+and the package import time. Results are written as JSON and compared with
+a baseline file; the run exits with status 1 if any benchmark is slower
+than its baseline by more than the allowed fraction.
+
+Usage:
+    python benchmarks/suite.py                          # 1k scale, compare with baseline.json
+    python benchmarks/suite.py --scales 1k,100k,1m      # larger directories (1m takes minutes)
+    python benchmarks/suite.py --output results.json --threshold 0.5
+    python benchmarks/suite.py --runs 5 --update-baseline   # record this machine's numbers
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Fraction a benchmark may exceed its baseline by before it counts as a regression
+DEFAULT_THRESHOLD = float(os.getenv("APEX_BENCH_THRESHOLD", "0.25"))
+
+PREFERENCES = {
+    "purpose": "LinkedIn",
+    "attire": "Business Formal",
+    "background": "Corporate Office",
+    "vibe": "Confident",
+    "lighting": "Natural Light",
+    "mood": "Professional",
+    "custom_notes": "navy blazer",
+}
+
+def parse_scale(text: str) -> int:
+    """``1k``, ``100k``, ``1m`` or a plain number of profiles."""
+    text = text.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(text[:-1] if multiplier > 1 else text) * multiplier
+
+def scale_label(count: int) -> str:
+    if count % 1_000_000 == 0:
+        return f"{count // 1_000_000}m"
+    if count % 1_000 == 0:
+        return f"{count // 1_000}k"
+    return str(count)
+
+def best_per_op(func: Callable[[], object], ops: int, repeat: int) -> float:
+    """Fastest of ``repeat`` timings of ``func`` (which runs ``ops`` operations), in µs per op."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best / ops * 1e6
+
+class Suite:
+    """Runs the benchmarks and collects ``{name: {"value": ..., "unit": ...}}``."""
+
+    def __init__(self, ops: int = 1000, repeat: int = 5, runs: int = 1, layout: str = "flat", log=print):
+        self.ops = ops
+        self.layout = layout
+        self.repeat = repeat
+        self.runs = runs
+        self.log = log
+        self.results: Dict[str, Dict[str, object]] = {}
+
+    def measure(self, name: str, unit: str, func: Callable[[], float]):
+        """Record the median of ``runs`` calls of ``func``."""
+        value = statistics.median(func() for _ in range(self.runs))
+        self.results[name] = {"value": round(value, 3), "unit": unit}
+        self.log(f"  {name:32s} {value:12.3f} {unit}")
+
+    def bench_prompts(self):
+        from apex.core.prompt_generator import PromptGenerator
+
+        generator = PromptGenerator()
+        ops = self.ops * 10
+        self.measure("generate_prompt", "us/op", lambda: best_per_op(
+            lambda: [generator.generate_prompt(PREFERENCES) for _ in range(ops)], ops, self.repeat))
+
+    def bench_serialization(self):
+        from apex.models.profile import Profile
+        from apex.utils.serialization import dumps_json
+
+        profile = Profile.create_profile(**PREFERENCES)
+        ops = self.ops * 10
+        self.measure("profile_to_json", "us/op", lambda: best_per_op(
+            lambda: [dumps_json(profile.to_dict()) for _ in range(ops)], ops, self.repeat))
+
+    def bench_storage(self, scales: List[int], directory: str):
+        """Grow one profile directory through each scale, timing the manager at every size."""
+        from apex.core.profile_manager import ProfileManager
+        from apex.core.storage import open_directory_store
+
+        manager = ProfileManager(directory, store=open_directory_store(directory, self.layout))
+        profile, _, _ = manager.create_profile(**{k: v for k, v in PREFERENCES.items() if k != "custom_notes"})
+        rng = random.Random(0)
+        for scale in sorted(scales):
+            missing = scale - manager.count_profiles()
+            if missing > 0:
+                start = time.perf_counter()
+                manager.save_profiles([profile] * missing, batch_size=1000)
+                self.log(f"  (filled to {scale} profiles in {time.perf_counter() - start:.1f}s)")
+            label = scale_label(scale) if self.layout == "flat" else f"{scale_label(scale)},{self.layout}"
+            ops = min(self.ops, scale)
+            ids = rng.sample(manager.list_profiles(), ops)
+
+            self.measure(f"load_profile[{label}]", "us/op", lambda: best_per_op(
+                lambda: [manager.load_profile(profile_id) for profile_id in ids], ops, self.repeat))
+            self.measure(f"list_profiles[{label}]", "ms", lambda: best_per_op(
+                manager.list_profiles, 1, min(self.repeat, 3)) / 1000)
+            # Saves grow the directory, so they go last; the drift is small next to the scale
+            self.measure(f"save_profile[{label}]", "us/op", lambda: best_per_op(
+                lambda: [manager.save_profile(profile) for _ in range(ops)], ops, 1))
+
+    def bench_import(self):
+        """Cumulative ``import apex.core, apex.models`` time in a fresh interpreter."""
+        def fastest():
+            timings = []
+            for _ in range(self.repeat):
+                stderr = subprocess.run(
+                    [sys.executable, "-X", "importtime", "-c", "import apex.core, apex.models"],
+                    cwd=ROOT, capture_output=True, text=True, check=True
+                ).stderr
+                for line in stderr.splitlines():
+                    parts = [part.strip() for part in line.split(":", 1)[-1].split("|")]
+                    if line.startswith("import time:") and parts[2] == "apex":
+                        timings.append(int(parts[1]) / 1000)
+            return min(timings)
+
+        self.measure("import_apex", "ms", fastest)
+
+    def run(self, scales: List[int], directory: Optional[str] = None) -> Dict[str, Dict[str, object]]:
+        self.bench_import()
+        self.bench_prompts()
+        self.bench_serialization()
+        if scales:
+            owned = directory is None
+            directory = directory or tempfile.mkdtemp(prefix="apex-bench-suite-")
+            try:
+                self.bench_storage(scales, directory)
+            finally:
+                if owned:
+                    shutil.rmtree(directory, ignore_errors=True)
+        return self.results
+
+def environment() -> Dict[str, object]:
+    """Where the numbers came from; baselines only compare well on similar machines."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+def compare(results: Dict[str, Dict[str, object]], baseline: Dict[str, object],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, object]]:
+    """
+    Compare results with a baseline document; returns the regressions.
+
+    Every benchmark is "lower is better". A benchmark regresses when it is
+    more than ``threshold`` (a fraction, e.g. 0.25) slower than its baseline;
+    the baseline's ``thresholds`` map overrides that per benchmark. Results
+    missing from the baseline are not compared.
+    """
+    expected = baseline.get("results", {})
+    overrides = baseline.get("thresholds", {})
+    regressions = []
+    for name, result in results.items():
+        if name not in expected:
+            continue
+        allowed = overrides.get(name, threshold)
+        base = expected[name]["value"]
+        value = result["value"]
+        if base > 0 and value > base * (1 + allowed):
+            regressions.append({"name": name, "value": value, "baseline": base,
+                                "unit": result["unit"], "ratio": round(value / base, 3),
+                                "threshold": allowed})
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default="1k",
+                        help="comma-separated profile counts for the storage benchmarks, e.g. 1k,100k,1m "
+                             "(empty to skip them)")
+    parser.add_argument("--ops", type=int, default=1000, help="operations per timing")
+    parser.add_argument("--repeat", type=int, default=5, help="timings per benchmark (the best is kept)")
+    parser.add_argument("--runs", type=int, default=1,
+                        help="times each benchmark is measured; its median is reported "
+                             "(use 3 or more when recording a baseline)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction of the baseline "
+                             "(default APEX_BENCH_THRESHOLD or 0.25)")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="merge these results into the baseline instead of comparing")
+    parser.add_argument("--layout", choices=("flat", "sharded"), default="flat",
+                        help="profile directory layout for the storage benchmarks")
+    parser.add_argument("--dir", help="profile directory to grow and reuse (default: a temporary one)")
+    args = parser.parse_args(argv)
+
+    scales = [parse_scale(scale) for scale in args.scales.split(",") if scale.strip()]
+    print(f"APEX benchmark suite (python {platform.python_version()}, scales: "
+          f"{', '.join(scale_label(s) for s in scales) or 'none'})")
+    results = Suite(ops=args.ops, repeat=args.repeat, runs=args.runs, layout=args.layout).run(scales, args.dir)
+    document = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+            f.write("\n")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.update_baseline:
+        baseline["environment"] = document["environment"]
+        baseline.setdefault("results", {}).update(results)
+        baseline["results"] = dict(sorted(baseline["results"].items()))
+        baseline.setdefault("thresholds", {})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+    if baseline.get("environment", {}).get("python") != document["environment"]["python"]:
+        print("Note: the baseline was recorded with a different Python version")
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression['name']}: {regression['value']} {regression['unit']} vs "
+              f"{regression['baseline']} baseline ({regression['ratio']}x, "
+              f"allowed {1 + regression['threshold']:.2f}x)")
+    compared = len([name for name in results if name in baseline.get("results", {})])
+    print(f"{compared} benchmarks compared, {len(regressions)} regressions")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
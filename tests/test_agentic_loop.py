@@ -0,0 +1,169 @@
+"""
+Tests for the generate-judge-refine loop.
+"""
+
+import threading
+import time
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.core.agentic_loop import APEXGenerator, LoopBudget
+from apex.core.scheduler import CandidateScheduler
+from apex.core.backends import ImageJudge, JudgeVerdict, StubImageGenerator, TemplateStylePlanner
+from apex.core.prompt_generator import PromptGenerator
+from apex.config.settings import PromptConfig
+
+PREFERENCES = {
+    "purpose": "LinkedIn",
+    "attire": "Business Formal",
+    "background": "Corporate Office",
+    "vibe": "Confident",
+    "lighting": "Natural Light",
+    "mood": "Professional"
+}
+
+class FixedJudge(ImageJudge):
+    """Judge returning a constant score."""
+
+    def __init__(self, score):
+        self.score = score
+
+    def judge(self, image, preferences):
+        return JudgeVerdict(score=self.score, feedback="flat")
+
+class TestAPEXGenerator(unittest.TestCase):
+    """Test APEXGenerator functionality."""
+
+    def test_stub_loop_converges(self):
+        """Test the stub backends refine until the portrait is accepted."""
+        result = APEXGenerator().generate(PREFERENCES)
+        self.assertTrue(result.accepted)
+        self.assertEqual(result.stop_reason, "accepted")
+        self.assertGreater(len(result.iterations), 1)
+        self.assertGreaterEqual(result.verdict.score, 0.85)
+        self.assertIn("emphasis on Business Formal attire", result.plan.prompt)
+
+    def test_deterministic(self):
+        """Test two runs produce the same result."""
+        first = APEXGenerator().generate(PREFERENCES)
+        second = APEXGenerator().generate(PREFERENCES)
+        self.assertEqual(first.image.data, second.image.data)
+        self.assertEqual([i.score for i in first.iterations], [i.score for i in second.iterations])
+
+    def test_stops_without_improvement(self):
+        """Test early stopping when scores plateau."""
+        result = APEXGenerator(judge=FixedJudge(0.5), patience=2).generate(PREFERENCES)
+        self.assertFalse(result.accepted)
+        self.assertEqual(result.stop_reason, "no_improvement")
+        self.assertEqual(len(result.iterations), 3)
+
+    def test_compute_budget(self):
+        """Test the loop never starts an iteration it cannot pay for."""
+        generator = APEXGenerator(
+            generator=StubImageGenerator(compute_units=1.0),
+            judge=FixedJudge(0.1),
+            min_improvement=0.0,
+            patience=10,
+            budget=LoopBudget(max_iterations=10, max_compute_units=2.5)
+        )
+        result = generator.generate(PREFERENCES)
+        self.assertEqual(result.stop_reason, "compute_budget")
+        self.assertLessEqual(result.total_compute_units, 2.5)
+        self.assertEqual(len(result.iterations), 2)
+
+    def test_refine_respects_token_budget(self):
+        """Test refined prompts stay within the prompt token budget."""
+        base = PromptGenerator()
+        limit = base.budget.count(base.generate_prompt(PREFERENCES)) + 10
+        planner = TemplateStylePlanner(PromptGenerator(prompt_config=PromptConfig(max_prompt_length=limit)))
+        plan = planner.plan(PREFERENCES)
+        verdict = JudgeVerdict(score=0.5, feedback="", criteria={"attire": 0.5, "background": 0.5, "mood": 0.5})
+        for _ in range(3):
+            plan = planner.refine(plan, verdict)
+            self.assertLessEqual(planner.prompt_generator.budget.count(plan.prompt), limit)
+        self.assertEqual(len(plan.notes), 3)
+        self.assertIn("emphasis on Business Formal attire", plan.prompt)
+
+class SlowGenerator(StubImageGenerator):
+    """Stub generator that takes a fixed time per image and counts calls."""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def generate(self, prompt, negative_prompt, seed, resolution=None):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return super().generate(prompt, negative_prompt, seed, resolution)
+
+class SeedJudge(ImageJudge):
+    """Judge accepting only one seed."""
+
+    def __init__(self, winning_seed):
+        self.winning_seed = winning_seed
+
+    def judge(self, image, preferences):
+        return JudgeVerdict(score=0.9 if image.seed == self.winning_seed else 0.2)
+
+class TestCandidateScheduler(unittest.TestCase):
+    """Test CandidateScheduler functionality."""
+
+    def test_variants_differ(self):
+        """Test variants have distinct prompts and seeds, starting from the plan."""
+        scheduler = CandidateScheduler(candidates=4)
+        plan = scheduler.planner.plan(PREFERENCES)
+        variants = scheduler.variants(plan)
+        self.assertEqual(len(variants), 4)
+        self.assertIs(variants[0][0], plan)
+        self.assertEqual(len({variant.prompt for variant, _ in variants}), 4)
+        self.assertEqual([seed for _, seed in variants], [0, 1, 2, 3])
+        # A requested lighting style is kept in every variant
+        self.assertTrue(all("soft natural lighting" in variant.prompt for variant, _ in variants[1:]))
+
+    def test_variants_respect_token_budget(self):
+        """Test variants stay within the planner's budget and don't repeat the lighting."""
+        base = PromptGenerator()
+        limit = base.budget.count(base.generate_prompt(PREFERENCES))
+        planner = TemplateStylePlanner(PromptGenerator(prompt_config=PromptConfig(max_prompt_length=limit)))
+        scheduler = CandidateScheduler(planner=planner, candidates=4)
+        plan = planner.plan(PREFERENCES)
+        for variant, _ in scheduler.variants(plan):
+            self.assertLessEqual(planner.prompt_generator.budget.count(variant.prompt), limit)
+            self.assertEqual(variant.prompt.count("soft natural lighting"), 1)
+        self.assertIs(scheduler.lighting_details, planner.prompt_generator.lighting_details)
+
+    def test_parallel_is_faster_than_serial(self):
+        """Test wall-clock time drops with the number of workers."""
+        scheduler = CandidateScheduler(generator=SlowGenerator(0.1), judge=FixedJudge(0.5),
+                                       candidates=4)
+        result = scheduler.generate(PREFERENCES)
+        self.assertEqual(len(result.iterations), 4)
+        self.assertLess(result.total_seconds, 0.3)
+
+    def test_accepted_candidate_cancels_queued_work(self):
+        """Test the first accepted candidate stops the remaining ones."""
+        generator = SlowGenerator(0.05)
+        scheduler = CandidateScheduler(generator=generator, judge=SeedJudge(0),
+                                       candidates=8, max_workers=1)
+        result = scheduler.generate(PREFERENCES)
+        self.assertTrue(result.accepted)
+        self.assertEqual(result.image.seed, 0)
+        self.assertLess(generator.calls, 8)
+
+    def test_rounds_refine_best_plan(self):
+        """Test later rounds use new seeds when nothing is accepted."""
+        scheduler = CandidateScheduler(judge=SeedJudge(5), candidates=3, rounds=2)
+        result = scheduler.generate(PREFERENCES)
+        self.assertTrue(result.accepted)
+        self.assertEqual(result.image.seed, 5)
+        self.assertEqual(result.stop_reason, "accepted")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+"""
+Tests for the headless HTTP API.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+from urllib.parse import quote
+import shutil
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.api import server
+from apex.api.server import APEXApi
+from apex.core.profile_manager import ProfileManager
+
+PROFILE = {
+    "purpose": "LinkedIn",
+    "attire": "Business Formal",
+    "background": "Corporate Office",
+    "vibe": "Confident"
+}
+
+class TestAPEXApi(unittest.TestCase):
+    """Test the ASGI application."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.app = APEXApi(profile_manager=ProfileManager(self.tmpdir))
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.tmpdir)
+
+    def request(self, method, path, body=None, query=b""):
+        """Call the app and return (status, decoded JSON)."""
+        payload = b"" if body is None else json.dumps(body).encode("utf-8")
+        messages = [{"type": "http.request", "body": payload, "more_body": False}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": method, "path": path, "query_string": query}
+        asyncio.run(self.app(scope, receive, send))
+        return sent[0]["status"], json.loads(sent[1]["body"])
+
+    def test_generate_prompt(self):
+        """Test single and batch prompt generation agree."""
+        status, single = self.request("POST", "/prompts", PROFILE)
+        self.assertEqual(status, 200)
+        self.assertIn("business suit", single["prompt"])
+        status, batch = self.request("POST", "/prompts/batch", {"items": [PROFILE, PROFILE]})
+        self.assertEqual(batch["prompts"], [single["prompt"]] * 2)
+
+    def test_validate_profile(self):
+        """Test validation reports missing fields."""
+        status, result = self.request("POST", "/profiles/validate", dict(PROFILE, purpose=""))
+        self.assertEqual(status, 200)
+        self.assertFalse(result["valid"])
+
+    def test_missing_required_fields(self):
+        """Test absent required fields are client errors, not 500s."""
+        status, result = self.request("POST", "/profiles", {})
+        self.assertEqual(status, 422)
+        self.assertIn("purpose", result["error"])
+
+        status, result = self.request("POST", "/profiles/validate", {"purpose": "LinkedIn"})
+        self.assertEqual(status, 200)
+        self.assertFalse(result["valid"])
+        self.assertEqual(len(result["errors"]), 3)
+
+        status, result = self.request("POST", "/profiles/batch",
+                                      {"items": [PROFILE, {"purpose": "LinkedIn"}], "save": True})
+        self.assertEqual(status, 200)
+        self.assertIn("location", result["results"][0])
+        self.assertIn("vibe", result["results"][1]["error"])
+
+    def test_create_save_list_load(self):
+        """Test a saved profile can be listed and loaded."""
+        status, created = self.request("POST", "/profiles", dict(PROFILE, save=True))
+        self.assertEqual(status, 201)
+        status, listing = self.request("GET", "/profiles", query=b"purpose=LinkedIn")
+        self.assertEqual(len(listing["profiles"]), 1)
+        status, loaded = self.request("GET", "/profiles/" + listing["profiles"][0])
+        self.assertEqual(status, 200)
+        self.assertEqual(loaded["generated_prompt"], created["prompt"])
+
+    def test_summaries_paginate_with_a_cursor(self):
+        """Test summary pages chain through next_cursor and filters apply."""
+        self.request("POST", "/profiles/batch", {"items": [PROFILE] * 5, "save": True})
+        self.request("POST", "/profiles", dict(PROFILE, purpose="Resume", save=True))
+
+        status, first = self.request("GET", "/profiles/summaries", query=b"limit=2&purpose=LinkedIn")
+        self.assertEqual(status, 200)
+        self.assertEqual(len(first["profiles"]), 2)
+        self.assertEqual(set(first["profiles"][0]), {"id", "timestamp", "purpose", "preset_used", "prompt_preview"})
+        seen = [item["id"] for item in first["profiles"]]
+        cursor = first["next_cursor"]
+        while cursor:
+            status, page = self.request("GET", "/profiles/summaries",
+                                        query=f"limit=2&purpose=LinkedIn&cursor={quote(cursor)}".encode())
+            seen.extend(item["id"] for item in page["profiles"])
+            cursor = page["next_cursor"]
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+        self.assertEqual(self.request("GET", "/profiles/summaries", query=b"cursor=nope")[0], 400)
+
+        self.assertEqual(self.request("GET", "/profiles/summaries", query=b"order=sideways")[0], 400)
+        self.assertEqual(self.request("GET", "/profiles/summaries", query=b"notes=x")[0], 400)
+
+    def test_batch_reports_per_item_errors(self):
+        """Test invalid batch items are reported without failing the batch."""
+        status, result = self.request("POST", "/profiles/batch",
+                                      {"items": [PROFILE, {"purpose": 3}], "save": True})
+        self.assertEqual(status, 200)
+        self.assertIn("location", result["results"][0])
+        self.assertIn("error", result["results"][1])
+
+    def test_errors(self):
+        """Test routing and body errors."""
+        self.assertEqual(self.request("GET", "/nope")[0], 404)
+        self.assertEqual(self.request("GET", "/prompts")[0], 405)
+        self.assertEqual(self.request("GET", "/profiles/missing.json")[0], 404)
+        self.assertEqual(self.request("POST", "/profiles", dict(PROFILE, vibe=""))[0], 422)
+        for path in ("/profiles", "/profiles/summaries"):
+            status, result = self.request("GET", path, query=b"newest_first=1")
+            self.assertEqual(status, 400)
+            self.assertIn("newest_first", result["error"])
+
+    def test_save_refused_at_limit(self):
+        """Test a save over the profile limit is a 409 with a JSON error."""
+        self.app.profile_manager.max_profiles = 0
+        status, result = self.request("POST", "/profiles", dict(PROFILE, save=True))
+        self.assertEqual(status, 409)
+        self.assertIn("limit", result["error"])
+
+    def test_unexpected_errors_are_json(self):
+        """Test an unhandled exception becomes a JSON 500."""
+        def fail():
+            raise RuntimeError("boom")
+        self.app.profile_manager.get_presets = fail
+        with contextlib.redirect_stderr(io.StringIO()):
+            status, result = self.request("GET", "/presets")
+        self.assertEqual((status, result), (500, {"error": "Internal server error"}))
+
+    def test_module_app_is_built_lazily(self):
+        """Test ``apex.api.server:app`` is created on first access, once."""
+        self.assertNotIn("app", vars(server))
+        with mock.patch.object(server, "create_app", return_value=self.app) as factory:
+            try:
+                self.assertIs(server.app, self.app)
+                self.assertIs(server.app, self.app)
+            finally:
+                vars(server).pop("app", None)
+        factory.assert_called_once_with()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Tests for profile archive export and import.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tarfile
+import tempfile
+import types
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.cli import main
+from apex.core.archive import ArchiveError, MANIFEST_NAME, export_profiles
+from apex.core.photo_store import ReferencePhotoStore
+from apex.core.profile_manager import ProfileManager
+
+class TestProfileArchive(unittest.TestCase):
+    """Test ProfileManager.export_profiles and import_profiles."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.source = self.make_manager("source")
+        self.target = self.make_manager("target")
+        self.archive = os.path.join(self.tmpdir.name, "profiles.tar")
+
+        photo = os.path.join(self.tmpdir.name, "headshot.jpg")
+        with open(photo, "wb") as f:
+            f.write(b"\xff\xd8fake jpeg" * 100)
+        with_photo, _, _ = self.source.create_profile("LinkedIn", "Business Formal", "Corporate Office",
+                                                      "Confident", photo_path=photo)
+        self.photo_sha256 = with_photo.additional_info.reference_photo_sha256
+        others = [self.source.create_profile("Resume", "Smart Casual", "Plain Color", "Friendly",
+                                             custom_notes=f"note {i}")[0] for i in range(24)]
+        self.source.save_profiles([with_photo] + others)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_manager(self, name):
+        root = os.path.join(self.tmpdir.name, name)
+        return ProfileManager(os.path.join(root, "profiles"),
+                              photo_store=ReferencePhotoStore(os.path.join(root, "uploads")))
+
+    def test_round_trip(self):
+        """Test profiles and photos arrive intact, with photo paths rewritten."""
+        exported = self.source.export_profiles(self.archive, chunk_size=10, workers=3)
+        self.assertEqual((exported["profiles"], exported["chunks"], exported["blobs"]), (25, 3, 1))
+
+        imported = self.target.import_profiles(self.archive, workers=3)
+        self.assertEqual((imported["profiles"], imported["blobs"], imported["invalid"]), (25, 1, 0))
+        self.assertEqual(sorted(self.target.list_profiles()), sorted(self.source.list_profiles()))
+        for profile_id in self.source.list_profiles():
+            original = self.source.load_profile(profile_id)
+            copy = self.target.load_profile(profile_id)
+            self.assertEqual(copy["basic_info"], original["basic_info"])
+            if original["additional_info"]["reference_photo_sha256"]:
+                path = copy["additional_info"]["reference_photo"]
+                self.assertTrue(path.startswith(self.target.photo_store.uploads_dir))
+                self.assertTrue(os.path.exists(path))
+        self.assertFalse(os.path.exists(self.archive + ".progress"))
+
+    def test_members_are_ordered_and_checksummed(self):
+        """Test photos precede their chunk and the manifest comes last."""
+        self.source.export_profiles(self.archive, chunk_size=10)
+        with tarfile.open(self.archive) as tar:
+            names = tar.getnames()
+        self.assertEqual(names[-1], MANIFEST_NAME)
+        blobs = [i for i, name in enumerate(names) if name.startswith(f"blobs/{self.photo_sha256}")]
+        self.assertEqual(len(blobs), 1)
+        self.assertTrue(names[blobs[0] + 1].startswith("profiles/"))
+        self.assertEqual(len([n for n in names if n.startswith("profiles/")]), 3)
+
+    def test_corrupt_chunk_is_rejected(self):
+        """Test a chunk whose bytes don't match its checksum fails the import."""
+        self.source.export_profiles(self.archive, chunk_size=10)
+        with tarfile.open(self.archive) as tar:
+            member = [m for m in tar.getmembers() if m.name.startswith("profiles/")][1]
+        with open(self.archive, "r+b") as f:
+            f.seek(member.offset_data + 20)
+            byte = f.read(1)
+            f.seek(member.offset_data + 20)
+            f.write(bytes([byte[0] ^ 0xFF]))
+
+        with self.assertRaises(ArchiveError):
+            self.target.import_profiles(self.archive)
+
+    def test_truncated_archive_is_rejected_then_resumed(self):
+        """Test a cut-off archive fails, and a retry skips the chunks already imported."""
+        self.source.export_profiles(self.archive, chunk_size=10)
+        with tarfile.open(self.archive) as tar:
+            cut = [m for m in tar.getmembers() if m.name.startswith("profiles/")][2].offset
+        truncated = os.path.join(self.tmpdir.name, "truncated.tar")
+        with open(self.archive, "rb") as src, open(truncated, "wb") as dst:
+            dst.write(src.read(cut))
+
+        progress = os.path.join(self.tmpdir.name, "import.progress")
+        with self.assertRaises(ArchiveError):
+            self.target.import_profiles(truncated, progress_path=progress)
+        self.assertEqual(self.target.count_profiles(), 20)
+
+        resumed = self.target.import_profiles(self.archive, progress_path=progress)
+        self.assertEqual((resumed["skipped_chunks"], resumed["profiles"]), (2, 5))
+        self.assertEqual(self.target.count_profiles(), 25)
+        self.assertFalse(os.path.exists(progress))
+
+    def test_unsafe_ids_are_rejected(self):
+        """Test records whose id is a path are counted as invalid, not written."""
+        data = self.source.load_profile(self.source.list_profiles()[0])
+        source = types.SimpleNamespace(load_profile=lambda profile_id: data)
+        ids = ["../../pwned.json", "sub/dir.json", ".hidden.json", "good.json"]
+        export_profiles(source, self.archive, profile_ids=ids)
+
+        imported = self.target.import_profiles(self.archive)
+        self.assertEqual((imported["profiles"], imported["invalid"]), (1, 3))
+        self.assertEqual(self.target.list_profiles(), ["good.json"])
+        self.assertFalse(os.path.exists(os.path.join(self.target.profiles_dir, "..", "..", "pwned.json")))
+
+    def write_tar(self, members):
+        with tarfile.open(self.archive, "w") as tar:
+            for name, data in members:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+
+    def test_unsafe_blob_names_are_rejected(self):
+        """Test blob names that aren't a hash and photo extension fail before anything is written."""
+        escape = os.path.join(self.tmpdir.name, "escape")
+        for name in ["blobs/../escape/zz.png", f"blobs/{'a' * 64}.sh", "blobs/ABC.png"]:
+            self.write_tar([(name, b"data")])
+            with self.assertRaises(ArchiveError):
+                self.target.import_profiles(self.archive)
+        self.assertFalse(os.path.exists(escape))
+        self.assertFalse(os.path.exists(self.target.photo_store.uploads_dir))
+
+    def test_corrupt_manifest_is_rejected(self):
+        """Test a manifest that isn't a JSON object raises ArchiveError."""
+        for data in [b"{not json", b"[1, 2]"]:
+            self.write_tar([(MANIFEST_NAME, data)])
+            with self.assertRaises(ArchiveError):
+                self.target.import_profiles(self.archive)
+
+    @staticmethod
+    def dirs(manager):
+        return ["--profiles-dir", manager.profiles_dir, "--uploads-dir", manager.photo_store.uploads_dir]
+
+    def test_command_line(self):
+        """Test apex export and apex import move profiles between directories."""
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(main(["export", self.archive, *self.dirs(self.source)]), 0)
+            self.assertEqual(main(["import", self.archive, *self.dirs(self.target)]), 0)
+            self.assertEqual(main(["import", os.path.join(self.tmpdir.name, "missing.tar"),
+                                   *self.dirs(self.target)]), 1)
+        self.assertIn("Exported 25 profiles", stderr.getvalue())
+        self.assertEqual(self.target.count_profiles(), 25)
+
+    def test_not_an_archive(self):
+        """Test a file that isn't a tar archive raises ArchiveError."""
+        path = os.path.join(self.tmpdir.name, "junk.tar")
+        with open(path, "wb") as f:
+            f.write(b"not a tar file" * 100)
+        with self.assertRaises(ArchiveError):
+            self.target.import_profiles(path)
+
+if __name__ == '__main__':
+    unittest.main()
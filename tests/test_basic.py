@@ -5,13 +5,18 @@ Basic tests for APEX functionality.
 import unittest
 import sys
 import os
+import tempfile
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from apex.models.profile import Profile, ProfileData, BasicInfo, AdvancedSettings, AdditionalInfo, Metadata
+from apex.models.profile import (Profile, ProfileData, ProfileSummary, BasicInfo, AdvancedSettings, AdditionalInfo, Metadata,
+                                SCHEMA_VERSION)
+from apex.utils import serialization
 from apex.core.profile_manager import ProfileManager
 from apex.core.prompt_generator import PromptGenerator
+from apex.core.prompt_budget import PromptBudget, PromptFragment
+from apex.config.settings import PromptConfig
 
 class TestProfile(unittest.TestCase):
     """Test Profile class functionality."""
@@ -22,6 +27,16 @@ class TestProfile(unittest.TestCase):
         self.assertTrue(is_valid)
         self.assertEqual(message, "✅ All inputs valid")
     
+    def test_summary_preview(self):
+        """Test summaries shorten the prompt and read older layouts."""
+        profile = Profile.create_profile("LinkedIn", "Business Formal", "Corporate Office", "Confident")
+        profile.generated_prompt = "portrait " * 40
+        summary = ProfileSummary.from_dict("a.json", profile.to_dict(), preview_length=20)
+        self.assertEqual(summary.prompt_preview, "portrait portrait po…")
+        self.assertEqual(summary.to_dict()["purpose"], "LinkedIn")
+        old = ProfileSummary.from_dict("b.json", {"purpose": "Resume", "timestamp": "2024-01-01 09:00:00"})
+        self.assertEqual((old.purpose, old.timestamp, old.prompt_preview), ("Resume", "2024-01-01 09:00:00", None))
+    
     def test_validate_basic_info_invalid(self):
         """Test validation with invalid inputs."""
         is_valid, message = Profile.validate_basic_info("", "Business Formal", "Corporate Office", "Confident")
@@ -34,13 +49,55 @@ class TestProfile(unittest.TestCase):
         self.assertIsInstance(profile, ProfileData)
         self.assertEqual(profile.basic_info.purpose, "LinkedIn")
         self.assertEqual(profile.basic_info.attire, "Business Formal")
+    
+    def test_from_dict_round_trip(self):
+        """Test from_dict inverts to_dict."""
+        profile = Profile.create_profile("LinkedIn", "Business Formal", "Corporate Office", "Confident",
+                                         lighting="Golden Hour", custom_notes="Round glasses")
+        profile.generated_prompt = "prompt"
+        restored = ProfileData.from_dict(profile.to_dict())
+        self.assertEqual(restored, profile)
+        self.assertEqual(ProfileData.from_json(profile.to_json(indent=True)), profile)
+    
+    @unittest.skipIf(serialization.msgpack is None, "msgpack not installed")
+    def test_msgpack_round_trip(self):
+        """Test the binary encoding round-trips and is smaller than JSON."""
+        profile = Profile.create_profile("LinkedIn", "Business Formal", "Corporate Office", "Confident")
+        encoded = profile.to_msgpack()
+        self.assertEqual(ProfileData.from_msgpack(encoded), profile)
+        self.assertLess(len(encoded), len(profile.to_json()))
+    
+    def test_from_dict_upgrades_flat_layout(self):
+        """Test version 1.0 (flat) profiles are upgraded."""
+        profile = ProfileData.from_dict({
+            "purpose": "LinkedIn", "attire": "Business Formal", "background": "Outdoor",
+            "vibe": "Warm", "custom_notes": "hat", "timestamp": "2024-01-01 10:00:00"
+        })
+        self.assertEqual(profile.basic_info.background, "Outdoor")
+        self.assertEqual(profile.additional_info.custom_notes, "hat")
+        self.assertEqual(profile.metadata.version, SCHEMA_VERSION)
+        self.assertEqual(profile.advanced_settings, AdvancedSettings())
+    
+    def test_from_dict_rejects_unknown_version(self):
+        """Test unknown schema versions and missing sections raise ValueError."""
+        data = Profile.create_profile("LinkedIn", "Business Formal", "Outdoor", "Warm").to_dict()
+        data["metadata"]["version"] = "9.0"
+        with self.assertRaises(ValueError):
+            ProfileData.from_dict(data)
+        with self.assertRaises(ValueError):
+            ProfileData.from_dict({"metadata": {"version": SCHEMA_VERSION}})
 
 class TestProfileManager(unittest.TestCase):
     """Test ProfileManager functionality."""
     
     def setUp(self):
         """Set up test environment."""
-        self.manager = ProfileManager("test_profiles")
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.manager = ProfileManager(self.tmpdir.name)
+    
+    def tearDown(self):
+        """Remove the test profiles directory."""
+        self.tmpdir.cleanup()
     
     def test_create_profile_valid(self):
         """Test creating a valid profile."""
@@ -87,11 +144,58 @@ class TestPromptGenerator(unittest.TestCase):
         self.assertIn("LinkedIn", prompt.lower())
         self.assertIn("business", prompt.lower())
     
+    def test_generate_prompts_batch(self):
+        """Test batch generation matches single generation and reuses prefixes."""
+        batch = [
+            {'purpose': 'LinkedIn', 'attire': 'Business Formal', 'background': 'Corporate Office',
+             'vibe': 'Confident', 'custom_notes': f'note {i}'}
+            for i in range(5)
+        ]
+        prompts = self.generator.generate_prompts(batch)
+        self.assertEqual(prompts, [self.generator.generate_prompt(p) for p in batch])
+        self.assertTrue(prompts[3].endswith("note 3, masterpiece, best quality, highly detailed, photorealistic"))
+        self.assertEqual(self.generator._prefix.cache_info().currsize, 1)
+    
+    def test_quality_tags_from_config(self):
+        """Test quality tags come from PromptConfig."""
+        generator = PromptGenerator(prompt_config=PromptConfig(quality_tags=["8k"]))
+        prompt = generator.generate_prompt({'purpose': 'LinkedIn'})
+        self.assertTrue(prompt.endswith("detailed facial features, 8k"))
+    
+    def test_prompt_respects_token_budget(self):
+        """Test long custom notes are compressed to fit the budget."""
+        generator = PromptGenerator(prompt_config=PromptConfig(max_prompt_length=80))
+        prompt = generator.generate_prompt({
+            'purpose': 'LinkedIn', 'attire': 'Business Formal', 'background': 'Corporate Office',
+            'vibe': 'Confident', 'custom_notes': 'round glasses and a short beard ' * 50
+        })
+        self.assertLessEqual(generator.budget.count(prompt), 80)
+        self.assertIn("round glasses", prompt)
+        self.assertNotIn("cinematic lighting", prompt)
+    
     def test_generate_negative_prompt(self):
         """Test negative prompt generation."""
         negative_prompt = self.generator.generate_negative_prompt()
         self.assertIsInstance(negative_prompt, str)
         self.assertIn("blurry", negative_prompt)
 
+class TestPromptBudget(unittest.TestCase):
+    """Test PromptBudget functionality."""
+    
+    def test_drops_lowest_priority_first(self):
+        """Test fragments are dropped from the lowest priority up."""
+        budget = PromptBudget(max_tokens=4)
+        fragments = [
+            PromptFragment("keep", 3),
+            PromptFragment("drop", 1),
+            PromptFragment("also kept", 2)
+        ]
+        self.assertEqual(budget.assemble(fragments), "keep, also kept")
+    
+    def test_within_budget_unchanged(self):
+        """Test prompts under budget are joined as-is."""
+        budget = PromptBudget(max_tokens=100)
+        self.assertEqual(budget.assemble([PromptFragment("a", 1), PromptFragment("b", 2)]), "a, b")
+
 if __name__ == '__main__':
     unittest.main()
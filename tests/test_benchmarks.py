@@ -0,0 +1,79 @@
+"""
+Tests for the benchmark suite's regression checks.
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+# Add the repository and benchmarks directories to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import suite
+
+def result(value, unit="us/op"):
+    return {"value": value, "unit": unit}
+
+class TestCompare(unittest.TestCase):
+    """Test results are checked against the baseline and its thresholds."""
+
+    def test_regressions_beyond_threshold(self):
+        """Test only results slower than baseline * (1 + threshold) are reported."""
+        baseline = {"results": {"a": result(10.0), "b": result(10.0), "c": result(10.0)},
+                    "thresholds": {"c": 1.0}}
+        current = {"a": result(12.0), "b": result(13.0), "c": result(19.0), "new": result(99.0)}
+        regressions = suite.compare(current, baseline, threshold=0.25)
+        self.assertEqual([r["name"] for r in regressions], ["b"])
+        self.assertEqual(regressions[0]["ratio"], 1.3)
+        self.assertEqual(suite.compare(current, baseline, threshold=0.1)[0]["name"], "a")
+
+    def test_parse_scale(self):
+        """Test scale shorthands."""
+        self.assertEqual([suite.parse_scale(s) for s in ("1k", "100K", "1m", "250")],
+                         [1_000, 100_000, 1_000_000, 250])
+        self.assertEqual(suite.scale_label(100_000), "100k")
+
+class TestSuiteRun(unittest.TestCase):
+    """Run the suite at a tiny scale against a scratch baseline."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.baseline = os.path.join(self.tmpdir.name, "baseline.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_suite(self, *args):
+        with redirect_stdout(io.StringIO()):
+            return suite.main(["--scales", "20", "--ops", "10", "--repeat", "1",
+                               "--baseline", self.baseline, *args])
+
+    def test_update_then_compare(self):
+        """Test a recorded baseline passes, and an impossible one fails the run."""
+        output = os.path.join(self.tmpdir.name, "results.json")
+        self.assertEqual(self.run_suite("--update-baseline", "--output", output), 0)
+        with open(output) as f:
+            results = json.load(f)["results"]
+        for name in ("import_apex", "generate_prompt", "profile_to_json",
+                     "save_profile[20]", "load_profile[20]", "list_profiles[20]"):
+            self.assertIn(name, results)
+
+        with open(self.baseline) as f:
+            baseline = json.load(f)
+        self.assertEqual(set(baseline["results"]), set(results))
+        self.assertEqual(self.run_suite("--threshold", "1000"), 0)
+
+        for entry in baseline["results"].values():
+            entry["value"] = 1e-9
+        with open(self.baseline, "w") as f:
+            json.dump(baseline, f)
+        self.assertEqual(self.run_suite(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
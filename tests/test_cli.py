@@ -0,0 +1,111 @@
+"""
+Tests for the ``apex batch`` command.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.cli import main, read_rows, run_batch, chunked
+from apex.config.settings import ProfileConfig
+
+CSV_INPUT = (
+    "purpose,attire,background,vibe,custom_notes,employee_id\n"
+    "LinkedIn,Business Formal,Corporate Office,Confident,Round glasses,17\n"
+    ",Business Formal,Corporate Office,Confident,,18\n"
+    "Resume,Smart Casual,Plain Color,Friendly,,19\n"
+)
+
+class TestBatchCLI(unittest.TestCase):
+    """Test the batch pipeline and its command line."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.profiles_dir = os.path.join(self.tmpdir.name, "profiles")
+        self.profile_config = ProfileConfig(profiles_dir=self.profiles_dir,
+                                            uploads_dir=os.path.join(self.tmpdir.name, "uploads"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_read_rows_csv(self):
+        """Test CSV rows carry line numbers and drop blank cells."""
+        rows = list(read_rows(self.write("in.csv", CSV_INPUT)))
+        self.assertEqual([line for line, _, _ in rows], [2, 3, 4])
+        self.assertNotIn("purpose", rows[1][1])
+
+    def test_read_rows_jsonl_errors(self):
+        """Test malformed JSONL lines are reported, not fatal."""
+        path = self.write("in.jsonl", '{"purpose": "LinkedIn"}\nnot json\n\n[1, 2]\n')
+        rows = list(read_rows(path))
+        self.assertEqual(len(rows), 3)
+        self.assertIsNone(rows[0][2])
+        self.assertIn("Invalid JSON", rows[1][2])
+        self.assertEqual(rows[2][0], 4)
+        self.assertEqual(rows[2][2], "Expected a JSON object")
+
+    def test_chunked(self):
+        """Test chunking keeps order and the short tail."""
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+    def test_run_batch_reports_row_errors(self):
+        """Test valid rows are saved and invalid ones get an error."""
+        rows = read_rows(self.write("in.csv", CSV_INPUT))
+        results = list(run_batch(rows, self.profile_config, chunk_size=2))
+
+        self.assertEqual([result["line"] for result in results], [2, 3, 4])
+        self.assertIn("Round glasses", results[0]["prompt"])
+        self.assertTrue(os.path.exists(results[0]["location"]))
+        self.assertEqual(results[1]["error"], "Missing required fields: purpose")
+        self.assertEqual(len(os.listdir(self.profiles_dir)), 2)
+
+    def test_run_batch_rejects_non_string_fields(self):
+        """Test JSONL values must be strings."""
+        path = self.write("in.jsonl", json.dumps({"purpose": "LinkedIn", "attire": 3,
+                                                  "background": "Outdoor", "vibe": "Warm"}) + "\n")
+        results = list(run_batch(read_rows(path), self.profile_config, save=False))
+        self.assertEqual(results[0]["error"], "Field 'attire' must be a string")
+
+    def test_run_batch_multiprocess_keeps_order(self):
+        """Test worker processes return results in input order."""
+        lines = "".join(
+            json.dumps({"purpose": "LinkedIn", "attire": "Business Formal",
+                        "background": "Outdoor", "vibe": "Warm", "custom_notes": f"row {i}"}) + "\n"
+            for i in range(50)
+        )
+        results = list(run_batch(read_rows(self.write("in.jsonl", lines)), self.profile_config,
+                                 save=False, workers=2, chunk_size=7))
+        self.assertEqual([result["line"] for result in results], list(range(1, 51)))
+        self.assertTrue(all(f"row {i}" in result["prompt"] for i, result in enumerate(results)))
+        self.assertFalse(os.path.exists(self.profiles_dir) and os.listdir(self.profiles_dir))
+
+    def test_main_exit_status_and_output(self):
+        """Test the command writes results and fails when any row fails."""
+        input_path = self.write("in.csv", CSV_INPUT)
+        output_path = os.path.join(self.tmpdir.name, "out.jsonl")
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status = main(["batch", input_path, "-o", output_path, "-w", "1",
+                           "--profiles-dir", self.profiles_dir, "--dry-run"])
+
+        self.assertEqual(status, 1)
+        self.assertIn("line 3: Missing required fields: purpose", stderr.getvalue())
+        self.assertIn("Processed 3 rows (2 ok, 1 errors)", stderr.getvalue())
+        with open(output_path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 3)
+
+if __name__ == '__main__':
+    unittest.main()
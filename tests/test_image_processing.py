@@ -0,0 +1,98 @@
+"""
+Tests for reference photo preprocessing.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.config.settings import ProfileConfig
+from apex.utils.image_processing import Image, ImagePreprocessor, DerivedImageCache
+
+@unittest.skipIf(Image is None, "Pillow not installed")
+class TestImagePreprocessor(unittest.TestCase):
+    """Test ImagePreprocessor functionality."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.photo = os.path.join(self.tmpdir, "photo.jpg")
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise
+        Image.new("RGB", (400, 200), "red").save(self.photo, exif=exif)
+        self.cache = DerivedImageCache(os.path.join(self.tmpdir, "derived"))
+        self.preprocessor = ImagePreprocessor(self.cache, sizes=(50, 100), max_workers=1)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.preprocessor.shutdown()
+        shutil.rmtree(self.tmpdir)
+
+    def test_variants_resized_and_rotated(self):
+        """Test variants honour orientation and carry no EXIF."""
+        variants = self.preprocessor.preprocess(self.photo)
+        self.assertEqual(sorted(variants), [50, 100])
+        with Image.open(variants[100]) as image:
+            self.assertEqual(image.size, (50, 100))
+            self.assertNotIn(0x0112, image.getexif())
+
+    def test_cached_variants_reused(self):
+        """Test a second request is served from the cache."""
+        first = self.preprocessor.preprocess(self.photo)
+        second = self.preprocessor.submit(self.photo)
+        self.assertTrue(second.done())
+        self.assertEqual(second.result(), first)
+
+    def test_eviction_by_total_bytes(self):
+        """Test least recently used variants are evicted over budget."""
+        variants = self.preprocessor.preprocess(self.photo)
+        os.utime(variants[50], (0, 0))
+        self.cache.max_bytes = os.path.getsize(variants[100])
+        self.cache.evict()
+        self.assertFalse(os.path.exists(variants[50]))
+        self.assertTrue(os.path.exists(variants[100]))
+        self.assertLessEqual(self.cache.total_bytes, self.cache.max_bytes)
+
+class TestDerivedImageCache(unittest.TestCase):
+    """Test DerivedImageCache accounting."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = DerivedImageCache(os.path.join(self.tmpdir, "derived"), max_bytes=250)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, sha256, size, length):
+        path = self.cache.path_for(sha256, size)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"x" * length)
+        return path
+
+    def test_first_batch_counted_once(self):
+        """Test the files of the first batch aren't counted by the scan and again on top."""
+        paths = [self._write("ab" * 32, 50, 100), self._write("ab" * 32, 100, 100)]
+        with mock.patch.object(self.cache, "evict", wraps=self.cache.evict) as evict:
+            self.cache.add(paths)
+            self.assertEqual(self.cache.total_bytes, 200)
+            evict.assert_not_called()
+            self.cache.add([self._write("cd" * 32, 50, 100)])
+            evict.assert_called_once()
+        self.assertLessEqual(self.cache.total_bytes, 250)
+
+    def test_from_config(self):
+        """Test the cache directory and budget come from the profile config."""
+        cache = DerivedImageCache.from_config(ProfileConfig(derived_dir=self.tmpdir, derived_cache_bytes=123))
+        self.assertEqual((cache.cache_dir, cache.max_bytes), (self.tmpdir, 123))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Import-time regression tests for the apex package.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Importing the core must not pull these in
+HEAVY_MODULES = ("gradio", "PIL", "numpy", "uvicorn", "torch", "transformers")
+
+# Cumulative budget for `import apex.core, apex.models`, as reported by
+# `python -X importtime` (which itself adds overhead)
+IMPORT_BUDGET_MS = float(os.getenv("APEX_IMPORT_BUDGET_MS", "250"))
+
+def run_python(code, *flags):
+    """Run code in a fresh interpreter from the repo root."""
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+def cumulative_import_us(stderr, module):
+    """Cumulative microseconds for ``module`` from -X importtime output."""
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = [part.strip() for part in line[len("import time:"):].split("|")]
+        if parts[2] == module:
+            return int(parts[1])
+    raise AssertionError(f"{module} not found in importtime output")
+
+class TestImportTime(unittest.TestCase):
+    """Keep the core package cheap to import."""
+
+    def test_core_does_not_import_heavy_dependencies(self):
+        """Test importing apex leaves the UI and image stacks unloaded."""
+        result = run_python(
+            "import sys, json, apex, apex.core, apex.models, apex.utils; "
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+        )
+        self.assertEqual(json.loads(result.stdout), [])
+
+    def test_core_import_time_budget(self):
+        """Test the core and models import within the time budget."""
+        # Take the best of a few runs to reduce noise from a busy machine
+        timings = [
+            cumulative_import_us(run_python("import apex.core, apex.models", "-X", "importtime").stderr, "apex")
+            for _ in range(3)
+        ]
+        self.assertLess(min(timings) / 1000, IMPORT_BUDGET_MS)
+
+    def test_lazy_attributes_resolve(self):
+        """Test lazily loaded names are still reachable."""
+        result = run_python(
+            "import apex.core, apex.utils; "
+            "print(apex.core.AsyncProfileWriter.__name__, apex.core.ProfileIndex.__name__, "
+            "apex.utils.DerivedImageCache.__name__)"
+        )
+        self.assertEqual(result.stdout.split(), ["AsyncProfileWriter", "ProfileIndex", "DerivedImageCache"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Tests for the persistent judge verdict cache.
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.core.backends import GeneratedImage, StubImageJudge
+from apex.core.judge_cache import JudgeCache, CachingJudge, profile_fingerprint
+
+PREFERENCES = {
+    "purpose": "LinkedIn",
+    "attire": "Business Formal",
+    "background": "Corporate Office",
+    "vibe": "Confident"
+}
+
+class CountingJudge(StubImageJudge):
+    """Stub judge that counts the calls reaching it."""
+
+    def __init__(self):
+        super().__init__()
+        self.model = "counting"
+        self.calls = 0
+
+    def judge(self, image, preferences):
+        self.calls += 1
+        return super().judge(image, preferences)
+
+def image(n: int) -> GeneratedImage:
+    return GeneratedImage(data=f"image-{n}".encode("ascii"), prompt="business formal", seed=n)
+
+def fill_cache(args):
+    """Worker process writing verdicts into a shared cache."""
+    db_path, start = args
+    judge = CachingJudge(CountingJudge(), JudgeCache(db_path))
+    for n in range(start, start + 20):
+        judge.judge(image(n), PREFERENCES)
+    return judge.cache.misses
+
+class TestJudgeCache(unittest.TestCase):
+    """Test cases for JudgeCache and CachingJudge."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "judge_cache.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_repeat_judgement_hits_cache(self):
+        """Test that the second judgement is served from the cache."""
+        inner = CountingJudge()
+        judge = CachingJudge(inner, JudgeCache(self.db_path))
+
+        first = judge.judge(image(1), PREFERENCES)
+        second = judge.judge(image(1), PREFERENCES)
+
+        self.assertEqual(inner.calls, 1)
+        self.assertEqual(first.score, second.score)
+        self.assertEqual(first.criteria, second.criteria)
+        self.assertEqual(second.compute_units, 0.0)
+        self.assertEqual((judge.cache.hits, judge.cache.misses), (1, 1))
+
+    def test_key_components(self):
+        """Test that image, profile, model and rubric all change the key."""
+        cache = JudgeCache(self.db_path)
+        base = cache.key(image(1), PREFERENCES, "m", "1")
+
+        self.assertNotEqual(base, cache.key(image(2), PREFERENCES, "m", "1"))
+        self.assertNotEqual(base, cache.key(image(1), {**PREFERENCES, "vibe": "Friendly"}, "m", "1"))
+        self.assertNotEqual(base, cache.key(image(1), PREFERENCES, "other", "1"))
+        self.assertNotEqual(base, cache.key(image(1), PREFERENCES, "m", "2"))
+        # Fields outside basic_info/advanced_settings don't split the cache
+        self.assertEqual(base, cache.key(image(1), {**PREFERENCES, "custom_notes": "x"}, "m", "1"))
+
+    def test_profile_fingerprint_accepts_profile_data(self):
+        """Test that nested profile data hashes like flat preferences."""
+        nested = {"basic_info": PREFERENCES, "advanced_settings": {}, "additional_info": {"custom_notes": "x"}}
+        self.assertEqual(profile_fingerprint(nested), profile_fingerprint(PREFERENCES))
+
+    def test_persists_across_instances(self):
+        """Test that verdicts survive reopening the cache."""
+        CachingJudge(CountingJudge(), JudgeCache(self.db_path)).judge(image(1), PREFERENCES)
+
+        inner = CountingJudge()
+        CachingJudge(inner, JudgeCache(self.db_path)).judge(image(1), PREFERENCES)
+        self.assertEqual(inner.calls, 0)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entries are evicted first."""
+        cache = JudgeCache(self.db_path, max_entries=2)
+        judge = CachingJudge(CountingJudge(), cache)
+        judge.judge(image(1), PREFERENCES)
+        judge.judge(image(2), PREFERENCES)
+        time.sleep(0.01)
+        judge.judge(image(1), PREFERENCES)  # refresh 1 so 2 is oldest
+        judge.judge(image(3), PREFERENCES)
+        cache.evict()
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get(cache.key(image(1), PREFERENCES, judge.model, judge.rubric_version)))
+        self.assertIsNone(cache.get(cache.key(image(2), PREFERENCES, judge.model, judge.rubric_version)))
+
+    def test_ttl_expiry(self):
+        """Test that expired entries are misses."""
+        inner = CountingJudge()
+        judge = CachingJudge(inner, JudgeCache(self.db_path, ttl_seconds=0.01))
+        judge.judge(image(1), PREFERENCES)
+        time.sleep(0.02)
+        judge.judge(image(1), PREFERENCES)
+        self.assertEqual(inner.calls, 2)
+
+    def test_judge_batch_only_sends_misses(self):
+        """Test that a batch only forwards uncached images."""
+        inner = CountingJudge()
+        judge = CachingJudge(inner, JudgeCache(self.db_path))
+        judge.judge(image(1), PREFERENCES)
+
+        verdicts = judge.judge_batch([image(1), image(2), image(3)], PREFERENCES)
+        self.assertEqual(len(verdicts), 3)
+        self.assertEqual(inner.calls, 3)
+
+    def test_shared_across_processes(self):
+        """Test that several processes can fill one cache file."""
+        with multiprocessing.get_context("spawn").Pool(2) as pool:
+            misses = pool.map(fill_cache, [(self.db_path, 0), (self.db_path, 10)])
+        self.assertGreaterEqual(sum(misses), 30)
+
+        cache = JudgeCache(self.db_path)
+        self.assertEqual(len(cache), 30)
+
+if __name__ == '__main__':
+    unittest.main()
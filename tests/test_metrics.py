@@ -0,0 +1,182 @@
+"""
+Tests for pipeline metrics and the Prometheus text output.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+import urllib.request
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.api.server import APEXApi
+from apex.core import instrumentation as instrumentation_module
+from apex.core.agentic_loop import APEXGenerator
+from apex.core.backends import StubImageGenerator, StubImageJudge
+from apex.core.instrumentation import Instrumentation
+from apex.core.profile_manager import ProfileManager
+from apex.core.prompt_generator import PromptGenerator
+from apex.utils.metrics import MetricsRegistry
+
+PREFERENCES = {
+    "purpose": "LinkedIn",
+    "attire": "Business Formal",
+    "background": "Corporate Office",
+    "vibe": "Confident"
+}
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test counters, histograms and their text rendering."""
+
+    def test_render_counter_and_histogram(self):
+        """Test the Prometheus exposition format."""
+        registry = MetricsRegistry()
+        counter = registry.counter("apex_things_total", "Things.", ["kind"])
+        counter.inc(kind="a")
+        counter.inc(2, kind='b"c')
+        histogram = registry.histogram("apex_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        lines = registry.render().splitlines()
+        self.assertIn("# TYPE apex_things_total counter", lines)
+        self.assertIn('apex_things_total{kind="a"} 1', lines)
+        self.assertIn('apex_things_total{kind="b\\"c"} 2', lines)
+        self.assertIn("# TYPE apex_latency_seconds histogram", lines)
+        self.assertIn('apex_latency_seconds_bucket{le="0.1"} 1', lines)
+        self.assertIn('apex_latency_seconds_bucket{le="1.0"} 2', lines)
+        self.assertIn('apex_latency_seconds_bucket{le="+Inf"} 3', lines)
+        self.assertIn("apex_latency_seconds_sum 5.55", lines)
+        self.assertIn("apex_latency_seconds_count 3", lines)
+
+    def test_labels_are_checked(self):
+        """Test wrong label names and re-registration are rejected."""
+        registry = MetricsRegistry()
+        counter = registry.counter("apex_things_total", "Things.", ["kind"])
+        with self.assertRaises(ValueError):
+            counter.inc(other="x")
+        with self.assertRaises(ValueError):
+            counter.inc(-1, kind="a")
+        self.assertIs(registry.counter("apex_things_total", "Things.", ["kind"]), counter)
+        with self.assertRaises(ValueError):
+            registry.histogram("apex_things_total", "Things.", ["kind"])
+
+    def test_serve(self):
+        """Test the standalone /metrics server."""
+        registry = MetricsRegistry()
+        registry.counter("apex_things_total", "Things.").inc()
+        server = registry.serve(0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                body = response.read().decode("utf-8")
+                self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertIn("apex_things_total 1", body)
+
+class TestInstrumentation(unittest.TestCase):
+    """Test the pipeline wrappers."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.instrumentation = Instrumentation()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_disabled_returns_components_unchanged(self):
+        """Test disabled instrumentation adds no wrappers."""
+        instrumentation = Instrumentation(enabled=False)
+        manager = ProfileManager(self.tmpdir.name)
+        self.assertIs(instrumentation.instrument(manager), manager)
+        self.assertNotIn("save_profile", vars(manager))
+        generator = StubImageGenerator()
+        self.assertIs(instrumentation.instrument(generator), generator)
+        with instrumentation.stage("anything"):
+            pass
+
+    def test_profile_manager_counters(self):
+        """Test created, saved and failed profiles are counted and timed."""
+        instrumentation = self.instrumentation
+        manager = instrumentation.instrument(ProfileManager(self.tmpdir.name, max_profiles=1))
+        profile, _, _ = manager.create_profile(**PREFERENCES)
+        manager.create_profile(**dict(PREFERENCES, purpose=""))
+        manager.save_profile(profile)
+        with self.assertRaises(ValueError):
+            manager.save_profile(profile)
+
+        self.assertEqual(instrumentation.profiles_created.value(result="valid"), 1)
+        self.assertEqual(instrumentation.profiles_created.value(result="invalid"), 1)
+        self.assertEqual(instrumentation.profiles_saved.value(), 1)
+        self.assertEqual(instrumentation.profile_save_failures.value(), 1)
+        self.assertEqual(instrumentation.stage_seconds.count(stage="save_profile"), 2)
+        self.assertEqual(instrumentation.stage_errors.value(stage="save_profile"), 1)
+        # Wrapping twice doesn't double count
+        self.assertIs(instrumentation.instrument(manager), manager)
+
+    def test_prompt_generator_and_backends(self):
+        """Test prompts, images and judgements are counted with their compute units."""
+        instrumentation = self.instrumentation
+        prompts = instrumentation.instrument(PromptGenerator())
+        prompts.generate_prompts([PREFERENCES, PREFERENCES])
+        prompt = prompts.generate_prompt(PREFERENCES)
+
+        generator = instrumentation.instrument(StubImageGenerator(compute_units=2.0))
+        judge = instrumentation.instrument(StubImageJudge())
+        image = generator.generate(prompt, "", 1)
+        judge.judge(image, PREFERENCES)
+        judge.judge_batch([image, image], PREFERENCES)
+
+        self.assertEqual(instrumentation.prompts_generated.value(), 3)
+        self.assertEqual(instrumentation.images_generated.value(), 1)
+        self.assertEqual(instrumentation.judgements.value(), 3)
+        self.assertEqual(instrumentation.compute_units.value(stage="generate_image"), 2.0)
+        self.assertEqual(generator.compute_units, 2.0)
+        self.assertIn('apex_stage_seconds_count{stage="judge_batch"} 1', instrumentation.render())
+
+    def test_duck_typed_backends_are_left_unwrapped(self):
+        """Test backends that don't subclass the interfaces still work with metrics on."""
+        class DuckGenerator:
+            def generate(self, prompt, negative_prompt, seed, resolution=None):
+                return StubImageGenerator().generate(prompt, negative_prompt, seed, resolution)
+
+        duck = DuckGenerator()
+        self.assertIs(self.instrumentation.instrument(duck), duck)
+        with mock.patch.object(instrumentation_module, "_default_instrumentation", self.instrumentation):
+            result = APEXGenerator(generator=duck).generate(PREFERENCES)
+        self.assertIsNotNone(result.image)
+        self.assertGreater(self.instrumentation.judgements.value(), 0)
+
+    def test_api_metrics_endpoint(self):
+        """Test /metrics serves the text format, and 404s when disabled."""
+        def get(app, path):
+            sent = []
+
+            async def receive():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message):
+                sent.append(message)
+
+            asyncio.run(app({"type": "http", "method": "GET", "path": path, "query_string": b""}, receive, send))
+            return sent[0]["status"], dict(sent[0]["headers"]), sent[1]["body"].decode("utf-8")
+
+        app = APEXApi(profile_manager=ProfileManager(self.tmpdir.name), instrumentation=self.instrumentation)
+        get(app, "/presets")
+        status, headers, body = get(app, "/metrics")
+        self.assertEqual(status, 200)
+        self.assertTrue(headers[b"content-type"].startswith(b"text/plain"))
+        self.assertIn('apex_http_request_seconds_count{method="GET",route="/presets",status="200"} 1', body)
+
+        disabled = APEXApi(profile_manager=ProfileManager(self.tmpdir.name),
+                           instrumentation=Instrumentation(enabled=False))
+        self.assertEqual(get(disabled, "/metrics")[0], 404)
+
+if __name__ == '__main__':
+    unittest.main()
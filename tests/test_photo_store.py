@@ -0,0 +1,81 @@
+"""
+Tests for reference photo ingestion.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import hashlib
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.core.photo_store import ReferencePhotoStore, UploadTooLargeError
+from apex.core.profile_manager import ProfileManager
+
+class TestReferencePhotoStore(unittest.TestCase):
+    """Test ReferencePhotoStore functionality."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.uploads_dir = os.path.join(self.tmpdir, "uploads")
+        self.store = ReferencePhotoStore(self.uploads_dir, max_file_size=1024)
+        self.content = b"\xff\xd8fake jpeg" * 10
+        self.photo = self._write("headshot.JPG", self.content)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_ingest_stores_by_hash(self):
+        """Test uploads are stored under their content hash."""
+        sha256, stored_path = self.store.ingest(self.photo)
+        self.assertEqual(sha256, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(stored_path, os.path.join(self.uploads_dir, sha256[:2], sha256 + ".jpg"))
+        with open(stored_path, 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_repeat_upload_deduplicated(self):
+        """Test the same content is stored once and not rewritten."""
+        _, first = self.store.ingest(self.photo)
+        mtime = os.stat(first).st_mtime_ns
+        _, second = self.store.ingest(self._write("again.jpg", self.content))
+        self.assertEqual(first, second)
+        self.assertEqual(os.stat(second).st_mtime_ns, mtime)
+        self.assertEqual(len(os.listdir(os.path.dirname(first))), 1)
+
+    def test_size_limit_enforced(self):
+        """Test oversized uploads are rejected without leaving files."""
+        with self.assertRaises(UploadTooLargeError):
+            self.store.ingest(self._write("big.jpg", b"x" * 2048))
+        self.assertFalse(os.path.exists(self.uploads_dir))
+
+    def test_profile_records_hash_and_path(self):
+        """Test created profiles reference the stored photo."""
+        manager = ProfileManager(os.path.join(self.tmpdir, "profiles"), photo_store=self.store)
+        profile, is_valid, _ = manager.create_profile(
+            "LinkedIn", "Business Formal", "Corporate Office", "Confident", photo_path=self.photo
+        )
+        self.assertTrue(is_valid)
+        sha256 = hashlib.sha256(self.content).hexdigest()
+        self.assertEqual(profile.additional_info.reference_photo_sha256, sha256)
+        self.assertEqual(profile.additional_info.reference_photo, self.store.path_for(sha256, ".jpg"))
+
+        _, is_valid, message = manager.create_profile(
+            "LinkedIn", "Business Formal", "Corporate Office", "Confident",
+            photo_path=self._write("big.jpg", b"x" * 2048)
+        )
+        self.assertFalse(is_valid)
+        self.assertIn("limit", message)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+Tests for the generation result cache.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.core.backends import StubImageGenerator
+from apex.core.result_cache import (GenerationResultCache, CachingImageGenerator,
+                                    normalize_prompt, result_key)
+
+PROMPT = "portrait of a person, business suit, corporate office"
+NEGATIVE = "blurry, low quality"
+
+class CountingGenerator(StubImageGenerator):
+    """Stub generator that counts the calls reaching it."""
+
+    def __init__(self):
+        super().__init__(compute_units=2.0)
+        self.calls = 0
+
+    def generate(self, prompt, negative_prompt, seed, resolution=None):
+        self.calls += 1
+        return super().generate(prompt, negative_prompt, seed, resolution)
+
+class TestGenerationResultCache(unittest.TestCase):
+    """Test cases for GenerationResultCache and CachingImageGenerator."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmpdir.name, "results")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_normalize_prompt(self):
+        """Test that cosmetic whitespace differences normalize away."""
+        self.assertEqual(normalize_prompt("  a  portrait ,suit,\n office , "), "a portrait, suit, office")
+        self.assertEqual(normalize_prompt(None), "")
+
+    def test_key_components(self):
+        """Test which request fields split the cache."""
+        base = result_key(PROMPT, NEGATIVE, "1024x1024", 1)
+        self.assertEqual(base, result_key(PROMPT.replace(", ", " ,  "), NEGATIVE, "1024x1024", 1))
+        self.assertNotEqual(base, result_key(PROMPT, "", "1024x1024", 1))
+        self.assertNotEqual(base, result_key(PROMPT, NEGATIVE, "512x512", 1))
+        self.assertNotEqual(base, result_key(PROMPT, NEGATIVE, "1024x1024", 2))
+        self.assertNotEqual(base, result_key(PROMPT, NEGATIVE, "1024x1024", 1, model="other"))
+        # With the "any" policy the seed is ignored
+        self.assertEqual(result_key(PROMPT, NEGATIVE, None, 1, "any"), result_key(PROMPT, NEGATIVE, None, 2, "any"))
+        with self.assertRaises(ValueError):
+            result_key(PROMPT, NEGATIVE, None, 1, "sometimes")
+
+    def test_hit_short_circuits_backend(self):
+        """Test that a repeat request is served without calling the generator."""
+        inner = CountingGenerator()
+        generator = CachingImageGenerator(inner, GenerationResultCache(self.cache_dir))
+
+        first = generator.generate(PROMPT, NEGATIVE, 7, "1024x1024")
+        second = generator.generate(PROMPT + " ", NEGATIVE, 7, "1024x1024")
+
+        self.assertEqual(inner.calls, 1)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(second.seed, 7)
+        self.assertEqual(second.compute_units, 0.0)
+        self.assertTrue(second.metadata["cache_hit"])
+        self.assertEqual(second.metadata["resolution"], "1024x1024")
+
+        stats = generator.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertEqual(stats["bytes_saved"], len(first.data))
+        self.assertEqual(stats["compute_units_saved"], 2.0)
+
+    def test_any_seed_policy(self):
+        """Test that the "any" policy reuses an image across seeds."""
+        inner = CountingGenerator()
+        generator = CachingImageGenerator(inner, GenerationResultCache(self.cache_dir), seed_policy="any")
+        generator.generate(PROMPT, NEGATIVE, 1)
+        image = generator.generate(PROMPT, NEGATIVE, 2)
+        self.assertEqual(inner.calls, 1)
+        self.assertEqual(image.seed, 1)
+
+    def test_persists_across_instances(self):
+        """Test that results survive reopening the cache."""
+        CachingImageGenerator(CountingGenerator(), GenerationResultCache(self.cache_dir)).generate(PROMPT, NEGATIVE, 1)
+
+        inner = CountingGenerator()
+        CachingImageGenerator(inner, GenerationResultCache(self.cache_dir)).generate(PROMPT, NEGATIVE, 1)
+        self.assertEqual(inner.calls, 0)
+
+    def test_size_bounded_lru_eviction(self):
+        """Test that the least recently used images are evicted past the byte budget."""
+        size = len(StubImageGenerator().generate(PROMPT, NEGATIVE, 0).data)
+        cache = GenerationResultCache(self.cache_dir, max_bytes=2 * size)
+        generator = CachingImageGenerator(CountingGenerator(), cache)
+        keys = [result_key(PROMPT, NEGATIVE, None, seed, model=generator.model) for seed in range(3)]
+
+        generator.generate(PROMPT, NEGATIVE, 0)
+        time.sleep(0.01)
+        generator.generate(PROMPT, NEGATIVE, 1)
+        time.sleep(0.01)
+        generator.generate(PROMPT, NEGATIVE, 0)  # refresh 0 so 1 is oldest
+        time.sleep(0.01)
+        generator.generate(PROMPT, NEGATIVE, 2)
+
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.total_bytes, 2 * size)
+        self.assertFalse(os.path.exists(cache.path_for(keys[1], "ppm")))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[0]))
+
+    def test_running_total_matches_entries(self):
+        """Test the stored byte total follows inserts, replacements, evictions and lost files."""
+        size = len(StubImageGenerator().generate(PROMPT, NEGATIVE, 0).data)
+        cache = GenerationResultCache(self.cache_dir, max_bytes=3 * size)
+        generator = CachingImageGenerator(CountingGenerator(), cache)
+        for seed in range(5):
+            generator.generate(PROMPT, NEGATIVE, seed)
+        key = result_key(PROMPT, NEGATIVE, None, 4, model=generator.model)
+        cache.put(key, StubImageGenerator().generate(PROMPT, NEGATIVE, 4))
+        os.remove(cache.path_for(key, "ppm"))
+        self.assertIsNone(cache.get(key))
+
+        def summed():
+            with sqlite3.connect(os.path.join(self.cache_dir, "index.db")) as conn:
+                return conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+        self.assertEqual(cache.total_bytes, summed())
+        self.assertEqual(cache.total_bytes, 2 * size)
+        cache.close()
+        # An index written before the total was kept is counted once on open
+        with sqlite3.connect(os.path.join(self.cache_dir, "index.db")) as conn:
+            conn.execute("DROP TABLE meta")
+        self.assertEqual(GenerationResultCache(self.cache_dir).total_bytes, 2 * size)
+
+    def test_missing_file_is_a_miss(self):
+        """Test that an image deleted from disk is regenerated."""
+        inner = CountingGenerator()
+        generator = CachingImageGenerator(inner, GenerationResultCache(self.cache_dir))
+        generator.generate(PROMPT, NEGATIVE, 1)
+        key = result_key(PROMPT, NEGATIVE, None, 1, model=generator.model)
+        os.remove(generator.cache.path_for(key, "ppm"))
+
+        generator.generate(PROMPT, NEGATIVE, 1)
+        self.assertEqual(inner.calls, 2)
+        self.assertEqual(len(generator.cache), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Tests for the profile similarity index.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.core.profile_manager import ProfileManager
+from apex.core.similarity import ProfileIndex, HashingEmbedder
+from apex.models.profile import Profile
+
+def profile(attire="Business Formal", vibe="Confident", notes=None):
+    return Profile.create_profile("LinkedIn", attire, "Corporate Office", vibe, custom_notes=notes).to_dict()
+
+class TestProfileIndex(unittest.TestCase):
+    """Test ProfileIndex functionality."""
+
+    def test_embedder_is_normalized_and_deterministic(self):
+        """Test embeddings are unit length and stable."""
+        embedder = HashingEmbedder(dim=32)
+        vectors = embedder.embed(["round glasses, navy tie", ""])
+        self.assertAlmostEqual(float((vectors[0] ** 2).sum()), 1.0, places=5)
+        self.assertEqual(float(abs(vectors[1]).sum()), 0.0)
+        self.assertEqual(embedder.embed(["round glasses, navy tie"]).tolist(), vectors[:1].tolist())
+
+    def test_query_ranks_closest_first(self):
+        """Test the identical profile ranks above partial matches."""
+        index = ProfileIndex()
+        index.add_many([
+            ("same", profile(notes="round glasses")),
+            ("other_vibe", profile(vibe="Friendly", notes="round glasses")),
+            ("other_attire", profile(attire="Academic", vibe="Warm")),
+        ])
+        results = index.query(profile(notes="round glasses"), k=3)
+        self.assertEqual([profile_id for profile_id, _ in results], ["same", "other_vibe", "other_attire"])
+        self.assertAlmostEqual(results[0][1], 1.0, places=5)
+        self.assertEqual(index.best_match(profile(notes="round glasses"))[0], "same")
+        self.assertIsNone(index.best_match(profile(attire="Smart Casual", vibe="Warm")))
+
+    def test_flat_preferences_query(self):
+        """Test queries accept flat preferences and ignore unknown values."""
+        index = ProfileIndex()
+        index.add("a", profile())
+        results = index.query({"purpose": "LinkedIn", "attire": "Business Formal", "vibe": "Nope"})
+        self.assertEqual(results[0][0], "a")
+        self.assertAlmostEqual(results[0][1], 1.0, places=5)
+
+    def test_reindex_remove_and_growth(self):
+        """Test re-adding replaces, removing compacts, and arrays grow."""
+        index = ProfileIndex(initial_capacity=2)
+        for i in range(5):
+            index.add(f"p{i}", profile(vibe="Friendly"))
+        index.add("p0", profile(vibe="Confident"))
+        self.assertEqual(len(index), 5)
+        self.assertEqual(index.query(profile(vibe="Confident"), k=1)[0][0], "p0")
+
+        self.assertTrue(index.remove("p1"))
+        self.assertFalse(index.remove("p1"))
+        self.assertEqual(len(index), 4)
+        self.assertEqual({profile_id for profile_id, _ in index.query(profile(), k=10)}, {"p0", "p2", "p3", "p4"})
+
+    def test_tracks_profile_manager(self):
+        """Test an attached index follows saves and deletes."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ProfileManager(tmpdir)
+            manager.save_profile(Profile.create_profile("Resume", "Academic", "Outdoor", "Warm"), "old.json")
+            index = ProfileIndex.build(manager)
+            self.assertIn("old.json", index)
+
+            manager.save_profile(Profile.create_profile("LinkedIn", "Business Formal",
+                                                        "Corporate Office", "Confident"), "new.json")
+            manager.save_profiles([Profile.create_profile("LinkedIn", "Smart Casual", "Outdoor", "Warm")],
+                                  filenames=["batch.json"])
+            self.assertEqual(len(index), 3)
+            self.assertEqual(index.query(profile(), k=1)[0][0], "new.json")
+
+            manager.delete_profile("new.json")
+            self.assertNotIn("new.json", index)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,519 @@
+"""
+Tests for profile storage backends.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.core.profile_manager import ProfileManager
+from apex.core.catalog import ProfileCatalog
+from apex.core.dedup import INDEX_FILE, content_hash
+from apex.cli import main
+from apex.config.settings import ProfileConfig
+from apex.core.storage import (JSONDirectoryStore, ShardedDirectoryStore, SQLiteProfileStore, decode_cursor,
+                               migrate_to_sharded, read_layout)
+from apex.core.write_queue import AsyncProfileWriter
+from apex.utils import file_utils
+from apex.utils.fs_watch import InotifyWatcher, PollingWatcher
+from apex.utils.ids import new_ulid
+
+class StoreTestMixin:
+    """Behaviour shared by every storage backend."""
+
+    def make_store(self, directory):
+        raise NotImplementedError
+
+    def setUp(self):
+        """Set up test environment."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = self.make_store(self.tmpdir)
+        self.manager = ProfileManager(self.tmpdir, store=self.store)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.store.close()
+        shutil.rmtree(self.tmpdir)
+
+    def _save(self, filename, purpose="LinkedIn", vibe="Confident", timestamp=None):
+        profile, _, _ = self.manager.create_profile(purpose, "Business Formal", "Corporate Office", vibe)
+        if timestamp:
+            profile.metadata.timestamp = timestamp
+        return self.manager.save_profile(profile, filename)
+
+    def test_save_and_load(self):
+        """Test a saved profile round-trips."""
+        self._save("one")
+        data = self.manager.load_profile("one.json")
+        self.assertEqual(data["basic_info"]["purpose"], "LinkedIn")
+        self.assertIsNone(self.manager.load_profile("missing.json"))
+
+    def test_list_and_delete(self):
+        """Test listing and deleting profiles."""
+        self._save("one")
+        self._save("two")
+        self.assertEqual(sorted(self.manager.list_profiles()), ["one.json", "two.json"])
+        self.assertTrue(self.manager.delete_profile("one.json"))
+        self.assertFalse(self.manager.delete_profile("one.json"))
+        self.assertEqual(self.manager.count_profiles(), 1)
+
+    def test_query_filters_and_orders(self):
+        """Test filtering and timestamp ordering."""
+        self._save("old", timestamp="2025-01-01 10:00:00")
+        self._save("new", timestamp="2025-06-01 10:00:00")
+        self._save("resume", purpose="Resume", timestamp="2025-03-01 10:00:00")
+
+        self.assertEqual(self.manager.query_profiles(purpose="LinkedIn"), ["new.json", "old.json"])
+        self.assertEqual(self.manager.query_profiles(newest_first=False, limit=2),
+                         ["old.json", "resume.json"])
+        self.assertEqual(self.manager.query_profiles(limit=1, offset=1), ["resume.json"])
+        with self.assertRaises(ValueError):
+            self.manager.query_profiles(custom_notes="x")
+
+    def test_max_profiles_enforced(self):
+        """Test the profile limit rejects new profiles but allows overwrites."""
+        self.manager.max_profiles = 1
+        self._save("one")
+        self._save("one")
+        with self.assertRaises(ValueError):
+            self._save("two")
+
+    def test_max_profiles_counts_store_once(self):
+        """Test the limit is tracked without recounting the store on every save."""
+        self._save("one")
+        self.manager.max_profiles = 3
+        calls = []
+        count = self.store.count
+        self.store.count = lambda: calls.append(1) or count()
+        self._save("two")
+        self.manager.save_profiles([self.manager.create_profile(
+            "LinkedIn", "Business Formal", "Corporate Office", "Confident")[0]])
+        with self.assertRaises(ValueError):
+            self._save("four")
+        self.manager.delete_profile("one.json")
+        self._save("four")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.manager.count_profiles(), 3)
+
+    def test_default_filenames_unique(self):
+        """Test saves in the same second get distinct, ordered filenames."""
+        paths = [self._save(None) for _ in range(20)]
+        self.assertEqual(len(set(paths)), 20)
+        self.assertEqual(self.manager.count_profiles(), 20)
+
+    def test_save_profiles_batch(self):
+        """Test batched saves persist every profile."""
+        profiles = [
+            self.manager.create_profile("LinkedIn", "Business Formal", "Corporate Office", "Confident")[0]
+            for _ in range(25)
+        ]
+        locations = self.manager.save_profiles(profiles, batch_size=10)
+        self.assertEqual(len(locations), 25)
+        self.assertEqual(self.manager.count_profiles(), 25)
+
+    def test_summary_pages(self):
+        """Test summaries come a page at a time, in order, filtered and resumable."""
+        for i in range(7):
+            self._save(f"p{i}", purpose="Resume" if i == 3 else "LinkedIn")
+        self.manager.store.save("p9.json", {"metadata": {"version": "9.9"}})
+
+        pages = list(self.store.summary_pages({"purpose": "LinkedIn"}, page_size=2))
+        self.assertEqual([[s.id for s in page] for page, _ in pages],
+                         [["p6.json", "p5.json"], ["p4.json", "p2.json"], ["p1.json", "p0.json"]])
+        self.assertEqual(pages[0][0][0].purpose, "LinkedIn")
+
+        _, cursor = self.manager.list_summaries(limit=3, newest_first=False)
+        oldest = [s.id for s in self.manager.iter_summaries(newest_first=False, after=cursor, page_size=3)]
+        self.assertEqual(oldest, ["p3.json", "p4.json", "p5.json", "p6.json"])
+
+        page, cursor = self.manager.list_summaries(limit=3)
+        self.assertEqual([s.id for s in page], ["p6.json", "p5.json", "p4.json"])
+        page, cursor = self.manager.list_summaries(limit=3, cursor=cursor)
+        self.assertEqual([s.id for s in page], ["p3.json", "p2.json", "p1.json"])
+        page, cursor = self.manager.list_summaries(limit=3, cursor=cursor)
+        self.assertEqual(([s.id for s in page], cursor), (["p0.json"], None))
+        with self.assertRaises(ValueError):
+            self.manager.list_summaries(custom_notes="x")
+        with self.assertRaises(ValueError):
+            self.manager.list_summaries(cursor="p2.json")
+
+    def test_summaries_ordered_by_timestamp(self):
+        """Test summaries follow the profile timestamps, not the id order, like query_profiles."""
+        self._save("portrait_profile_20250101_120000", timestamp="2025-01-01 12:00:00")
+        self._save(f"portrait_profile_{new_ulid()}", timestamp="2026-01-01 12:00:00")
+        self._save(f"portrait_profile_{new_ulid()}", timestamp="2024-01-01 12:00:00")
+        expected = self.manager.query_profiles()
+
+        page, cursor = self.manager.list_summaries(limit=1)
+        seen = [s.id for s in page]
+        while cursor:
+            page, cursor = self.manager.list_summaries(limit=1, cursor=cursor)
+            seen.extend(s.id for s in page)
+        self.assertEqual(seen, expected)
+        self.assertEqual([s.timestamp[:4] for s in self.manager.iter_summaries()], ["2026", "2025", "2024"])
+        self.assertEqual([s.id for s in self.manager.iter_summaries(newest_first=False)], expected[::-1])
+
+class TestJSONDirectoryStore(StoreTestMixin, unittest.TestCase):
+    """Test the one-file-per-profile backend."""
+
+    def make_store(self, directory):
+        return JSONDirectoryStore(directory)
+
+    def test_no_temporary_files_left(self):
+        """Test atomic writes leave only complete profile files behind."""
+        self._save("one")
+        self.manager.save_profiles([self.manager.create_profile("LinkedIn", "Academic", "Outdoor", "Warm")[0]])
+        self.assertEqual(len(os.listdir(self.tmpdir)), 2)
+
+    def test_batch_save_flushes_once(self):
+        """Test a batch is flushed with one syncfs, never os.sync, falling back to per-file fsync."""
+        profile = self.manager.create_profile("LinkedIn", "Academic", "Outdoor", "Warm")[0]
+        syncfs = mock.Mock(return_value=0)
+        with mock.patch.object(os, "sync", side_effect=AssertionError("os.sync called"), create=True), \
+                mock.patch.object(file_utils, "_libc_syncfs", return_value=syncfs), \
+                mock.patch.object(os, "fsync", wraps=os.fsync) as fsync:
+            self.manager.save_profiles([profile] * 3)
+        self.assertEqual(syncfs.call_count, 1)
+        # Only the directory
+        self.assertEqual(fsync.call_count, 1)
+
+        with mock.patch.object(file_utils, "_libc_syncfs", return_value=None), \
+                mock.patch.object(os, "fsync", wraps=os.fsync) as fsync:
+            self.manager.save_profiles([profile] * 3)
+        # One per file plus one for the directory
+        self.assertEqual(fsync.call_count, 4)
+        self.assertEqual(self.manager.count_profiles(), 6)
+
+    def test_summaries_load_one_page(self):
+        """Test once timestamps are cached, a page of summaries loads only that page's profiles."""
+        self.manager.save_profiles([self.manager.create_profile("LinkedIn", "Academic", "Outdoor", "Warm")[0]] * 50)
+        self.manager.list_summaries(limit=10)
+        loaded = []
+        load = self.store.load
+        self.store.load = lambda profile_id: loaded.append(profile_id) or load(profile_id)
+        page, cursor = self.manager.list_summaries(limit=10)
+        self.assertEqual(len(page), 10)
+        self.assertEqual(loaded, [summary.id for summary in page])
+        self.assertEqual(decode_cursor(cursor)[1], page[-1].id)
+
+class TestShardedDirectoryStore(StoreTestMixin, unittest.TestCase):
+    """Test the sharded one-file-per-profile backend and migration to it."""
+
+    def make_store(self, directory):
+        return ShardedDirectoryStore(directory, depth=2)
+
+    def test_files_are_sharded(self):
+        """Test profiles land two levels down and nothing is left at the top."""
+        self._save("one")
+        path = self.store.location("one.json")
+        self.assertEqual(os.path.relpath(path, self.tmpdir).count(os.sep), 2)
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(os.listdir(self.tmpdir), [os.path.relpath(path, self.tmpdir).split(os.sep)[0]])
+
+    def test_iter_profiles_is_lazy(self):
+        """Test iteration yields ids before every shard has been walked."""
+        for i in range(30):
+            self._save(f"p{i}")
+        ids = self.manager.iter_profiles()
+        self.assertIsInstance(next(ids), str)
+        self.assertEqual(len(list(ids)), 29)
+
+    def test_online_migration(self):
+        """Test a flat directory stays readable through migration, including stale flat copies."""
+        flat = ProfileManager(self.tmpdir, store=JSONDirectoryStore(self.tmpdir))
+        for i in range(40):
+            profile, _, _ = flat.create_profile("LinkedIn", "Business Formal", "Corporate Office", "Confident")
+            flat.save_profile(profile, f"p{i}")
+
+        # Opened as sharded before migrating: flat files are still listed and loadable
+        store = ShardedDirectoryStore(self.tmpdir, depth=1)
+        self.assertEqual(len(store.list_ids()), 40)
+        self.assertEqual(store.load("p3.json")["basic_info"]["purpose"], "LinkedIn")
+        data = store.load("p4.json")
+        data["basic_info"]["vibe"] = "Friendly"
+        store.save("p4.json", data)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, "p4.json")))
+        # A flat-layout writer recreates p5 at the top level after its shard copy exists
+        store.save("p5.json", store.load("p5.json"))
+        flat.store.save("p5.json", data)
+        self.assertEqual(len(store.list_ids()), 40)
+
+        stats = migrate_to_sharded(self.tmpdir, depth=1)
+        self.assertEqual(stats, {"moved": 38, "superseded": 1})
+        self.assertEqual(read_layout(self.tmpdir), {"layout": "sharded", "depth": 1})
+        self.assertEqual(sorted(os.listdir(self.tmpdir))[0], ".apex-layout")
+        self.assertFalse([name for name in os.listdir(self.tmpdir) if name.endswith(".json")])
+        self.assertEqual(store.load("p4.json")["basic_info"]["vibe"], "Friendly")
+
+        # New managers pick the layout up from the directory
+        manager = ProfileManager(self.tmpdir)
+        self.assertIsInstance(manager.store, ShardedDirectoryStore)
+        self.assertEqual(manager.count_profiles(), 40)
+        self.assertEqual(migrate_to_sharded(self.tmpdir), {"moved": 0, "superseded": 0})
+
+    def test_migrate_command(self):
+        """Test apex migrate-layout shards a flat directory."""
+        directory = os.path.join(self.tmpdir, "flat")
+        flat = ProfileManager(directory)
+        flat.save_profiles([flat.create_profile("LinkedIn", "Academic", "Outdoor", "Warm")[0]] * 5)
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            self.assertEqual(main(["migrate-layout", "--profiles-dir", directory, "--depth", "1"]), 0)
+        self.assertIn("Moved 5 profiles", stderr.getvalue())
+        self.assertEqual(ProfileManager(directory).count_profiles(), 5)
+
+    def test_config_layout(self):
+        """Test ProfileConfig chooses the layout of a new directory and refuses the catalog."""
+        directory = os.path.join(self.tmpdir, "new")
+        manager = ProfileManager.from_config(ProfileConfig(profiles_dir=directory, layout="sharded",
+                                                           shard_depth=1))
+        self.assertIsInstance(manager.store, ShardedDirectoryStore)
+        self.assertIsInstance(ProfileManager.from_config(ProfileConfig(profiles_dir=directory)).store,
+                              ShardedDirectoryStore)
+        with self.assertRaises(ValueError):
+            ProfileManager.from_config(ProfileConfig(profiles_dir=directory, catalog=True))
+
+class TestSQLiteProfileStore(StoreTestMixin, unittest.TestCase):
+    """Test the indexed SQLite backend."""
+
+    def make_store(self, directory):
+        return SQLiteProfileStore(os.path.join(directory, "profiles.db"))
+
+class TestProfileCatalog(StoreTestMixin, unittest.TestCase):
+    """Test the in-memory catalog over the JSON backend."""
+
+    def make_store(self, directory):
+        return ProfileCatalog(JSONDirectoryStore(directory), watcher=self.make_watcher(directory))
+
+    def make_watcher(self, directory):
+        return PollingWatcher(directory, interval=0)
+
+    def _write_externally(self, filename, vibe):
+        """Save through a separate manager, as another process would."""
+        other = ProfileManager(self.tmpdir)
+        profile, _, _ = other.create_profile("LinkedIn", "Business Formal", "Corporate Office", vibe)
+        other.save_profile(profile, filename)
+
+    def test_sees_external_changes(self):
+        """Test files added, rewritten and removed behind its back are picked up."""
+        self._save("one")
+        self._write_externally("two", "Friendly")
+        self.assertEqual(sorted(self.manager.list_profiles()), ["one.json", "two.json"])
+
+        self._write_externally("two", "Warm")
+        self.assertEqual(self.manager.load_profile("two.json")["basic_info"]["vibe"], "Warm")
+
+        os.remove(os.path.join(self.tmpdir, "one.json"))
+        self.assertIsNone(self.manager.load_profile("one.json"))
+        self.assertEqual(self.manager.list_profiles(), ["two.json"])
+
+    def test_loaded_dicts_are_copies(self):
+        """Test mutating a loaded profile leaves the cached copy intact."""
+        self._save("one")
+        self.manager.load_profile("one.json")["basic_info"]["vibe"] = "changed"
+        self.assertEqual(self.manager.load_profile("one.json")["basic_info"]["vibe"], "Confident")
+
+    def test_polling_interval_defers_rescans(self):
+        """Test a polling catalog only notices external writes on its next scan."""
+        self.store.watcher = PollingWatcher(self.tmpdir, interval=3600)
+        self.store.watcher.changes()
+        self._write_externally("two", "Friendly")
+        self.assertEqual(self.manager.list_profiles(), [])
+        self.store.watcher.interval = 0
+        self.assertEqual(self.manager.list_profiles(), ["two.json"])
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+class TestProfileCatalogInotify(TestProfileCatalog):
+    """Test the catalog kept current by inotify."""
+
+    def make_watcher(self, directory):
+        return InotifyWatcher(directory)
+
+    def test_polling_interval_defers_rescans(self):
+        self.skipTest("polling only")
+
+    def test_unchanged_files_are_not_reread(self):
+        """Test events for the catalog's own writes don't trigger a re-read."""
+        self._save("one")
+        reads = []
+        original = self.store._read
+        self.store._read = lambda name, known=None: reads.append(known) or original(name, known)
+        self.manager.list_profiles()
+        self.assertTrue(all(known is not None for known in reads))
+
+class TestDeduplication(unittest.TestCase):
+    """Test duplicate detection on save."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.tmpdir)
+
+    def _manager(self, mode):
+        manager = ProfileManager(self.tmpdir, dedup_mode=mode)
+        self.addCleanup(manager.content_index.close)
+        return manager
+
+    def _profile(self, manager, notes="Navy blazer", preset="Custom"):
+        profile, _, _ = manager.create_profile("LinkedIn", "Business Formal", "Corporate Office", "Confident",
+                                               custom_notes=notes)
+        profile.additional_info.preset_used = preset
+        profile.generated_prompt = "Professional LinkedIn headshot"
+        return profile
+
+    def test_hash_ignores_metadata_and_note_formatting(self):
+        """Test only semantic content feeds the hash."""
+        manager = ProfileManager(self.tmpdir)
+        one = self._profile(manager).to_dict()
+        two = self._profile(manager, notes="  navy   BLAZER ", preset="LinkedIn").to_dict()
+        two["metadata"]["timestamp"] = "2020-01-01T00:00:00"
+        self.assertEqual(content_hash(one), content_hash(two))
+        three = self._profile(manager, notes="grey blazer").to_dict()
+        self.assertNotEqual(content_hash(one), content_hash(three))
+
+    def test_reference_mode_reuses_existing_profile(self):
+        """Test a duplicate save returns the existing location and writes nothing."""
+        manager = self._manager("reference")
+        first = manager.save_profile(self._profile(manager))
+        second = manager.save_profile(self._profile(manager, notes="navy blazer"))
+        self.assertEqual(first, second)
+        locations = manager.save_profiles([self._profile(manager, notes="grey blazer")] * 3)
+        self.assertEqual(len(set(locations)), 1)
+        self.assertEqual(manager.count_profiles(), 2)
+
+    def test_revision_mode_keeps_compact_record(self):
+        """Test a duplicate is saved as a revision that loads in full."""
+        manager = self._manager("revision")
+        manager.save_profile(self._profile(manager), "base")
+        manager.save_profile(self._profile(manager, preset="LinkedIn"), "copy")
+        with open(manager.store.location("copy.json"), encoding="utf-8") as f:
+            record = json.load(f)
+        self.assertEqual(record["revision_of"], "base.json")
+        self.assertNotIn("advanced_settings", record)
+        data = manager.load_profile("copy.json")
+        self.assertNotIn("revision_of", data)
+        self.assertEqual(data["additional_info"]["preset_used"], "LinkedIn")
+        self.assertEqual(data["advanced_settings"], manager.load_profile("base.json")["advanced_settings"])
+        summaries, _ = manager.list_summaries()
+        self.assertTrue(all(summary.prompt_preview for summary in summaries))
+
+    def test_deleting_base_promotes_revision(self):
+        """Test revisions survive their base being deleted or overwritten."""
+        manager = self._manager("revision")
+        manager.save_profile(self._profile(manager), "base")
+        manager.save_profile(self._profile(manager), "copy1")
+        manager.save_profile(self._profile(manager), "copy2")
+        expected = manager.load_profile("copy2.json")
+        self.assertTrue(manager.delete_profile("base.json"))
+        self.assertNotIn("revision_of", manager.store.load("copy1.json"))
+        self.assertEqual(manager.store.load("copy2.json")["revision_of"], "copy1.json")
+        self.assertEqual(manager.load_profile("copy2.json"), expected)
+
+        manager.save_profile(self._profile(manager, notes="other"), "copy1")
+        self.assertNotIn("revision_of", manager.store.load("copy2.json"))
+        self.assertEqual(manager.load_profile("copy2.json"), expected)
+
+    def test_index_built_from_existing_profiles(self):
+        """Test enabling dedup on a populated directory finds older duplicates."""
+        plain = ProfileManager(self.tmpdir)
+        first = plain.save_profile(self._profile(plain))
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, INDEX_FILE)))
+        manager = self._manager("reference")
+        self.assertEqual(manager.save_profile(self._profile(manager)), first)
+        # A stale hit is ignored
+        os.remove(first)
+        self.assertNotEqual(manager.save_profile(self._profile(manager)), first)
+        self.assertEqual(manager.count_profiles(), 1)
+
+    def test_from_config(self):
+        """Test the mode comes from the profile config."""
+        manager = ProfileManager.from_config(ProfileConfig(profiles_dir=self.tmpdir, dedup_mode="revision"))
+        self.addCleanup(manager.content_index.close)
+        self.assertEqual(manager.dedup_mode, "revision")
+        with self.assertRaises(ValueError):
+            ProfileManager(self.tmpdir, dedup_mode="sometimes")
+
+class TestAsyncProfileWriter(unittest.TestCase):
+    """Test the background write queue."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.manager = ProfileManager(self.tmpdir)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.tmpdir)
+
+    def test_submit_returns_location_and_saves(self):
+        """Test queued profiles land where submit said they would."""
+        writer = AsyncProfileWriter(self.manager, max_pending=4, batch_size=3)
+        profile = self.manager.create_profile("LinkedIn", "Business Formal", "Corporate Office", "Confident")[0]
+
+        async def run():
+            paths = [await writer.submit(profile) for _ in range(10)]
+            await writer.close()
+            return paths
+
+        paths = asyncio.run(run())
+        self.assertEqual(writer.saved, 10)
+        self.assertEqual(writer.failed, [])
+        self.assertTrue(all(os.path.exists(path) for path in paths))
+
+    def test_reference_dedup_returns_existing_location(self):
+        """Test duplicates of saved or queued profiles get the location that is actually written."""
+        manager = ProfileManager(self.tmpdir, dedup_mode="reference")
+        self.addCleanup(manager.content_index.close)
+        writer = AsyncProfileWriter(manager, batch_size=2)
+        profile = manager.create_profile("LinkedIn", "Business Formal", "Corporate Office", "Confident")[0]
+        other = manager.create_profile("Resume", "Smart Casual", "Plain Color", "Friendly")[0]
+        saved = manager.save_profile(profile)
+
+        async def run():
+            paths = [await writer.submit(p) for p in (profile, other, other, profile)]
+            await writer.close()
+            return paths
+
+        paths = asyncio.run(run())
+        self.assertEqual(paths[0], saved)
+        self.assertEqual(paths[3], saved)
+        self.assertEqual(paths[1], paths[2])
+        self.assertTrue(all(os.path.exists(path) for path in paths))
+        self.assertEqual(manager.count_profiles(), 2)
+
+    def test_failures_recorded(self):
+        """Test failed background saves are reported."""
+        self.manager.max_profiles = 0
+        writer = AsyncProfileWriter(self.manager)
+        profile = self.manager.create_profile("LinkedIn", "Business Formal", "Corporate Office", "Confident")[0]
+
+        async def run():
+            await writer.submit(profile, "one")
+            await writer.close()
+
+        asyncio.run(run())
+        self.assertEqual(writer.failed, [("one.json", "Profile limit of 0 reached")])
+
+class TestULID(unittest.TestCase):
+    """Test ULID generation."""
+
+    def test_monotonic(self):
+        """Test IDs are fixed width and strictly increasing."""
+        ids = [new_ulid() for _ in range(1000)]
+        self.assertTrue(all(len(i) == 26 for i in ids))
+        self.assertEqual(ids, sorted(set(ids)))
+
+if __name__ == '__main__':
+    unittest.main()
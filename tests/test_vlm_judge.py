@@ -0,0 +1,129 @@
+"""
+Tests for the VLM judge client against a local stand-in server.
+"""
+
+import json
+import threading
+import unittest
+import sys
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.core.backends import GeneratedImage
+from apex.core.vlm_judge import VLMJudgeClient, JudgeError, parse_reply, parse_verdict
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers chat completions with a score per image; can fail first."""
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests.append(body)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            fail = server.failures > 0
+            server.failures -= 1
+        try:
+            if fail:
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            threading.Event().wait(0.05)
+            images = [part for part in body["messages"][0]["content"] if part["type"] == "image_url"]
+            verdicts = [{"score": 8, "criteria": {"attire": 9}, "feedback": "good"} for _ in images]
+            content = json.dumps(verdicts if len(images) > 1 else verdicts[0])
+            payload = json.dumps({"choices": [{"message": {"content": f"```json\n{content}\n```"}}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+class TestVLMJudgeClient(unittest.TestCase):
+    """Test VLMJudgeClient functionality."""
+
+    def setUp(self):
+        """Start the stand-in server."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.server.failures = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.images = [GeneratedImage(data=bytes([i]) * 16, prompt="p", seed=i) for i in range(6)]
+        self.preferences = {"attire": "Business Formal", "vibe": "Confident"}
+
+    def tearDown(self):
+        """Stop the stand-in server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_judge_parses_score(self):
+        """Test a fenced JSON reply becomes a normalized verdict."""
+        client = VLMJudgeClient(self.base_url, "judge", api_key="k")
+        verdict = client.judge(self.images[0], self.preferences)
+        client.close()
+        self.assertAlmostEqual(verdict.score, 0.8)
+        self.assertAlmostEqual(verdict.criteria["attire"], 0.9)
+        self.assertEqual(self.server.requests[0]["model"], "judge")
+
+    def test_batch_respects_in_flight_limit(self):
+        """Test batch scoring runs concurrently but within the limit."""
+        client = VLMJudgeClient(self.base_url, "judge", max_in_flight=2)
+        verdicts = client.judge_batch(self.images, self.preferences)
+        client.close()
+        self.assertEqual(len(verdicts), 6)
+        self.assertEqual(self.server.max_in_flight, 2)
+
+    def test_images_per_request(self):
+        """Test several candidates can share one request."""
+        client = VLMJudgeClient(self.base_url, "judge", images_per_request=3)
+        verdicts = client.judge_batch(self.images, self.preferences)
+        client.close()
+        self.assertEqual(len(verdicts), 6)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_retries_transient_errors(self):
+        """Test 503s are retried and then give up."""
+        self.server.failures = 2
+        client = VLMJudgeClient(self.base_url, "judge", max_retries=2, backoff_base=0.01)
+        self.assertAlmostEqual(client.judge(self.images[0], self.preferences).score, 0.8)
+        self.server.failures = 5
+        with self.assertRaises(JudgeError):
+            client.judge(self.images[0], self.preferences)
+        client.close()
+
+class TestParseReply(unittest.TestCase):
+    """Test judge reply parsing."""
+
+    def test_score_fallback(self):
+        """Test a plain-text score is still understood."""
+        self.assertAlmostEqual(parse_reply("Overall score: 7.5 - nice")[0].score, 0.75)
+
+    def test_unparseable(self):
+        """Test replies without a score raise JudgeError."""
+        with self.assertRaises(JudgeError):
+            parse_reply("no idea")
+
+    def test_non_numeric_score(self):
+        """Test a non-numeric score raises JudgeError."""
+        for score in ("great", None, "nan", [7]):
+            with self.assertRaises(JudgeError):
+                parse_verdict({"score": score})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Tests for the choice-field vocabulary registry.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apex.config.vocabulary import Vocabulary, get_vocabulary, DEFAULT_VOCABULARY_PATH
+from apex.core.profile_manager import ProfileManager
+from apex.core.prompt_generator import PromptGenerator
+from apex.models.profile import Profile
+from apex.utils.validators import Validator
+
+class TestVocabulary(unittest.TestCase):
+    """Test Vocabulary functionality."""
+
+    def setUp(self):
+        self.vocabulary = get_vocabulary()
+
+    def test_codes_round_trip(self):
+        """Test every option encodes to a distinct code and back."""
+        for name, field in self.vocabulary.fields.items():
+            codes = [self.vocabulary.encode(name, value) for value in field.values]
+            self.assertEqual(codes, list(range(len(field))))
+            self.assertEqual([self.vocabulary.decode(name, code) for code in codes], list(field.values))
+
+    def test_invalid_values(self):
+        """Test unknown options and codes are rejected."""
+        self.assertTrue(self.vocabulary.is_valid("attire", "Business Formal"))
+        self.assertFalse(self.vocabulary.is_valid("attire", "Pyjamas"))
+        self.assertFalse(self.vocabulary.is_valid("attire", ["unhashable"]))
+        with self.assertRaises(ValueError):
+            self.vocabulary.encode("attire", "Pyjamas")
+        with self.assertRaises(ValueError):
+            self.vocabulary.decode("attire", -1)
+        with self.assertRaises(KeyError):
+            self.vocabulary.choices("hat")
+
+    def test_defaults_are_options(self):
+        """Test a default outside its options is refused."""
+        with self.assertRaises(ValueError):
+            Vocabulary.from_dict({"fields": {"mood": {"default": "Sleepy", "options": {"Calm": None}}}})
+
+    def test_presets_use_valid_options(self):
+        """Test the built-in presets only use vocabulary options."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            presets = ProfileManager(tmpdir).get_presets()
+        for preset in presets.values():
+            self.assertEqual(self.vocabulary.invalid_fields(preset), [])
+
+    def test_validation_rejects_unknown_options(self):
+        """Test validators reject values outside the vocabulary."""
+        is_valid, message = Profile.validate_basic_info("LinkedIn", "Pyjamas", "Outdoor", "Warm")
+        self.assertFalse(is_valid)
+        self.assertIn("Pyjamas", message)
+        self.assertTrue(Validator.validate_resolution("1536x1024 (Wide)"))
+        self.assertFalse(Validator.validate_resolution("640x480"))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ProfileManager(tmpdir)
+            profile, is_valid, message = manager.create_profile(
+                "LinkedIn", "Business Formal", "Outdoor", "Warm", lighting="Candlelight"
+            )
+        self.assertIsNone(profile)
+        self.assertFalse(is_valid)
+        self.assertIn("lighting", message)
+
+    def test_custom_vocabulary_drives_prompts(self):
+        """Test a new option added to the data file reaches the prompt generator."""
+        with open(DEFAULT_VOCABULARY_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        data["fields"]["attire"]["options"]["Medical Scrubs"] = "clean medical scrubs, stethoscope"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "vocabulary.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            vocabulary = Vocabulary.from_file(path)
+
+        self.assertEqual(vocabulary.choices("attire")[-1], "Medical Scrubs")
+        prompt = PromptGenerator(vocabulary=vocabulary).generate_prompt({
+            "purpose": "LinkedIn", "attire": "Medical Scrubs", "background": "Outdoor", "vibe": "Warm"
+        })
+        self.assertIn("clean medical scrubs, stethoscope", prompt)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,18 +12,15 @@ import os
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 import base64
+from apex.config.vocabulary import get_vocabulary
+from apex.models.profile import Profile
+
+# Dropdown options and prompt descriptions shared with the apex package
+vocabulary = get_vocabulary()
 
 def validate_inputs(purpose: str, attire: str, background: str, vibe: str) -> tuple[bool, str]:
     """Validate user inputs and return validation status and message."""
-    if not purpose:
-        return False, "⚠️ Please select a purpose for your portrait"
-    if not attire:
-        return False, "⚠️ Please select your preferred attire"
-    if not background:
-        return False, "⚠️ Please select a background style"
-    if not vibe:
-        return False, "⚠️ Please select your desired vibe"
-    return True, "✅ All inputs valid"
+    return Profile.validate_basic_info(purpose, attire, background, vibe)
 
 def save_profile_to_file(profile: Dict[str, Any], filename: str = None) -> str:
     """Save the profile to a JSON file."""
@@ -83,44 +80,11 @@ def load_profile_presets() -> Dict[str, Dict[str, str]]:
 def generate_advanced_prompt(profile: Dict[str, Any]) -> str:
     """Generate an advanced Flux prompt based on the profile."""
     
-    # Mapping for more detailed descriptions
-    purpose_details = {
-        "LinkedIn": "professional headshot optimized for social media",
-        "Resume": "formal professional portrait for career applications",
-        "Corporate Website": "executive-level corporate portrait",
-        "Personal Branding": "distinctive personal brand portrait",
-        "Business Card": "compact professional headshot",
-        "Other": "professional portrait"
-    }
-    
-    attire_details = {
-        "Business Formal": "sharp business suit, professional tie, polished appearance",
-        "Business Casual": "smart blazer, dress shirt, refined casual look",
-        "Smart Casual": "stylish casual wear, modern professional appearance",
-        "Creative Professional": "fashionable, artistic professional attire",
-        "Academic": "scholarly attire, professional academic dress",
-        "Other": "appropriate professional clothing"
-    }
-    
-    background_details = {
-        "Corporate Office": "modern office environment, soft bokeh, professional lighting",
-        "Plain Color": "clean gradient background, studio lighting",
-        "Outdoor": "natural outdoor setting, soft natural lighting",
-        "Studio-like": "professional studio setup, controlled lighting",
-        "Library/Academic": "scholarly environment, books, academic setting",
-        "Creative Space": "artistic workspace, creative elements, modern aesthetic",
-        "Other": "appropriate professional background"
-    }
-    
-    vibe_details = {
-        "Confident": "confident expression, direct gaze, strong posture",
-        "Friendly": "warm smile, approachable demeanor, friendly eyes",
-        "Approachable": "gentle smile, open expression, welcoming appearance",
-        "Authoritative": "commanding presence, serious expression, leadership aura",
-        "Creative": "artistic expression, creative energy, innovative look",
-        "Sophisticated": "refined elegance, intellectual appearance, polished style",
-        "Warm": "genuine warmth, kind expression, compassionate presence"
-    }
+    # Detailed descriptions come from the shared vocabulary
+    purpose_details = vocabulary.details("purpose")
+    attire_details = vocabulary.details("attire")
+    background_details = vocabulary.details("background")
+    vibe_details = vocabulary.details("vibe")
     
     # Build the prompt
     purpose_desc = purpose_details.get(profile['purpose'], 'professional portrait')
@@ -279,21 +243,21 @@ def create_interface() -> gr.Blocks:
         with gr.Row():
             with gr.Column():
                 purpose = gr.Dropdown(
-                    choices=["LinkedIn", "Resume", "Corporate Website", "Personal Branding", "Business Card", "Other"],
+                    choices=vocabulary.choices("purpose"),
                     label="📌 What is the portrait for?"
                 )
                 attire = gr.Dropdown(
-                    choices=["Business Formal", "Business Casual", "Smart Casual", "Creative Professional", "Academic", "Other"],
+                    choices=vocabulary.choices("attire"),
                     label="👔 Preferred attire"
                 )
             
             with gr.Column():
                 background = gr.Dropdown(
-                    choices=["Corporate Office", "Plain Color", "Outdoor", "Studio-like", "Library/Academic", "Creative Space", "Other"],
+                    choices=vocabulary.choices("background"),
                     label="🏢 Background style"
                 )
                 vibe = gr.Dropdown(
-                    choices=["Confident", "Friendly", "Approachable", "Authoritative", "Creative", "Sophisticated", "Warm"],
+                    choices=vocabulary.choices("vibe"),
                     label="😊 Desired vibe"
                 )
         
@@ -303,36 +267,36 @@ def create_interface() -> gr.Blocks:
             with gr.Row():
                 with gr.Column():
                     lighting = gr.Dropdown(
-                        choices=["Natural Light", "Studio Lighting", "Soft Lighting", "Dramatic Lighting", "Golden Hour", "Professional Flash"],
+                        choices=vocabulary.choices("lighting"),
                         label="💡 Lighting Style",
-                        value="Professional Flash"
+                        value=vocabulary.default("lighting")
                     )
                     mood = gr.Dropdown(
-                        choices=["Professional", "Casual", "Serious", "Energetic", "Calm", "Inspiring"],
+                        choices=vocabulary.choices("mood"),
                         label="🎭 Overall Mood",
-                        value="Professional"
+                        value=vocabulary.default("mood")
                     )
                     resolution = gr.Dropdown(
-                        choices=["1024x1024 (Standard)", "1536x1024 (Wide)", "1024x1536 (Portrait)", "2048x2048 (High-Res)"],
+                        choices=vocabulary.choices("resolution"),
                         label="📐 Resolution",
-                        value="1024x1024 (Standard)"
+                        value=vocabulary.default("resolution")
                     )
                 
                 with gr.Column():
                     age_range = gr.Dropdown(
-                        choices=["20-30", "30-40", "40-50", "50-60", "60+", "Not Specified"],
+                        choices=vocabulary.choices("age_range"),
                         label="🎂 Age Range",
-                        value="Not Specified"
+                        value=vocabulary.default("age_range")
                     )
                     gender = gr.Dropdown(
-                        choices=["Male", "Female", "Non-binary", "Not Specified"],
+                        choices=vocabulary.choices("gender"),
                         label="👤 Gender",
-                        value="Not Specified"
+                        value=vocabulary.default("gender")
                     )
                     ethnicity = gr.Dropdown(
-                        choices=["Asian", "Black", "Caucasian", "Hispanic", "Middle Eastern", "Mixed", "Not Specified"],
+                        choices=vocabulary.choices("ethnicity"),
                         label="🌍 Ethnicity",
-                        value="Not Specified"
+                        value=vocabulary.default("ethnicity")
                     )
         
         # Upload and Notes Section